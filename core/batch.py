@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+from datetime import datetime
+
+from core.document import build_project_text, write_incompatible_files
+from core.scanner import scan_project
+from settings.settings_manager import load_app_settings
+from utils.file_utils import get_base_dir
+from utils.perf_utils import RunReport, get_peak_rss, profile_run
+
+logger = logging.getLogger(__name__)
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+# Seconds a job gets after a terminate() before it is killed outright
+TERMINATE_GRACE = 5
+
+def read_batch_manifest(manifest_path):
+    """
+    Reads project roots from a manifest file.
+
+    The manifest holds one path per line; blank lines and lines starting with "#"
+    are ignored, and relative paths are resolved against the manifest's folder.
+
+    Returns:
+        list[str]: Absolute project paths in manifest order.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    roots = []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            roots.append(os.path.normpath(os.path.join(base_dir, os.path.expanduser(line))))
+    return roots
+
+def compress_project(project_path, output_dir):
+    """
+    Compresses one project into a text documentation file without any GUI interaction.
+
+    Args:
+        project_path (str): Root of the project.
+        output_dir (str): Folder receiving the documentation, created if needed.
+
+    Returns:
+        tuple: (output_file, report) with the path written and the run's RunReport.
+    """
+    report = RunReport("compress", project_path)
+    with report.stage("scan"):
+        manifest = scan_project(project_path)
+    output_lines, incompatible_files = build_project_text(project_path, manifest=manifest, report=report)
+
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%d.%m.%Y_%H_%M_%S")
+    output_file = os.path.join(output_dir, f"project_documentation_{timestamp}.txt")
+    with report.stage("write"):
+        with open(output_file, "w", encoding="utf-8") as outfile:
+            outfile.writelines(output_lines)
+    if incompatible_files:
+        write_incompatible_files(output_dir, incompatible_files)
+    report.save(output_dir)
+    return output_file, report
+
+def _apply_memory_limit(memory_limit_mb):
+    """Caps the address space of the current process, where the platform allows it."""
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Per-job memory limits are not supported on this platform")
+        return
+    limit = int(memory_limit_mb * 1024 * 1024)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _run_batch_job(project_path, output_dir, memory_limit_mb, conn, profile_settings=None):
+    """
+    Child process entry point: compresses one project and sends its result dict through conn.
+
+    With profile_settings, the job is profiled into compress_profile.prof in output_dir.
+    """
+    result = {"project": project_path, "output_dir": output_dir}
+    try:
+        if memory_limit_mb:
+            _apply_memory_limit(memory_limit_mb)
+        with profile_run(profile_settings is not None, output_dir, "compress_profile", profile_settings):
+            output_file, report = compress_project(project_path, output_dir)
+        data = report.to_dict()
+        result.update(
+            status="ok",
+            output_file=output_file,
+            files=data["total_files"],
+            bytes=data["total_bytes"],
+            peak_rss_bytes=data["peak_rss_bytes"],
+        )
+    except MemoryError:
+        result.update(status="memory_limit", error=f"Exceeded the memory limit of {memory_limit_mb} MB")
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    conn.send(result)
+    conn.close()
+
+def _assign_output_dirs(roots, output_root):
+    """
+    Returns one output folder per project root.
+
+    Without output_root, each project gets a project_documentation_<timestamp> folder
+    of its own, like the GUI. With output_root, folders are named after the project
+    and suffixed with a counter when two roots share a name.
+    """
+    timestamp = datetime.now().strftime("%d.%m.%Y_%H_%M_%S")
+    output_dirs = []
+    used = set()
+    for root in roots:
+        if output_root is None:
+            output_dirs.append(os.path.join(root, f"project_documentation_{timestamp}"))
+            continue
+        name = os.path.basename(os.path.normpath(root)) or "project"
+        candidate, counter = name, 2
+        while candidate.lower() in used:
+            candidate = f"{name}_{counter}"
+            counter += 1
+        used.add(candidate.lower())
+        output_dirs.append(os.path.join(output_root, candidate))
+    return output_dirs
+
+def run_batch(roots, output_root=None, workers=None, memory_limit_mb=None, time_limit=None, profile_settings=None):
+    """
+    Compresses many projects in parallel, one child process per project.
+
+    At most workers projects run at once. Every job runs in a fresh process, so a
+    memory limit or crash affects only that job; jobs running longer than
+    time_limit seconds are terminated. Failures are recorded and the batch goes on.
+
+    Args:
+        roots (list[str]): Project roots to compress.
+        output_root (str, optional): Folder receiving one sub-folder per project.
+        workers (int, optional): Number of concurrent jobs, defaults to the CPU count.
+        memory_limit_mb (float, optional): Address-space limit per job.
+        time_limit (float, optional): Wall-clock limit per job in seconds.
+        profile_settings (dict, optional): "profile_*" settings to profile every job
+            with, each into its own output folder; None disables profiling.
+
+    Returns:
+        list[dict]: One result per root, in the order of roots.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    jobs = list(zip(roots, _assign_output_dirs(roots, output_root)))
+    results = [None] * len(jobs)
+    next_job = 0
+    running = {}  # sentinel -> (index, process, conn, started)
+
+    while next_job < len(jobs) or running:
+        while next_job < len(jobs) and len(running) < workers:
+            project_path, output_dir = jobs[next_job]
+            if not os.path.isdir(project_path):
+                results[next_job] = {"project": project_path, "output_dir": output_dir,
+                                     "status": "failed", "error": "Not a directory", "seconds": 0.0}
+                next_job += 1
+                continue
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_run_batch_job, args=(project_path, output_dir, memory_limit_mb, child_conn, profile_settings),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            running[process.sentinel] = (next_job, process, parent_conn, time.perf_counter())
+            logger.info("Started batch job %d/%d: %s", next_job + 1, len(jobs), project_path)
+            next_job += 1
+
+        if not running:
+            continue
+        # Results are small, so reading the pipe as soon as it is ready never blocks the child
+        waitables = list(running) + [entry[2] for entry in running.values()]
+        multiprocessing.connection.wait(waitables, timeout=0.5)
+
+        now = time.perf_counter()
+        for sentinel, (index, process, conn, started) in list(running.items()):
+            result = None
+            if conn.poll():
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    result = None
+            elif process.is_alive():
+                if time_limit and now - started > time_limit:
+                    process.terminate()
+                    process.join(TERMINATE_GRACE)
+                    if process.is_alive():
+                        process.kill()
+                    result = {"project": jobs[index][0], "output_dir": jobs[index][1],
+                              "status": "timeout", "error": f"Exceeded the time limit of {time_limit} s"}
+                else:
+                    continue
+            process.join()
+            if result is None:
+                result = {"project": jobs[index][0], "output_dir": jobs[index][1],
+                          "status": "crashed", "error": f"Worker exited with code {process.exitcode}"}
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            results[index] = result
+            conn.close()
+            del running[sentinel]
+            if result["status"] == "ok":
+                logger.info("Finished %s in %.2fs", result["project"], result["seconds"])
+            else:
+                logger.error("Batch job for %s %s: %s", result["project"], result["status"], result.get("error"))
+
+    return results
+
+def write_batch_summary(results, output_dir, wall_time=None):
+    """
+    Writes the aggregated batch results as JSON into output_dir.
+
+    Returns:
+        str: Path of the summary file.
+    """
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    ok_results = [r for r in results if r["status"] == "ok"]
+    summary = {
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_time": round(wall_time, 3) if wall_time is not None else None,
+        "projects": len(results),
+        "status_counts": counts,
+        "total_files": sum(r.get("files", 0) for r in ok_results),
+        "total_bytes": sum(r.get("bytes", 0) for r in ok_results),
+        "parent_peak_rss_bytes": get_peak_rss(),
+        "results": results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, BATCH_SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4)
+    return summary_path
+
+def batch_main(argv):
+    """
+    Command line entry point: python main.py batch [roots ...] [--manifest FILE] ...
+
+    Returns:
+        int: Process exit code, 0 if every project was compressed.
+    """
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Compress many project roots without the GUI.")
+    parser.add_argument("roots", nargs="*", help="Project folders to compress.")
+    parser.add_argument("--manifest", help="File listing one project folder per line.")
+    parser.add_argument("--output", help="Folder receiving one sub-folder per project and the batch summary.")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default: CPU count).")
+    parser.add_argument("--memory-limit", type=float, default=None, metavar="MB", help="Memory limit per job.")
+    parser.add_argument("--time-limit", type=float, default=None, metavar="SECONDS", help="Time limit per job.")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write compress_profile.prof and summaries into every project's output folder "
+                             "(also enabled by the profile setting).")
+    args = parser.parse_args(argv)
+
+    roots = [os.path.abspath(root) for root in args.roots]
+    if args.manifest:
+        roots.extend(read_batch_manifest(args.manifest))
+    if not roots:
+        parser.error("no project roots given")
+
+    output_root = os.path.abspath(args.output) if args.output else None
+    app_settings = load_app_settings(get_base_dir())
+    profile_settings = None
+    if args.profile or app_settings.get("profile", False):
+        # Only what the profiler needs is sent to the job processes
+        profile_settings = {key: value for key, value in app_settings.items() if key.startswith("profile_")}
+    started = time.perf_counter()
+    results = run_batch(roots, output_root, args.workers, args.memory_limit, args.time_limit, profile_settings)
+    summary_path = write_batch_summary(results, output_root or os.getcwd(), time.perf_counter() - started)
+
+    failed = [r for r in results if r["status"] != "ok"]
+    logger.info("Batch finished: %d ok, %d failed. Summary: %s", len(results) - len(failed), len(failed), summary_path)
+    return 1 if failed else 0
@@ -0,0 +1,272 @@
+import ast
+import logging
+import os
+import re
+from collections import namedtuple
+
+from core.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_TOKENS = 2000
+
+# A piece of one file. start_line and end_line are 1-based and inclusive; context
+# holds header lines repeated from outside the range (e.g. the enclosing class).
+Chunk = namedtuple("Chunk", "rel_path start_line end_line symbols context text tokens")
+
+# A run of whole lines forming one unit: a definition, or the statements between definitions
+_Segment = namedtuple("_Segment", "start end symbol children header")
+
+BRACE_EXTENSIONS = (".js", ".mjs", ".cjs", ".cts", ".mts", ".ts", ".tsx", ".css", ".scss", ".json", ".map")
+_BRACE_SYMBOL = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?"
+    r"(?:function\s*\*?\s*(?P<function>[\w$]+)"
+    r"|class\s+(?P<class>[\w$]+)"
+    r"|interface\s+(?P<interface>[\w$]+)"
+    r"|(?:const|let|var)\s+(?P<variable>[\w$]+)\s*[:=]"
+    r"|(?P<selector>[^{};]+?)\s*\{)"
+)
+# Strings and line comments are removed before braces are counted
+_BRACE_NOISE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`|//.*$")
+
+def _python_segments(nodes, lines, first_line, last_line, prefix=""):
+    """
+    Returns the segments covering lines first_line..last_line, one per definition
+    in nodes, with statements between definitions grouped together. Comments and
+    blank lines before a definition belong to it.
+    """
+    segments = []
+    cursor = first_line
+    for node in nodes:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        header_start = start
+        # Leading comments directly above the definition move with it
+        while start - 1 > cursor and lines[start - 2].lstrip().startswith("#"):
+            start -= 1
+        if start > cursor:
+            if any(line.strip() for line in lines[cursor - 1:start - 1]):
+                segments.append(_Segment(cursor, start - 1, prefix.rstrip(".") or None, (), ()))
+            elif segments:
+                # Blank lines only: they end the previous segment
+                segments[-1] = segments[-1]._replace(end=start - 1)
+            else:
+                start = cursor
+        symbol = prefix + node.name
+        children = ()
+        header = ()
+        if isinstance(node, ast.ClassDef) and node.body:
+            body_start = node.body[0].lineno
+            header = tuple(range(header_start, body_start))
+            children = tuple(_python_segments(node.body, lines, body_start, node.end_lineno, symbol + "."))
+        segments.append(_Segment(start, node.end_lineno, symbol, children, header))
+        cursor = node.end_lineno + 1
+    if cursor <= last_line:
+        if any(line.strip() for line in lines[cursor - 1:last_line]) or not segments:
+            segments.append(_Segment(cursor, last_line, prefix.rstrip(".") or None, (), ()))
+        else:
+            segments[-1] = segments[-1]._replace(end=last_line)
+    return segments
+
+def _brace_segments(lines):
+    """
+    Splits brace-delimited source (JS/TS/CSS/JSON) at lines where the brace depth
+    returns to zero. Each top-level block becomes a segment named after the
+    function, class, variable or selector that opens it.
+    """
+    segments = []
+    depth = 0
+    start = 1
+    symbol = None
+    in_block_comment = False
+    for number, line in enumerate(lines, 1):
+        code = line
+        if in_block_comment:
+            end = code.find("*/")
+            if end == -1:
+                continue
+            code = code[end + 2:]
+            in_block_comment = False
+        code = re.sub(r"/\*.*?\*/", "", _BRACE_NOISE.sub("", code))
+        if "/*" in code:
+            code = code[:code.index("/*")]
+            in_block_comment = True
+        if depth == 0 and symbol is None and code.strip():
+            match = _BRACE_SYMBOL.match(code)
+            if match:
+                symbol = next((value.strip() for value in match.groupdict().values() if value), None)
+        depth = max(depth + code.count("{") + code.count("[") - code.count("}") - code.count("]"), 0)
+        if depth == 0 and code.strip() and (symbol is not None or code.rstrip().endswith((";", "}", "]"))):
+            segments.append(_Segment(start, number, symbol, (), ()))
+            start = number + 1
+            symbol = None
+    if start <= len(lines):
+        segments.append(_Segment(start, len(lines), symbol, (), ()))
+    return segments
+
+def _indent_segments(lines):
+    """Splits other text at blank lines followed by an unindented line."""
+    segments = []
+    start = 1
+    for number in range(2, len(lines) + 1):
+        line = lines[number - 1]
+        if line.strip() and not line[0].isspace() and not lines[number - 2].strip():
+            segments.append(_Segment(start, number - 1, None, (), ()))
+            start = number
+    if start <= len(lines):
+        segments.append(_Segment(start, len(lines), None, (), ()))
+    return segments
+
+def split_segments(rel_path, source):
+    """
+    Returns the top-level segments of a file.
+
+    Python uses ast line ranges (classes keep their methods as children), brace
+    languages use brace depth, and everything else blank-line separated blocks.
+    """
+    lines = source.splitlines()
+    if not lines:
+        return []
+    extension = os.path.splitext(rel_path)[1].lower()
+    if extension == ".py":
+        try:
+            tree = ast.parse(source)
+            return _python_segments(tree.body, lines, 1, len(lines))
+        except (SyntaxError, ValueError) as e:
+            logger.debug("Cannot parse %s (%s), chunking by indentation", rel_path, e)
+    elif extension in BRACE_EXTENSIONS:
+        return _brace_segments(lines)
+    return _indent_segments(lines)
+
+class _ChunkBuilder:
+    """Packs segments of one file into chunks of at most target_tokens."""
+
+    def __init__(self, rel_path, lines, target_tokens, count_tokens):
+        self.rel_path = rel_path
+        self.lines = lines
+        self.target_tokens = target_tokens
+        self.count_tokens = count_tokens
+        self.chunks = []
+        self._open = None  # [start, end, symbols, context]
+
+    def _text(self, start, end):
+        return "\n".join(self.lines[start - 1:end])
+
+    def _size(self, start, end, context=()):
+        text = self._text(start, end)
+        if context:
+            text = "\n".join(self.lines[n - 1] for n in context) + "\n" + text
+        return self.count_tokens(text)
+
+    def flush(self):
+        """Closes the open chunk."""
+        if self._open is None:
+            return
+        start, end, symbols, context = self._open
+        text = self._text(start, end)
+        if context:
+            text = "\n".join(self.lines[n - 1] for n in context) + "\n" + text
+        self.chunks.append(Chunk(self.rel_path, start, end, tuple(symbols), tuple(context), text,
+                                 self.count_tokens(text)))
+        self._open = None
+
+    def add(self, segment, context=()):
+        """Adds a segment, splitting it when it does not fit into one chunk."""
+        if self._open is not None and (
+            tuple(self._open[3]) != tuple(context)
+            or self._size(self._open[0], segment.end, context) > self.target_tokens
+        ):
+            self.flush()
+        if self._open is None and self._size(segment.start, segment.end, context) > self.target_tokens:
+            self._split(segment, context)
+            return
+        if self._open is None:
+            self._open = [segment.start, segment.end, [], context]
+        self._open[1] = segment.end
+        if segment.symbol and segment.symbol not in self._open[2]:
+            self._open[2].append(segment.symbol)
+
+    def _split(self, segment, context):
+        """Splits an oversized segment: a class by its members, anything else by lines."""
+        if segment.children:
+            for child in segment.children:
+                # Members carry the class header, the only overlap between chunks
+                self.add(child, tuple(context) + tuple(segment.header))
+            self.flush()
+            return
+        # Cut at the last blank line that fits, else at the last line that fits; a
+        # single line that is too long stays whole. Line counts are summed, which
+        # keeps this linear for huge blocks such as one large JSON object.
+        line_tokens = [self.count_tokens(line + "\n") for line in self.lines[segment.start - 1:segment.end]]
+        context_tokens = self._size(segment.start, segment.start) if context else 0
+        start = segment.start
+        while start <= segment.end:
+            used = context_tokens + line_tokens[start - segment.start]
+            end, last_blank = start, None
+            while end < segment.end and used + line_tokens[end + 1 - segment.start] <= self.target_tokens:
+                end += 1
+                used += line_tokens[end - segment.start]
+                if not self.lines[end - 1].strip():
+                    last_blank = end
+            if end < segment.end and last_blank is not None:
+                end = last_blank
+            self._open = [start, end, [segment.symbol] if segment.symbol else [], context]
+            self.flush()
+            start = end + 1
+            if segment.start not in context:
+                # Continuations repeat the first line (e.g. the def signature) as context
+                context = tuple(context) + (segment.start,)
+                context_tokens = self._size(segment.start, segment.start, context[:-1])
+
+def chunk_source(rel_path, source, target_tokens=DEFAULT_CHUNK_TOKENS, count_tokens=estimate_tokens):
+    """
+    Splits one file into chunks of at most target_tokens at semantic boundaries.
+
+    Consecutive segments (functions, classes, statement groups, top-level blocks)
+    are packed together while they fit. A class that is too large is split between
+    its members, each chunk repeating the class header. Other oversized segments
+    are cut at blank lines, repeating their first line.
+
+    Args:
+        rel_path (str): Path used for metadata and to pick the splitter.
+        source (str): File content.
+        target_tokens (int): Token budget per chunk.
+        count_tokens (callable): Token counter, e.g. TokenEstimator.count_text.
+
+    Returns:
+        list[Chunk]: Chunks in file order.
+    """
+    lines = source.splitlines()
+    builder = _ChunkBuilder(rel_path, lines, target_tokens, count_tokens)
+    for segment in split_segments(rel_path, source):
+        builder.add(segment)
+    builder.flush()
+    return builder.chunks
+
+def pack_chunks(chunks, target_tokens=DEFAULT_CHUNK_TOKENS):
+    """
+    Groups consecutive chunks (across files) into batches of at most target_tokens,
+    e.g. one batch per LLM request. A chunk larger than the target gets a batch of its own.
+
+    Returns:
+        list[list[Chunk]]
+    """
+    batches = []
+    current, used = [], 0
+    for chunk in chunks:
+        if current and used + chunk.tokens > target_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(chunk)
+        used += chunk.tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def format_chunk(chunk):
+    """Renders a chunk for an LLM request, with its path, line range and symbols."""
+    header = f"File: {chunk.rel_path} (lines {chunk.start_line}-{chunk.end_line}"
+    if chunk.symbols:
+        header += f"; {', '.join(chunk.symbols)}"
+    return f"{header})\n{chunk.text}\n\n"
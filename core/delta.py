@@ -0,0 +1,202 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+from datetime import datetime
+
+from core.processor import build_file_block
+from core.project import get_project_structure
+from core.reconstructor import (
+    FILES_HEADER,
+    _map_document,
+    expand_shard_manifests,
+    find_deleted_files,
+    iter_file_blocks,
+    resolve_delta_chain,
+)
+from core.scanner import scan_project, walk_manifest
+from core.utils import content_digest
+from settings.settings_manager import load_app_settings
+from utils.file_utils import get_base_dir
+from utils.perf_utils import RunReport, measure, profile_run
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".index.json"
+
+def index_path_for(doc_file):
+    """Returns the index file stored next to a documentation file."""
+    return os.path.splitext(doc_file)[0] + INDEX_SUFFIX
+
+def build_doc_index(doc_file):
+    """
+    Builds the file index of a documentation file by scanning its blocks.
+
+    For a delta the whole chain is applied oldest first, so the index describes the
+    project state the delta represents. A .shards.json manifest, as the document or
+    as the base of a chain, is read through its shards.
+
+    Returns:
+        dict: {"document": file name, "files": {rel_path: {"sha256", "policy"}}}
+    """
+    files = {}
+    for path in reversed(expand_shard_manifests(resolve_delta_chain(doc_file))):
+        with open(path, "rb") as f:
+            buf = _map_document(f)
+        try:
+            for rel_path in find_deleted_files(buf):
+                files.pop(rel_path, None)
+            files_start = buf.find(FILES_HEADER)
+            if files_start == -1:
+                continue
+            for file_name, body_start, body_end, policy_note in iter_file_blocks(buf, files_start + len(FILES_HEADER)):
+                digest = content_digest(buf[body_start:body_end]) if body_start is not None else None
+                files[file_name.replace("\\", "/")] = {"sha256": digest, "policy": policy_note}
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    return {"document": os.path.basename(doc_file), "files": files}
+
+def write_doc_index(doc_file, index):
+    """Writes index next to doc_file and returns its path."""
+    index_path = index_path_for(doc_file)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=4)
+    return index_path
+
+def load_doc_index(base):
+    """
+    Loads the index of a base documentation file.
+
+    Args:
+        base (str): A documentation file, or its .index.json file.
+
+    Returns:
+        tuple: (doc_file, index). The stored index is used when present; otherwise
+        it is rebuilt from the documentation file itself.
+    """
+    if base.endswith(INDEX_SUFFIX):
+        with open(base, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return os.path.join(os.path.dirname(os.path.abspath(base)), index["document"]), index
+    index_path = index_path_for(base)
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            return os.path.abspath(base), json.load(f)
+    logger.info("No index found for %s, building it from the document", base)
+    return os.path.abspath(base), build_doc_index(base)
+
+def create_delta_documentation(project_path, base, output_file=None, report=None):
+    """
+    Writes a delta documentation file holding only the files added, modified or
+    deleted since base.
+
+    Files whose size and mtime match the base index are not read at all; others are
+    read and compared by content hash. The delta carries the full project structure
+    and a Base: reference, and gets an index of its own so further deltas can be
+    chained onto it.
+
+    Args:
+        project_path (str): Root of the project.
+        base (str): Previous documentation file (full or delta) or its index file.
+        output_file (str, optional): Defaults to project_delta_<timestamp>.txt next to base.
+        report (RunReport, optional): Report collecting stage timings.
+
+    Returns:
+        tuple: (output_file, added, modified, deleted) with lists of relative paths.
+    """
+    project_path = os.path.abspath(project_path)
+    base_doc, base_index = load_doc_index(base)
+    base_files = base_index.get("files", {})
+    if output_file is None:
+        timestamp = datetime.now().strftime("%d.%m.%Y_%H_%M_%S")
+        output_file = os.path.join(os.path.dirname(base_doc), f"project_delta_{timestamp}.txt")
+
+    with measure(report, "scan"):
+        manifest = scan_project(project_path)
+
+    files, block_lines = {}, []
+    added, modified = [], []
+    for _root, _rel_root, _dirs, entries in walk_manifest(project_path, manifest):
+        for entry in entries:
+            key = entry.rel_path.replace(os.sep, "/")
+            previous = base_files.get(key)
+            if previous and previous.get("size") == entry.size and previous.get("mtime") == entry.mtime:
+                files[key] = previous
+                continue
+            lines, content, policy_note = build_file_block(entry.path, entry.rel_path, size=entry.size, report=report)
+            if not lines:
+                continue
+            digest = content_digest(content.encode("utf-8")) if content is not None else None
+            files[key] = {"sha256": digest, "policy": policy_note, "size": entry.size, "mtime": entry.mtime}
+            if previous is None:
+                added.append(key)
+            elif digest is None or (previous.get("sha256"), previous.get("policy")) != (digest, policy_note):
+                modified.append(key)
+            else:
+                continue
+            block_lines.extend(lines)
+    deleted = sorted(key for key in base_files if key not in files)
+
+    with measure(report, "format"):
+        structure = get_project_structure(project_path, manifest)
+    base_ref = os.path.relpath(base_doc, os.path.dirname(os.path.abspath(output_file))).replace(os.sep, "/")
+    output_lines = [
+        f"# Project Delta: {os.path.basename(project_path)}\n",
+        f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Base: {base_ref}\n\n",
+        f"Added: {len(added)}, Modified: {len(modified)}, Deleted: {len(deleted)}\n\n",
+        # Always present, so the section is never looked up inside file contents
+        "## Deleted Files\n\n```\n",
+        "".join(f"{rel_path}\n" for rel_path in deleted),
+        "```\n\n",
+        "## Project Structure\n\n```\n",
+        structure,
+        "\n```\n\n",
+        "## Files Content\n\n",
+    ]
+    output_lines.extend(block_lines)
+
+    with measure(report, "write"):
+        with open(output_file, "w", encoding="utf-8") as outfile:
+            outfile.writelines(output_lines)
+        write_doc_index(output_file, {"document": os.path.basename(output_file), "base": base_ref, "files": files})
+    logger.info(
+        "Delta written to %s: %d added, %d modified, %d deleted", output_file, len(added), len(modified), len(deleted)
+    )
+    return output_file, added, modified, deleted
+
+def delta_main(argv):
+    """
+    Command line entry point: python main.py delta ROOT --base DOC [--output FILE]
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(prog="main.py delta", description="Document only what changed since a previous run.")
+    parser.add_argument("root", help="Project folder.")
+    parser.add_argument("--base", required=True, help="Previous documentation file, delta or .index.json.")
+    parser.add_argument("--output", help="Delta file to write (default: next to the base).")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write delta_profile.prof and summaries next to the delta (also enabled by the profile setting).")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+    app_settings = load_app_settings(get_base_dir())
+    report = RunReport("delta", os.path.abspath(args.root))
+    profile = args.profile or app_settings.get("profile", False)
+    with profile_run(profile, os.path.dirname(os.path.abspath(args.output or args.base)), "delta_profile", app_settings):
+        output_file = create_delta_documentation(args.root, args.base, args.output, report=report)[0]
+    report.finish()
+    # Named after the delta, so deltas written into the same folder keep their reports
+    report_path = report.save(
+        os.path.dirname(os.path.abspath(output_file)),
+        f"{os.path.splitext(os.path.basename(output_file))[0]}_performance_report.json",
+    )
+    logger.info("%s", report.summary())
+    if report_path:
+        logger.info("Performance report saved to: %s", report_path)
+    return 0
@@ -0,0 +1,402 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from collections import namedtuple
+
+from core.scanner import scan_project
+from utils.file_utils import get_base_dir
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_CACHE_FILE = os.path.join("cache", "dependency_cache.json")
+# Bumped when manifest parsing changes, so cached results are parsed again
+PARSER_VERSION = 1
+
+# Dependency manifests and lockfiles by file name; requirements*.txt is matched separately
+MANIFEST_FILES = ("pyproject.toml", "package.json", "Pipfile.lock", "poetry.lock", "uv.lock",
+                  "package-lock.json", "yarn.lock")
+_REQUIREMENTS_FILE = re.compile(r"^requirements[\w.-]*\.txt$", re.IGNORECASE)
+# A PEP 508 requirement: name, extras, then the version specifier up to any marker
+_REQUIREMENT = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*([^;#@]*)")
+_YARN_ENTRY = re.compile(r'^"?(@?[^@\s"]+)@')
+_YARN_VERSION = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?')
+
+STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) | frozenset(sys.builtin_module_names)
+# Folders whose modules and packages are importable as top-level names ("" is the project root)
+PYTHON_SOURCE_ROOTS = ("", "src")
+NODE_BUILTINS = frozenset((
+    "assert", "async_hooks", "buffer", "child_process", "cluster", "console", "crypto", "dgram", "dns",
+    "events", "fs", "http", "http2", "https", "inspector", "module", "net", "os", "path", "perf_hooks",
+    "process", "querystring", "readline", "repl", "stream", "string_decoder", "timers", "tls", "tty",
+    "url", "util", "v8", "vm", "worker_threads", "zlib",
+))
+# Imports whose distribution on PyPI has a different name
+IMPORT_TO_DISTRIBUTION = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "fitz": "pymupdf",
+    "google.generativeai": "google-generativeai",
+    "jwt": "pyjwt",
+    "PIL": "pillow",
+    "serial": "pyserial",
+    "sklearn": "scikit-learn",
+    "yaml": "pyyaml",
+}
+
+# ecosystem is "python" or "node"; category is "stdlib", "third-party" or "local".
+# spec is the declared version specifier and locked the lockfile version ("" if none).
+Dependency = namedtuple("Dependency", "ecosystem category name spec locked declared_in imported_by")
+ProjectDependencies = namedtuple("ProjectDependencies", "dependencies python_requires manifests")
+
+CATEGORY_TITLES = (
+    ("python", "third-party", "Python packages"),
+    ("python", "stdlib", "Python standard library"),
+    ("python", "local", "Local Python modules"),
+    ("node", "third-party", "Node packages"),
+    ("node", "stdlib", "Node built-in modules"),
+)
+
+def normalize_name(name):
+    """Normalizes a Python distribution name as PEP 503 does."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def is_manifest_file(file_name):
+    """True for the dependency manifests and lockfiles parse_manifest understands."""
+    return file_name in MANIFEST_FILES or bool(_REQUIREMENTS_FILE.match(file_name))
+
+def _load_toml(text):
+    """Parses TOML with tomllib (Python 3.11+) or tomli; returns None without either."""
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            logger.debug("No TOML parser available, skipping TOML manifests")
+            return None
+    return tomllib.loads(text)
+
+def _parse_requirement(line, declared):
+    match = _REQUIREMENT.match(line)
+    if match:
+        declared[normalize_name(match.group(1))] = match.group(2).strip()
+
+def parse_manifest(file_name, text):
+    """
+    Parses one dependency manifest or lockfile.
+
+    Returns:
+        dict: {"ecosystem", "declared": {name: spec}, "locked": {name: version},
+        "python_requires"}; empty mappings for files that cannot be parsed.
+    """
+    result = {"ecosystem": "python", "declared": {}, "locked": {}, "python_requires": None}
+    declared, locked = result["declared"], result["locked"]
+    try:
+        if _REQUIREMENTS_FILE.match(file_name):
+            for line in text.splitlines():
+                line = line.strip()
+                if line and not line.startswith(("#", "-")):
+                    _parse_requirement(line, declared)
+        elif file_name == "pyproject.toml":
+            data = _load_toml(text) or {}
+            project = data.get("project", {})
+            result["python_requires"] = project.get("requires-python")
+            requirements = list(project.get("dependencies", []))
+            for extra in project.get("optional-dependencies", {}).values():
+                requirements.extend(extra)
+            for requirement in requirements:
+                _parse_requirement(requirement, declared)
+            poetry = data.get("tool", {}).get("poetry", {})
+            groups = [poetry.get("dependencies", {}), poetry.get("dev-dependencies", {})]
+            groups.extend(group.get("dependencies", {}) for group in poetry.get("group", {}).values())
+            for group in groups:
+                for name, spec in group.items():
+                    if isinstance(spec, dict):
+                        spec = spec.get("version", "")
+                    if name == "python":
+                        result["python_requires"] = result["python_requires"] or spec
+                    else:
+                        declared[normalize_name(name)] = spec if isinstance(spec, str) else ""
+        elif file_name in ("poetry.lock", "uv.lock"):
+            for package in (_load_toml(text) or {}).get("package", []):
+                locked[normalize_name(package["name"])] = package.get("version", "")
+        elif file_name == "Pipfile.lock":
+            data = json.loads(text)
+            for section in ("default", "develop"):
+                for name, info in data.get(section, {}).items():
+                    locked[normalize_name(name)] = info.get("version", "").lstrip("=")
+        elif file_name == "package.json":
+            result["ecosystem"] = "node"
+            data = json.loads(text)
+            for section in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+                declared.update(data.get(section) or {})
+        elif file_name == "package-lock.json":
+            result["ecosystem"] = "node"
+            data = json.loads(text)
+            for path, info in (data.get("packages") or {}).items():
+                # Only top-level packages; nested node_modules hold transitive copies
+                if path.startswith("node_modules/") and "/node_modules/" not in path:
+                    locked[path[len("node_modules/"):]] = info.get("version", "")
+            for name, info in (data.get("dependencies") or {}).items():
+                locked.setdefault(name, info.get("version", ""))
+        elif file_name == "yarn.lock":
+            result["ecosystem"] = "node"
+            name = None
+            for line in text.splitlines():
+                entry = _YARN_ENTRY.match(line)
+                if entry and not line.startswith(" "):
+                    name = entry.group(1)
+                    continue
+                version = _YARN_VERSION.match(line)
+                if version and name:
+                    locked.setdefault(name, version.group(1))
+                    name = None
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning("Could not parse dependency manifest %s: %s", file_name, e)
+    return result
+
+class ManifestCache:
+    """
+    Parsed dependency manifests keyed by file name and content hash, kept in a
+    JSON file across runs, so unchanged manifests are not parsed again.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.path.join(get_base_dir(), DEPENDENCY_CACHE_FILE)
+        self._dirty = False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._cache = json.load(f)
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def parse(self, file_name, data):
+        """Returns parse_manifest's result for the bytes of a manifest, cached by content hash."""
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = f"{PARSER_VERSION}:{file_name}:{digest}"
+        result = self._cache.get(key)
+        if result is None:
+            result = parse_manifest(file_name, data.decode("utf-8", errors="replace"))
+            self._cache[key] = result
+            self._dirty = True
+        return result
+
+    def save(self):
+        """Writes new cache entries to disk, if there are any."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+            os.replace(temp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Could not save dependency cache: %s", e)
+
+def _python_module_names(manifest):
+    """Returns {rel_dir: names} of the .py modules and the packages (folders with __init__.py) in each folder."""
+    files = {entry.rel_path.replace(os.sep, "/") for entry in manifest if not entry.is_dir}
+    names = {}
+    for entry in manifest:
+        rel_path = entry.rel_path.replace(os.sep, "/")
+        rel_dir, _, name = rel_path.rpartition("/")
+        if entry.is_dir:
+            if f"{rel_path}/__init__.py" in files:
+                names.setdefault(rel_dir, set()).add(name)
+        elif name.endswith(".py") and name != "__init__.py":
+            names.setdefault(rel_dir, set()).add(name[:-3])
+    return names
+
+def _classify_import(item, module_names):
+    """
+    Returns (ecosystem, category, name) for one symbol index Import.
+
+    A Python import is local when it names a module importable from the project
+    root or src/; otherwise the standard library is checked before modules that
+    sit next to the importing file, which only scripts run from their own folder see.
+    """
+    if os.path.splitext(item.rel_path)[1].lower() != ".py":
+        module = item.module
+        if item.level or module.startswith("/"):
+            return "node", "local", module
+        module = module[len("node:"):] if module.startswith("node:") else module
+        parts = module.split("/")
+        package = "/".join(parts[:2]) if module.startswith("@") else parts[0]
+        return "node", "stdlib" if package in NODE_BUILTINS else "third-party", package
+    if item.level:
+        # "from . import x" names the module x itself
+        return "python", "local", "." * item.level + (item.module or item.name or "")
+    top = item.module.split(".")[0]
+    if any(top in module_names.get(root, ()) for root in PYTHON_SOURCE_ROOTS):
+        return "python", "local", top
+    if top in STDLIB_MODULES:
+        return "python", "stdlib", top
+    importer_dir = item.rel_path.replace(os.sep, "/").rpartition("/")[0]
+    if top in module_names.get(importer_dir, ()):
+        return "python", "local", top
+    two_levels = ".".join(item.module.split(".")[:2])
+    distribution = IMPORT_TO_DISTRIBUTION.get(two_levels) or IMPORT_TO_DISTRIBUTION.get(top, top)
+    return "python", "third-party", distribution
+
+def collect_dependencies(project_path, manifest=None, index=None, cache=None):
+    """
+    Extracts the dependencies of a project from its import statements and its
+    dependency manifests, without running or installing anything.
+
+    Imports come from the symbol index (files are parsed again only when their
+    content hash changed) and manifests from the ManifestCache. Python imports are
+    classified as standard library, third-party or local, JavaScript/TypeScript
+    imports as built-in, package or relative.
+
+    Args:
+        project_path (str): Root of the project.
+        manifest (list, optional): scan_project result to reuse instead of scanning again.
+        index (SymbolIndex, optional): Defaults to the process-wide index.
+        cache (ManifestCache, optional): Defaults to the cache under utils/cache.
+
+    Returns:
+        ProjectDependencies: Sorted dependencies, the declared Python version (or
+        None) and the relative paths of the manifests read.
+    """
+    if manifest is None:
+        manifest = scan_project(project_path)
+    if index is None:
+        from core.symbols import get_symbol_index
+        index = get_symbol_index()
+    if cache is None:
+        cache = ManifestCache()
+
+    declared, locked, declared_in = {}, {}, {}
+    python_requires = None
+    manifests = []
+    for entry in manifest:
+        if entry.is_dir or not is_manifest_file(entry.name):
+            continue
+        try:
+            with open(entry.path, "rb") as f:
+                parsed = cache.parse(entry.name, f.read())
+        except OSError as e:
+            logger.warning("Cannot read dependency manifest %s: %s", entry.path, e)
+            continue
+        rel_path = entry.rel_path.replace(os.sep, "/")
+        manifests.append(rel_path)
+        ecosystem = parsed["ecosystem"]
+        python_requires = python_requires or parsed["python_requires"]
+        for name, spec in parsed["declared"].items():
+            key = (ecosystem, name)
+            declared[key] = declared.get(key) or spec
+            declared_in.setdefault(key, []).append(rel_path)
+        for name, version in parsed["locked"].items():
+            locked.setdefault((ecosystem, name), version)
+    cache.save()
+
+    index.update(project_path, manifest)
+    module_names = _python_module_names(manifest)
+    importers = {}
+    for item in index.imports(project_path):
+        ecosystem, category, name = _classify_import(item, module_names)
+        importers.setdefault((ecosystem, category, name), set()).add(item.rel_path)
+
+    dependencies = {}
+    for (ecosystem, category, name), files in importers.items():
+        key = (ecosystem, normalize_name(name) if ecosystem == "python" and category == "third-party" else name)
+        if category == "third-party":
+            dependencies[key] = Dependency(ecosystem, category, name, declared.get(key, ""), locked.get(key, ""),
+                                           tuple(declared_in.get(key, ())), len(files))
+        else:
+            dependencies[(ecosystem, category, name)] = Dependency(ecosystem, category, name, "", "", (), len(files))
+    for key, spec in declared.items():
+        if key not in dependencies:
+            # Declared but never imported: plugins, CLI tools, test runners or import names that differ
+            dependencies[key] = Dependency(key[0], "third-party", key[1], spec, locked.get(key, ""),
+                                           tuple(declared_in[key]), 0)
+    ordered = sorted(dependencies.values(), key=lambda d: (d.ecosystem, d.category, d.name.lower()))
+    return ProjectDependencies(ordered, python_requires, manifests)
+
+def get_project_dependencies(project_path, manifest=None, report=None):
+    """
+    Extracts the project's dependencies for the Dependencies section.
+
+    Returns:
+        ProjectDependencies: See collect_dependencies; None if the symbol index or
+        the manifest cache could not be used.
+    """
+    # sqlite3 is only imported once dependencies are extracted
+    import sqlite3
+    try:
+        with measure(report, "dependencies"):
+            return collect_dependencies(project_path, manifest)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Could not extract dependencies: %s", e)
+        return None
+
+def _describe(dependency):
+    """Formats one third-party dependency with its versions and where it comes from."""
+    text = dependency.name
+    if dependency.spec:
+        text += f" {dependency.spec}"
+    if dependency.locked:
+        text += f" (locked {dependency.locked})"
+    details = []
+    if dependency.declared_in:
+        details.append(f"declared in {', '.join(dependency.declared_in)}")
+    if dependency.imported_by:
+        details.append(f"imported by {dependency.imported_by} file{'s' if dependency.imported_by != 1 else ''}")
+    else:
+        details.append("not imported")
+    if not dependency.declared_in:
+        details.append("not declared")
+    return f"{text}: {'; '.join(details)}"
+
+def group_dependencies(project_dependencies):
+    """
+    Groups dependencies for display, shared by the TXT and DOCX output.
+
+    Returns:
+        list[tuple]: (title, items, inline) per non-empty group; inline groups are
+        short names meant to be joined on one line.
+    """
+    groups = []
+    for ecosystem, category, title in CATEGORY_TITLES:
+        members = [d for d in project_dependencies.dependencies if d.ecosystem == ecosystem and d.category == category]
+        if not members:
+            continue
+        if category == "third-party":
+            groups.append((title, [_describe(d) for d in members], False))
+        else:
+            groups.append((title, [d.name for d in members], True))
+    return groups
+
+def format_dependency_section(project_dependencies):
+    """
+    Renders the Dependencies section of the TXT documentation.
+
+    Returns:
+        list[str]: Lines of the section, ending with a blank line.
+    """
+    lines = ["## Dependencies\n\n"]
+    if project_dependencies.manifests:
+        lines.append(f"Manifests: {', '.join(project_dependencies.manifests)}\n")
+    if project_dependencies.python_requires:
+        lines.append(f"Python version: {project_dependencies.python_requires}\n")
+    groups = group_dependencies(project_dependencies)
+    if not groups:
+        lines.append("No dependencies found.\n")
+    for title, items, inline in groups:
+        lines.append(f"\n{title}:\n")
+        if inline:
+            lines.append(", ".join(items) + "\n")
+        else:
+            lines.extend(f"- {item}\n" for item in items)
+    lines.append("\n")
+    return lines
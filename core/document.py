@@ -1,67 +1,71 @@
 import os
-from PyQt5.QtWidgets import QFileDialog, QMessageBox, QInputDialog
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
+import json
+import time
+import logging
 from datetime import datetime
 
-from core.utils import has_any_extension, _read_file_content  # Import _read_file_content
+from core.utils import has_any_extension, read_file_with_policy, estimate_tokens, SHARD_MANIFEST_SUFFIX
 from utils.file_utils import get_base_dir
+from core.project import get_project_structure
+from core.tokens import TokenEstimator
+from core.scanner import scan_project, walk_manifest
+from core.processor import format_file_block
+from core.dependencies import format_dependency_section, get_project_dependencies, group_dependencies
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
 
 def select_file(main_window):
     """Handle documentation file selection, remembering the last location."""
+    from PyQt5.QtWidgets import QFileDialog
     file_path, _ = QFileDialog.getOpenFileName(
         main_window,
         "Select Documentation File",
         main_window.recent_doc_path,
-        "Documentation files (*.txt *.docx);;All files (*.*)",
+        "Documentation files (*.txt *.docx *.shards.json);;All files (*.*)",
     )
     if file_path:
         main_window.doc_file_path = file_path
         main_window.recent_doc_path = os.path.dirname(file_path)
-        print(f"Selected file: {main_window.doc_file_path}")
+        logger.info("Selected file: %s", main_window.doc_file_path)
 
 def reset_doc_selection(main_window):
     """Resets the documentation file selection."""
+    from PyQt5.QtWidgets import QMessageBox
     main_window.doc_file_path = None
     main_window.recent_doc_path = ""
-    print("Documentation file selection reset.")
+    logger.info("Documentation file selection reset.")
     QMessageBox.information(main_window, "Reset", "Documentation file selection has been reset.")
 
-def convert_project_to_text(main_window, project_path, llm_overview=None):
+def _finish_run_report(main_window, output_dir):
+    """
+    Saves the run's performance report into output_dir and prints its summary.
+
+    Returns:
+        str: Summary text to append to the success message, or "" without a report.
+    """
+    report = getattr(main_window, "run_report", None)
+    if report is None:
+        return ""
+    report.finish()
+    report_path = report.save(output_dir)
+    summary = report.summary()
+    logger.info("%s", summary)
+    if report_path:
+        logger.info("Performance report saved to: %s", report_path)
+    return f"\n\n{summary}"
+
+def convert_project_to_text(main_window, project_path, llm_overview=None, manifest=None, dependencies=None):
     """
     Converts project files to a single text documentation file in Markdown format,
     handling various extensions and recognizing code blocks.
-    """
-
-    def get_project_structure(directory):
-        """Creates a string representation of the project directory structure."""
-        structure = []
-        base_path = os.path.basename(directory)
-        structure.append(f"{base_path}/")
-
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if d != "__pycache__" and not d.startswith(".")]
-            level = os.path.relpath(root, directory).count(os.sep) + 1
-            if level > 1:
-                indent = "  " * (level - 1) + "+-- "
-            else:
-                indent = ""
-
-            for dir_name in sorted(dirs):
-                structure.append(f"{indent}{dir_name}/")
 
-            sub_indent = "  " * level + "+-- "
-            for file in sorted(files):
-                if not file.startswith("."):
-                    structure.append(f"{sub_indent}{file}")
+    manifest may be a scan_project result already taken for this run, and
+    dependencies a get_project_dependencies result.
+    """
+    from PyQt5.QtWidgets import QMessageBox
 
-        return "\n".join(structure)
-
-    incompatible_files = []
-    incompatible_structure = []
-    output_lines = []
+    report = getattr(main_window, "run_report", None)
 
     timestamp = datetime.now().strftime("%d.%m.%Y_%H_%M_%S")
     base_filename = f"project_documentation_{timestamp}"
@@ -75,57 +79,48 @@ def convert_project_to_text(main_window, project_path, llm_overview=None):
         os.makedirs(output_dir_selected, exist_ok=True)
         for file_path in main_window.selected_files_for_compression:
             try:
-                content = _read_file_content(file_path)  # Call _read_file_content directly
+                content, policy_note = read_file_with_policy(file_path, report=report)
+                if content is None:
+                    logger.warning("Skipping individual file for %s: %s", file_path, policy_note)
+                    continue
+                if policy_note:
+                    content = f"Size policy: {policy_note}\n\n{content}"
                 output_file_name = os.path.basename(file_path) + ".txt"
                 output_path = os.path.join(output_dir_selected, output_file_name)
-                with open(output_path, 'w', encoding='utf-8') as outfile:
-                    outfile.write(content)
-                print(f"Created individual file: {output_path}")
+                with measure(report, "write"):
+                    with open(output_path, 'w', encoding='utf-8') as outfile:
+                        outfile.write(content)
+                logger.debug("Created individual file: %s", output_path)
             except Exception as e:
-                print(f"Error creating individual file for {file_path}: {e}")
+                logger.error("Error creating individual file for %s: %s", file_path, e)
                 QMessageBox.warning(main_window, "Error", f"Error creating individual file for {os.path.basename(file_path)}.")
 
-    output_lines.append(f"# Project Documentation: {os.path.basename(project_path)}\n")
-    output_lines.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-    if llm_overview:
-        output_lines.append("## PROJECT GENERAL OVERVIEW\n\n")
-        output_lines.append(llm_overview + "\n\n")
-
-    output_lines.append("## Project Structure\n\n```\n")
-    structure = get_project_structure(project_path)
-    output_lines.append(structure)
-    output_lines.append("\n```\n\n")
-
-    output_lines.append("## Files Content\n\n")
-
-    for root, dirs, files in os.walk(project_path):
-        print(f"Processing root: {root}")
-        print(f"Current dirs: {dirs}")
-        print(f"Current files: {files}")
-
-        dirs[:] = [d for d in dirs if d != "__pycache__" and not d.startswith(".")]
-        for file in files:
-            if file.startswith("."):
-                continue
-
-            file_lines = main_window._process_single_file(root, file, project_path)
-            output_lines.extend(file_lines)
-
-            # Handle incompatible files
-            if not file_lines or file.endswith((".wasm", ".snap")):
-                rel_path = os.path.relpath(os.path.join(root, file), project_path)
-                incompatible_files.append(rel_path)
-                level = rel_path.count(os.sep)
-                indent = "  " * level
-                incompatible_structure.append(f"{indent}{os.path.basename(rel_path)}")
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    shard_max_bytes = app_settings.get("shard_max_bytes") or None
+    shard_max_tokens = app_settings.get("shard_max_tokens") or None
+
+    token_estimator = None
+    if app_settings.get("structure_token_estimates", True):
+        token_estimator = TokenEstimator(exact=app_settings.get("exact_token_counts", True))
+
+    if dependencies is None and app_settings.get("dependency_section", True):
+        if manifest is None:
+            with measure(report, "scan"):
+                manifest = scan_project(project_path)
+        dependencies = get_project_dependencies(project_path, manifest, report)
+
+    header_lines, blocks, incompatible_files = build_project_sections(
+        project_path,
+        manifest=manifest,
+        llm_overview=llm_overview,
+        report=report,
+        process_file=main_window._process_single_file,
+        token_estimator=token_estimator,
+        dependencies=dependencies,
+    )
 
     if incompatible_files:
-        incompatible_file_path = os.path.join(output_dir, "incompatible_files.txt")
-        with open(incompatible_file_path, "w", encoding="utf-8") as incompatible_file:
-            incompatible_file.write("Incompatible files:\n")
-            incompatible_file.write("\n".join(incompatible_files))
-
+        incompatible_file_path = write_incompatible_files(output_dir, incompatible_files)
         QMessageBox.information(
             main_window,
             "Info",
@@ -134,35 +129,226 @@ def convert_project_to_text(main_window, project_path, llm_overview=None):
         )
 
     try:
-        with open(output_file_with_timestamp, "w", encoding="utf-8") as outfile:
-            outfile.writelines(output_lines)
+        with measure(report, "write"):
+            if shard_max_bytes or shard_max_tokens:
+                output_file_with_timestamp = write_shards(
+                    output_dir, base_filename, os.path.basename(project_path),
+                    header_lines, blocks, shard_max_bytes, shard_max_tokens,
+                )
+            else:
+                with open(output_file_with_timestamp, "w", encoding="utf-8") as outfile:
+                    outfile.writelines(header_lines)
+                    for _rel_path, file_lines in blocks:
+                        outfile.writelines(file_lines)
 
+        summary = _finish_run_report(main_window, output_dir)
         QMessageBox.information(
             main_window,
             "Success",
             "Documentation generated successfully!\n"
-            f"Saved to: {output_file_with_timestamp}",
+            f"Saved to: {output_file_with_timestamp}{summary}",
         )
         return True
 
     except Exception as e:
-        print(f"Error during text conversion: {e}")
+        logger.error("Error during text conversion: %s", e)
         QMessageBox.critical(main_window, "Error", f"An error occurred: {str(e)}")
         return False
 
-def create_project_documentation(main_window, project_path, llm_content=None):
+def build_project_text(project_path, manifest=None, llm_overview=None, report=None, process_file=None,
+                       token_estimator=None, dependencies=None):
     """
-    Creates detailed project documentation in DOCX format, handling more extensions and recognizing code blocks.
+    Builds the Markdown text documentation of a project without any GUI interaction.
+
+    Args:
+        project_path (str): Root of the project.
+        manifest (list, optional): scan_project result to reuse instead of scanning again.
+        llm_overview (str, optional): Overview to put before the project structure.
+        report (RunReport, optional): Report collecting stage timings.
+        process_file (callable, optional): Called as process_file(root, file, project_path,
+            rel_path=..., size=...) for every file; defaults to format_file_block.
+        token_estimator (TokenEstimator, optional): Annotates the structure with token counts.
+        dependencies (ProjectDependencies, optional): Rendered as a Dependencies section.
+
+    Returns:
+        tuple: (output_lines, incompatible_files) with relative paths of the files
+        that could not be included.
     """
-    print(
-        f"Creating DOCX project documentation for: {project_path}"
+    header_lines, blocks, incompatible_files = build_project_sections(
+        project_path, manifest, llm_overview, report, process_file, token_estimator, dependencies
     )
+    output_lines = header_lines
+    for _rel_path, file_lines in blocks:
+        output_lines.extend(file_lines)
+    return output_lines, incompatible_files
+
+def build_project_sections(project_path, manifest=None, llm_overview=None, report=None, process_file=None,
+                           token_estimator=None, dependencies=None):
+    """
+    Like build_project_text, but keeps every file's section separate so the output
+    can be split at file boundaries.
+
+    Returns:
+        tuple: (header_lines, blocks, incompatible_files) where header_lines run up to
+        and including the Files Content header and blocks holds (rel_path, file_lines).
+    """
+    if process_file is None:
+        def process_file(root, file, project_path, rel_path=None, size=None):
+            return format_file_block(os.path.join(root, file), rel_path, size=size, report=report)
+
+    incompatible_files = []
+    header_lines = []
+    blocks = []
+
+    header_lines.append(f"# Project Documentation: {os.path.basename(project_path)}\n")
+    header_lines.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+    if llm_overview:
+        header_lines.append("## PROJECT GENERAL OVERVIEW\n\n")
+        header_lines.append(llm_overview + "\n\n")
+
+    header_lines.append("## Project Structure\n\n```\n")
+    if manifest is None:
+        with measure(report, "scan"):
+            manifest = scan_project(project_path)
+    token_counts = None
+    if token_estimator is not None:
+        with measure(report, "tokens"):
+            token_counts = token_estimator.count_manifest(manifest)
+            token_estimator.save()
+    with measure(report, "format"):
+        structure = get_project_structure(
+            project_path, manifest, token_counts, approximate=not (token_estimator and token_estimator.is_exact)
+        )
+    header_lines.append(structure)
+    header_lines.append("\n```\n\n")
+
+    if dependencies is not None:
+        header_lines.extend(format_dependency_section(dependencies))
+
+    header_lines.append("## Files Content\n\n")
+
+    for root, rel_root, dirs, files in walk_manifest(project_path, manifest):
+        logger.debug("Processing root: %s (%d dirs, %d files)", root, len(dirs), len(files))
+
+        for entry in files:
+            file = entry.name
+            file_lines = process_file(root, file, project_path, rel_path=entry.rel_path, size=entry.size)
+            if file_lines:
+                blocks.append((entry.rel_path, file_lines))
+
+            # Handle incompatible files
+            if not file_lines or file.endswith((".wasm", ".snap")):
+                incompatible_files.append(entry.rel_path)
+
+    return header_lines, blocks, incompatible_files
+
+def plan_shards(header_lines, blocks, max_bytes=None, max_tokens=None):
+    """
+    Groups documentation sections into shards that stay under a size limit.
+
+    Shards break between file sections only; a single section larger than the limit
+    gets a shard of its own. The header counts towards the first shard.
+
+    Args:
+        max_bytes (int, optional): Maximum UTF-8 size of a shard.
+        max_tokens (int, optional): Maximum estimated token count of a shard.
+
+    Returns:
+        list[list[tuple]]: Shards as lists of (rel_path, file_lines, bytes, tokens).
+    """
+    def measure_lines(lines):
+        text = "".join(lines)
+        return len(text.encode("utf-8")), estimate_tokens(text)
+
+    header_bytes, header_tokens = measure_lines(header_lines)
+    shards = [[]]
+    used_bytes, used_tokens = header_bytes, header_tokens
+    for rel_path, file_lines in blocks:
+        size, tokens = measure_lines(file_lines)
+        over = (max_bytes and used_bytes + size > max_bytes) or (max_tokens and used_tokens + tokens > max_tokens)
+        if over and shards[-1]:
+            shards.append([])
+            used_bytes, used_tokens = 0, 0
+        shards[-1].append((rel_path, file_lines, size, tokens))
+        used_bytes += size
+        used_tokens += tokens
+    return shards
+
+def write_shards(output_dir, base_filename, project_name, header_lines, blocks, max_bytes=None, max_tokens=None):
+    """
+    Writes the documentation as numbered shard files plus a JSON manifest.
+
+    The first shard holds the header and structure; every shard has a Files Content
+    section, so each one can be uploaded and read on its own.
+
+    Returns:
+        str: Path of the <base_filename>.shards.json manifest.
+    """
+    shards = plan_shards(header_lines, blocks, max_bytes, max_tokens)
+    entries = []
+    for number, shard in enumerate(shards, start=1):
+        file_name = f"{base_filename}_part{number:03d}.txt"
+        if number == 1:
+            lines = list(header_lines)
+        else:
+            lines = [
+                f"# Project Documentation: {project_name} (part {number} of {len(shards)})\n\n",
+                "## Files Content\n\n",
+            ]
+        for _rel_path, file_lines, _size, _tokens in shard:
+            lines.extend(file_lines)
+        data = "".join(lines).encode("utf-8")
+        with open(os.path.join(output_dir, file_name), "wb") as outfile:
+            outfile.write(data)
+        size, tokens = len(data), estimate_tokens(data.decode("utf-8"))
+        entries.append({
+            "file": file_name,
+            "bytes": size,
+            "estimated_tokens": tokens,
+            "files": [rel_path.replace(os.sep, "/") for rel_path, _lines, _size, _tokens in shard],
+            "oversized": bool((max_bytes and size > max_bytes) or (max_tokens and tokens > max_tokens)),
+        })
+
+    manifest_path = os.path.join(output_dir, f"{base_filename}{SHARD_MANIFEST_SUFFIX}")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "project": project_name,
+            "max_bytes": max_bytes,
+            "max_tokens": max_tokens,
+            "shards": entries,
+        }, f, indent=4)
+    return manifest_path
+
+def write_incompatible_files(output_dir, incompatible_files):
+    """Writes the list of incompatible files into output_dir and returns its path."""
+    incompatible_file_path = os.path.join(output_dir, "incompatible_files.txt")
+    with open(incompatible_file_path, "w", encoding="utf-8") as incompatible_file:
+        incompatible_file.write("Incompatible files:\n")
+        incompatible_file.write("\n".join(incompatible_files))
+    return incompatible_file_path
+
+def create_project_documentation(main_window, project_path, llm_content=None, manifest=None, dependencies=None):
+    """
+    Creates detailed project documentation in DOCX format, handling more extensions and recognizing code blocks.
+
+    manifest may be a scan_project result already taken for this run, and
+    dependencies a get_project_dependencies result.
+    """
+    from PyQt5.QtWidgets import QMessageBox
+    logger.info("Creating DOCX project documentation for: %s", project_path)
     timestamp = datetime.now().strftime("%d.%m.%Y_%H_%M_%S")
     base_filename = f"project_documentation_{timestamp}"
     output_dir = os.path.join(project_path, base_filename)
     os.makedirs(output_dir, exist_ok=True)
     output_file = os.path.join(output_dir, f"{base_filename}.docx")
-    print(f"Output file: {output_file}")
+    logger.info("Output file: %s", output_file)
+    report = getattr(main_window, "run_report", None)
+    # python-docx is only imported when a DOCX is actually written or read
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
     doc = Document()
 
     # Define styles
@@ -209,12 +395,16 @@ def create_project_documentation(main_window, project_path, llm_content=None):
         "This documentation provides a comprehensive overview of the project structure and contents."
     )
     doc.add_paragraph("Project Details:", style="Custom Heading 3")
+    if manifest is None:
+        with measure(report, "scan"):
+            manifest = scan_project(project_path)
+    project_files = list(walk_manifest(project_path, manifest))
     project_name = os.path.basename(project_path)
     details = [
         f"Project Name: {project_name}",
         f'Documentation Date: {datetime.now().strftime("%Y-%m-%d")}',
-        f'Number of Python Files: {sum(1 for root, _, files in os.walk(project_path) for file in files if file.endswith(".py"))}',
-        f'Number of Log Files: {sum(1 for root, _, files in os.walk(project_path) for file in files if file.endswith(".log"))}',
+        f'Number of Python Files: {sum(1 for _, _, _, files in project_files for entry in files if entry.name.endswith(".py"))}',
+        f'Number of Log Files: {sum(1 for _, _, _, files in project_files for entry in files if entry.name.endswith(".log"))}',
     ]
     for detail in details:
         doc.add_paragraph(detail, style="List Bullet")
@@ -225,19 +415,17 @@ def create_project_documentation(main_window, project_path, llm_content=None):
     structure = []
     incompatible_files = []
     incompatible_structure = []
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d != "__pycache__" and not d.startswith(".")]
-        level = root.replace(project_path, "").count(os.sep)
+    for root, rel_root, _, files in project_files:
+        level = rel_root.count(os.sep) + 1 if rel_root else 0
         indent = "    " * level
         folder = os.path.basename(root)
         structure.append(f"{indent}{folder}/")
-        for file in sorted(files):
-            if not file.startswith("."):
-                if has_any_extension(file, [".py", ".json", ".log", ".yaml", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]):
-                    structure.append(f"{indent}    {file}")
-                else:
-                    incompatible_files.append(os.path.relpath(os.path.join(root, file), project_path))
-                    incompatible_structure.append(f"{indent}    {file}")
+        for entry in files:
+            if has_any_extension(entry.name, [".py", ".json", ".log", ".yaml", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]):
+                structure.append(f"{indent}    {entry.name}")
+            else:
+                incompatible_files.append(entry.rel_path)
+                incompatible_structure.append(f"{indent}    {entry.name}")
     doc.add_paragraph().add_run("\n".join(structure)).font.name = "Courier New"
 
     # Create individual files for selected files within the documentation folder
@@ -246,32 +434,46 @@ def create_project_documentation(main_window, project_path, llm_content=None):
         os.makedirs(output_dir_selected, exist_ok=True)
         for file_path in main_window.selected_files_for_compression:
             try:
-                content = _read_file_content(file_path)  # Call _read_file_content directly
+                content, policy_note = read_file_with_policy(file_path, report=report)
+                if content is None:
+                    logger.warning("Skipping individual file for %s: %s", file_path, policy_note)
+                    continue
+                if policy_note:
+                    content = f"Size policy: {policy_note}\n\n{content}"
                 output_file_name = os.path.basename(file_path) + ".txt"
                 output_path = os.path.join(output_dir_selected, output_file_name)
-                with open(output_path, 'w', encoding='utf-8') as outfile:
-                    outfile.write(content)
-                print(f"Created individual file: {output_path}")
+                with measure(report, "write"):
+                    with open(output_path, 'w', encoding='utf-8') as outfile:
+                        outfile.write(content)
+                logger.debug("Created individual file: %s", output_path)
             except Exception as e:
-                print(f"Error creating individual file for {file_path}: {e}")
+                logger.error("Error creating individual file for %s: %s", file_path, e)
                 QMessageBox.warning(main_window, "Error", f"Error creating individual file for {os.path.basename(file_path)}.")
 
     doc.add_heading("3. Code and Log Files Documentation", level=1)
 
-    for root, _, files in os.walk(project_path):
-        for file in files:
-            if has_any_extension(file, [".py", ".json", ".log", ".yaml", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]) and not file.startswith("."):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, project_path)
+    for _, _, _, files in project_files:
+        for entry in files:
+            if has_any_extension(entry.name, [".py", ".json", ".log", ".yaml", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]):
+                file_path = entry.path
+                rel_path = entry.rel_path
 
                 doc.add_heading(f"File: {rel_path}", level=2)
 
                 try:
-                    content = _read_file_content(file_path)  # Call _read_file_content directly
-                    p = doc.add_paragraph()
-                    run = p.add_run(content)
-                    run.font.name = "Courier New"
-                    run.font.size = Pt(9)
+                    started = time.perf_counter()
+                    content, policy_note = read_file_with_policy(file_path, size=entry.size, report=report)
+                    if report is not None:
+                        report.record_file(rel_path, entry.size, time.perf_counter() - started)
+                    if policy_note:
+                        doc.add_paragraph(f"Size policy: {policy_note}")
+                    if content is None:
+                        continue
+                    with measure(report, "format"):
+                        p = doc.add_paragraph()
+                        run = p.add_run(content)
+                        run.font.name = "Courier New"
+                        run.font.size = Pt(9)
                 except Exception as e:
                     doc.add_paragraph(f"Error reading file: {str(e)}")
 
@@ -294,16 +496,26 @@ def create_project_documentation(main_window, project_path, llm_content=None):
         doc.add_paragraph("LLM documentation was not requested for this document.")
 
     doc.add_heading("5. Dependencies", level=1)
-    doc.add_paragraph("List of potential project dependencies:", style="Custom Heading 3")
-    doc.add_paragraph("To be filled manually with:")
-    dependencies = [
-        "Required Python version",
-        "Required external packages",
-        "System requirements",
-        "Additional software dependencies",
-    ]
-    for dep in dependencies:
-        doc.add_paragraph(dep, style="List Bullet")
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    if dependencies is None and app_settings.get("dependency_section", True):
+        dependencies = get_project_dependencies(project_path, manifest, report)
+    if dependencies is None:
+        doc.add_paragraph("Dependencies were not extracted for this document.")
+    else:
+        if dependencies.manifests:
+            doc.add_paragraph(f"Manifests: {', '.join(dependencies.manifests)}")
+        if dependencies.python_requires:
+            doc.add_paragraph(f"Python version: {dependencies.python_requires}")
+        groups = group_dependencies(dependencies)
+        if not groups:
+            doc.add_paragraph("No dependencies found.")
+        for title, items, inline in groups:
+            doc.add_paragraph(f"{title}:", style="Custom Heading 3")
+            if inline:
+                doc.add_paragraph(", ".join(items))
+            else:
+                for item in items:
+                    doc.add_paragraph(item, style="List Bullet")
 
     doc.add_heading("6. Setup Instructions", level=1)
     doc.add_paragraph("Template for setup instructions:", style="Custom Heading 3")
@@ -318,21 +530,23 @@ def create_project_documentation(main_window, project_path, llm_content=None):
         doc.add_paragraph(instruction, style="List Bullet")
 
     try:
-        doc.save(output_file)
+        with measure(report, "docx_save"):
+            doc.save(output_file)
+        summary = _finish_run_report(main_window, output_dir)
         QMessageBox.information(
             main_window,
             "Success",
             "Documentation generated successfully!\n"
-            f"Saved to: {output_file}"
+            f"Saved to: {output_file}{summary}"
         )
-        print(f"DOCX documentation generated successfully at: {output_file}")
+        logger.info("DOCX documentation generated successfully at: %s", output_file)
     except Exception as e:
         QMessageBox.critical(
             main_window,
             "Error",
             f"An error occurred while saving: {str(e)}"
         )
-        print(f"Error during DOCX generation: {str(e)}")
+        logger.error("Error during DOCX generation: %s", str(e))
 
 def convert_docx_to_txt(docx_path):
     """
@@ -345,6 +559,7 @@ def convert_docx_to_txt(docx_path):
         str: Path to the converted TXT file, or None if an error occurred.
     """
     try:
+        from docx import Document
         doc = Document(docx_path)
         txt_path = os.path.join(
             os.path.dirname(docx_path),
@@ -358,5 +573,5 @@ def convert_docx_to_txt(docx_path):
         return txt_path
 
     except Exception as e:
-        print(f"Error converting DOCX to TXT: {str(e)}")
+        logger.error("Error converting DOCX to TXT: %s", str(e))
         return None
@@ -0,0 +1,308 @@
+import ast
+import io
+import json
+import logging
+import os
+import re
+import tokenize
+
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".js", ".mjs", ".cjs", ".cts", ".mts", ".ts", ".tsx")
+CSS_EXTENSIONS = (".css", ".scss")
+JSON_EXTENSIONS = (".json", ".map")
+
+# Characters after which a "/" starts a regular expression literal rather than a division
+_JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await", "delete", "throw")
+_CSS_TIGHT = re.compile(r"\s*([{};,])\s*")
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+
+def _needs_space(previous, current):
+    """True if two adjacent Python tokens would merge without a space between them."""
+    if not previous or not current:
+        return False
+    if previous[-1] in _WORD_CHARS and current[0] in _WORD_CHARS:
+        return True
+    # '' 'x' must not turn into the triple quote '''x'
+    if previous[-1] in "\"'" and current[0] in "\"'":
+        return True
+    # "1 .real" would become the invalid literal "1.real"
+    return previous[-1].isdigit() and current[0] == "."
+
+def minify_python(source, drop_docstrings=False):
+    """
+    Removes comments, blank lines and redundant whitespace from Python source.
+
+    Indentation is reduced to one space per level and every logical line is
+    re-joined onto one physical line. String literals, including f-strings, are
+    copied verbatim. With drop_docstrings, bare string statements are removed and
+    blocks left empty get a "pass".
+
+    Returns:
+        str: The minified source, or source unchanged if it does not tokenize or the
+        result does not parse.
+    """
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    def position(row_col):
+        return offsets[row_col[0] - 1] + row_col[1]
+
+    out = []
+    current = []
+    level = 0
+    depth = 0
+    block_statements = [0]
+    fstring_start = None
+    fstring_nesting = 0
+    fstring_types = (getattr(tokenize, "FSTRING_START", None), getattr(tokenize, "FSTRING_END", None))
+
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (tokenize.TokenError, SyntaxError, IndentationError):
+        return source
+
+    for index, tok in enumerate(tokens):
+        tok_type, text = tok.type, tok.string
+        if fstring_start is not None:
+            # Python 3.12+ splits f-strings into parts; copy the literal from the source instead
+            if tok_type == fstring_types[0]:
+                fstring_nesting += 1
+            elif tok_type == fstring_types[1]:
+                fstring_nesting -= 1
+                if fstring_nesting == 0:
+                    literal = source[fstring_start:position(tok.end)]
+                    if current and _needs_space(current[-1], literal):
+                        current.append(" ")
+                    current.append(literal)
+                    fstring_start = None
+            continue
+        if tok_type == fstring_types[0] and tok_type is not None:
+            fstring_start = position(tok.start)
+            fstring_nesting = 1
+            continue
+        if tok_type in (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER):
+            continue
+        if tok_type == tokenize.INDENT:
+            level += 1
+            block_statements.append(0)
+            continue
+        if tok_type == tokenize.DEDENT:
+            if block_statements.pop() == 0:
+                out.append(" " * level + "pass")
+            level -= 1
+            block_statements[-1] += 1
+            continue
+        if tok_type == tokenize.NEWLINE:
+            if current:
+                out.append(" " * level + "".join(current))
+                block_statements[-1] += 1
+                current = []
+            continue
+        if (drop_docstrings and tok_type == tokenize.STRING and not current and depth == 0
+                and index + 1 < len(tokens) and tokens[index + 1].type == tokenize.NEWLINE):
+            # A bare string statement has no effect besides setting __doc__
+            tokens[index + 1] = tokens[index + 1]._replace(type=tokenize.NL)
+            continue
+        if tok_type == tokenize.OP:
+            if text in "([{":
+                depth += 1
+            elif text in ")]}":
+                depth -= 1
+        if current and _needs_space(current[-1], text):
+            current.append(" ")
+        current.append(text)
+
+    if current:
+        out.append(" " * level + "".join(current))
+    result = "\n".join(out) + "\n" if out else ""
+    try:
+        ast.parse(result)
+    except (SyntaxError, ValueError):
+        logger.debug("Minified Python did not parse, keeping the original source")
+        return source
+    return result
+
+def minify_json(source):
+    """Re-serializes JSON without whitespace; invalid JSON is returned unchanged."""
+    try:
+        return json.dumps(json.loads(source), separators=(",", ":"), ensure_ascii=False)
+    except ValueError:
+        return source
+
+def minify_css(source):
+    """Removes comments and collapses whitespace in CSS/SCSS, keeping strings intact."""
+    parts = []
+    i, n = 0, len(source)
+    code_start = 0
+
+    def flush_code(end):
+        code = re.sub(r"\s+", " ", source[code_start:end])
+        parts.append(_CSS_TIGHT.sub(r"\1", code))
+
+    while i < n:
+        c = source[i]
+        if c in "\"'":
+            flush_code(i)
+            end = i + 1
+            while end < n and source[end] != c and source[end] != "\n":
+                end += 2 if source[end] == "\\" else 1
+            parts.append(source[i:end + 1])
+            i = code_start = end + 1
+        elif source.startswith("/*", i):
+            flush_code(i)
+            end = source.find("*/", i + 2)
+            i = code_start = n if end == -1 else end + 2
+            parts.append(" ")
+        elif source.startswith("//", i) and (i == 0 or source[i - 1] in " \t\n;{}"):
+            # SCSS line comment; "//" inside url(http://...) is preceded by ":"
+            flush_code(i)
+            end = source.find("\n", i)
+            i = code_start = n if end == -1 else end
+        else:
+            i += 1
+    flush_code(n)
+    return _CSS_TIGHT.sub(r"\1", "".join(parts)).strip()
+
+def _template_literal_end(source, start):
+    """
+    Returns the index of the backtick closing the template literal opened at start.
+
+    ${...} substitutions are followed by brace depth, so template literals and
+    strings nested inside them do not end the outer literal early.
+    """
+    i, n = start + 1, len(source)
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "`":
+            return i
+        if source.startswith("${", i):
+            i += 2
+            depth = 1
+            while i < n and depth:
+                c = source[i]
+                if c == "`":
+                    i = _template_literal_end(source, i)
+                elif c in "\"'":
+                    i += 1
+                    while i < n and source[i] != c and source[i] != "\n":
+                        i += 2 if source[i] == "\\" else 1
+                elif c == "{":
+                    depth += 1
+                elif c == "}":
+                    depth -= 1
+                i += 1
+            continue
+        i += 1
+    return n
+
+def minify_js(source):
+    """
+    Removes comments, blank lines and indentation from JavaScript/TypeScript.
+
+    Line breaks are kept, so automatic semicolon insertion behaves as before, and
+    strings, template literals and regular expression literals are copied verbatim.
+    """
+    out = []
+    line = []
+    i, n = 0, len(source)
+
+    def last_significant():
+        text = "".join(line).replace("\0", "").rstrip()
+        return text or (out[-1] if out else "")
+
+    def end_line():
+        # Literals are wrapped in \0 markers; odd pieces are verbatim, even pieces are code
+        pieces = "".join(line).split("\0")
+        text = "".join(
+            piece if index % 2 else re.sub(r"\s+", " ", piece)
+            for index, piece in enumerate(pieces)
+        ).strip()
+        if text:
+            out.append(text)
+        line.clear()
+
+    while i < n:
+        c = source[i]
+        if c == "\n":
+            end_line()
+            i += 1
+        elif c == "`":
+            end = _template_literal_end(source, i)
+            line.append("\0" + source[i:end + 1] + "\0")
+            i = end + 1
+        elif c in "\"'":
+            end = i + 1
+            while end < n and source[end] != c:
+                if source[end] == "\\":
+                    end += 1
+                elif source[end] == "\n":
+                    break
+                end += 1
+            line.append("\0" + source[i:end + 1] + "\0")
+            i = end + 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            newlines = source.count("\n", i, n if end == -1 else end)
+            i = n if end == -1 else end + 2
+            line.append(" ")
+            for _ in range(newlines):
+                end_line()
+        elif c == "/":
+            previous = last_significant()
+            is_regex = (not previous or previous[-1] in _JS_REGEX_PRECEDERS
+                        or previous.endswith(_JS_REGEX_KEYWORDS))
+            if not is_regex:
+                line.append(c)
+                i += 1
+                continue
+            end, in_class = i + 1, False
+            while end < n and source[end] != "\n":
+                if source[end] == "\\":
+                    end += 1
+                elif source[end] == "[":
+                    in_class = True
+                elif source[end] == "]":
+                    in_class = False
+                elif source[end] == "/" and not in_class:
+                    break
+                end += 1
+            while end + 1 < n and source[end + 1].isalpha():
+                end += 1
+            line.append("\0" + source[i:end + 1] + "\0")
+            i = end + 1
+        else:
+            line.append(c)
+            i += 1
+    end_line()
+    return "\n".join(out) + "\n" if out else ""
+
+def minify_source(file_name, source, drop_docstrings=False):
+    """
+    Minifies source by file type; unsupported types are returned unchanged.
+
+    Args:
+        file_name (str): Name or path used to pick the minifier.
+        source (str): File content.
+        drop_docstrings (bool): Also remove Python docstrings.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension in PYTHON_EXTENSIONS:
+        return minify_python(source, drop_docstrings)
+    if extension in JS_EXTENSIONS:
+        return minify_js(source)
+    if extension in CSS_EXTENSIONS:
+        return minify_css(source)
+    if extension in JSON_EXTENSIONS:
+        return minify_json(source)
+    return source
@@ -1,93 +1,195 @@
 import os
-from PyQt5.QtWidgets import QMessageBox, QInputDialog, QFileDialog
-from core.utils import has_any_extension, _read_file_content  # Import _read_file_content
+import time
+import logging
+from core.utils import has_any_extension, _read_file_content, read_file_with_policy, content_digest, DOC_EXTENSIONS, SHARD_MANIFEST_SUFFIX  # Import _read_file_content
+from core.scanner import scan_project
+from core.tokens import TokenEstimator, context_budget
+from core.minify import minify_source
+from core.chunker import DEFAULT_CHUNK_TOKENS, chunk_source, pack_chunks
+from core.dependencies import format_dependency_section, get_project_dependencies
+from utils.perf_utils import RunReport, RunProfiler, measure
+
+logger = logging.getLogger(__name__)
+
+# Names of files left out of the LLM input that are still listed for the model
+LLM_OMITTED_LIST_LIMIT = 200
+# Files sent to the LLM
+LLM_EXTENSIONS = [".py", ".json", ".log", ".yaml", ".yml", ".svg", ".lock", ".scss", ".cts", ".cjs", ".js", ".map", ".mts", ".tsx", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]
 
 def process_project(main_window):
     """Handle the main project processing logic."""
-    print("Starting project processing")
+    from PyQt5.QtWidgets import QMessageBox
+    logger.info("Starting project processing")
 
     if main_window.compress_radio.isChecked():
-        print("Compress project option selected")
+        logger.info("Compress project option selected")
         # Handle compression (documentation generation)
         if not main_window.project_path:
             QMessageBox.warning(main_window, "Error", "Please select a project folder first.")
-            print("No project folder selected for compression")
+            logger.warning("No project folder selected for compression")
             return
 
-        # Get selected files for individual compression
-        selected_indexes = main_window.project_tree_view.selectionModel().selectedRows()
-        main_window.selected_files_for_compression = [main_window.file_system_model.filePath(index) for index in selected_indexes if main_window.file_system_model.fileInfo(index).isFile()]
-        print(f"Selected files for individual compression: {main_window.selected_files_for_compression}")
-
-        llm_output = None
-        if main_window.use_llm_check.isChecked():
-            print("Fetching LLM documentation...")
-            project_text_content_for_llm = get_project_content_for_llm(main_window, main_window.project_path)
-            if project_text_content_for_llm:
-                llm_output = main_window.generate_llm_documentation(project_text_content_for_llm)
-                if llm_output:
-                    print("LLM documentation fetched successfully.")
+        # The output stage saves the report and shows its summary
+        report = main_window.run_report = RunReport("compress", main_window.project_path)
+        profiler = _start_profiler(main_window)
+        try:
+            # Get selected files for individual compression, resolved against the scanned
+            # tree so files the view has not loaded yet are included as well
+            with report.stage("scan"):
+                manifest = scan_project(main_window.project_path)
+            main_window.selected_files_for_compression = main_window.selection_trie.resolve(manifest)
+            logger.info("Selected files for individual compression: %s", len(main_window.selected_files_for_compression))
+            app_settings = getattr(main_window, "app_settings", None) or {}
+            if app_settings.get("symbol_index", True):
+                update_symbol_index(main_window.project_path, manifest, report)
+            dependencies = None
+            if app_settings.get("dependency_section", True):
+                dependencies = get_project_dependencies(main_window.project_path, manifest, report)
+
+            llm_output = None
+            if main_window.use_llm_check.isChecked():
+                logger.info("Fetching LLM documentation...")
+                # Extracted locally, so the model does not have to infer them
+                preamble = "".join(format_dependency_section(dependencies)) if dependencies is not None else ""
+                minify = app_settings.get("llm_minify", False)
+                drop_docstrings = app_settings.get("llm_minify_docstrings", False)
+                use_summaries = app_settings.get("llm_summary_cache", True)
+                if use_summaries:
+                    # Only new or changed files are sent; the overview is composed from per-file summaries
+                    llm_input = get_project_files_for_llm(main_window, main_window.project_path, manifest,
+                                                          minify=minify, drop_docstrings=drop_docstrings)
                 else:
-                    print("LLM documentation generation failed.")
+                    llm_input = get_project_content_for_llm(
+                        main_window, main_window.project_path, manifest=manifest, max_tokens=_llm_token_budget(main_window),
+                        minify=minify, drop_docstrings=drop_docstrings,
+                    )
+                if llm_input:
+                    with report.stage("llm"):
+                        if use_summaries:
+                            llm_output = main_window.generate_llm_documentation_from_summaries(
+                                main_window.project_path, llm_input, preamble
+                            )
+                        else:
+                            llm_output = main_window.generate_llm_documentation(preamble + llm_input)
+                    if llm_output:
+                        logger.info("LLM documentation fetched successfully.")
+                    else:
+                        logger.warning("LLM documentation generation failed.")
+                else:
+                    logger.warning("Could not extract project content for LLM.")
             else:
-                print("Could not extract project content for LLM.")
-        else:
-            # Explicitly check the "None" radio button if LLM is not used
-            main_window.none_radio.setChecked(True)
+                # Explicitly check the "None" radio button if LLM is not used
+                main_window.none_radio.setChecked(True)
 
-        if main_window.txt_radio.isChecked():
-            print("TXT format selected")
-            main_window.convert_project_to_text(main_window.project_path, llm_overview=llm_output)
+            if main_window.txt_radio.isChecked():
+                logger.info("TXT format selected")
+                main_window.convert_project_to_text(main_window.project_path, llm_overview=llm_output, manifest=manifest,
+                                                    dependencies=dependencies)
 
-        elif main_window.docx_radio.isChecked():
-            print("DOCX format selected")
-            main_window.create_project_documentation(main_window.project_path, llm_content=llm_output)
+            elif main_window.docx_radio.isChecked():
+                logger.info("DOCX format selected")
+                main_window.create_project_documentation(main_window.project_path, llm_content=llm_output,
+                                                         manifest=manifest, dependencies=dependencies)
+        finally:
+            _finish_profiler(profiler, report, main_window.project_path)
+            main_window.run_report = None
 
     elif main_window.reconstruct_radio.isChecked():
-        print("Reconstruct project option selected")
+        logger.info("Reconstruct project option selected")
         # Handle reconstruction
         if not main_window.doc_file_path:
             QMessageBox.warning(
                 main_window, "Error", "Please select a documentation file first."
             )
-            print("No documentation file selected for reconstruction")
+            logger.warning("No documentation file selected for reconstruction")
             return
 
-        if main_window.doc_file_path.endswith(".txt"):
-            print("TXT format selected for reconstruction")
-            project_name, ok = QInputDialog.getText(
-                main_window, "Project Name", "Enter the name for the reconstructed project:"
+        report = main_window.run_report = RunReport("reconstruct", main_window.doc_file_path)
+        profiler = _start_profiler(main_window)
+        try:
+            _reconstruct_project(main_window)
+        finally:
+            _finish_profiler(profiler, report, os.path.dirname(main_window.doc_file_path))
+            main_window.run_report = None
+
+def update_symbol_index(project_path, manifest=None, report=None):
+    """
+    Brings the project's entry in the shared symbol index up to date.
+
+    Returns:
+        SymbolIndex: The index, or None if its database could not be opened or written.
+    """
+    # sqlite3 is only imported once an index is built
+    import sqlite3
+    from core.symbols import get_symbol_index
+    try:
+        index = get_symbol_index()
+        with measure(report, "symbols"):
+            parsed, removed = index.update(project_path, manifest)
+        logger.info("Symbol index updated: %d file(s) parsed, %d removed", parsed, removed)
+        return index
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Could not update the symbol index: %s", e)
+        return None
+
+def _start_profiler(main_window):
+    """Starts a RunProfiler if profiling was enabled with --profile or the "profile" setting."""
+    if not getattr(main_window, "profile_enabled", False):
+        return None
+    profiler = RunProfiler.from_settings(getattr(main_window, "app_settings", None) or {})
+    profiler.start()
+    return profiler
+
+def _finish_profiler(profiler, report, fallback_dir):
+    """
+    Stops the profiler and writes its files next to the run's performance report,
+    or into fallback_dir when the run ended before producing output.
+    """
+    if profiler is None:
+        return
+    profiler.stop()
+    output_dir = report.output_dir or fallback_dir
+    for path in profiler.save(output_dir, f"{report.operation}_profile"):
+        logger.info("Profile written: %s", path)
+
+def _reconstruct_project(main_window):
+    """Asks for the reconstruction target and recreates the project from the selected documentation file."""
+    from PyQt5.QtWidgets import QFileDialog, QInputDialog, QMessageBox
+    if main_window.doc_file_path.endswith((".txt", SHARD_MANIFEST_SUFFIX)):
+        logger.info("TXT format selected for reconstruction")
+        project_name, ok = QInputDialog.getText(
+            main_window, "Project Name", "Enter the name for the reconstructed project:"
+        )
+        if ok and project_name:
+            save_location = QFileDialog.getExistingDirectory(
+                main_window, "Select Save Location"
             )
-            if ok and project_name:
-                save_location = QFileDialog.getExistingDirectory(
-                    main_window, "Select Save Location"
+            if save_location:
+                main_window.recreate_project_from_text(
+                    main_window.doc_file_path, project_name, save_location
                 )
-                if save_location:
-                    main_window.recreate_project_from_text(
-                        main_window.doc_file_path, project_name, save_location
-                    )
-        elif main_window.doc_file_path.endswith(".docx"):
-            print("DOCX format selected for reconstruction")
-            project_name, ok = QInputDialog.getText(
-                main_window, "Project Name", "Enter the name for the reconstructed project:"
+    elif main_window.doc_file_path.endswith(".docx"):
+        logger.info("DOCX format selected for reconstruction")
+        project_name, ok = QInputDialog.getText(
+            main_window, "Project Name", "Enter the name for the reconstructed project:"
+        )
+        if ok and project_name:
+            save_location = QFileDialog.getExistingDirectory(
+                main_window, "Select Save Location"
             )
-            if ok and project_name:
-                save_location = QFileDialog.getExistingDirectory(
-                    main_window, "Select Save Location"
+            if save_location:
+                main_window.recreate_project_from_docx(
+                    main_window.doc_file_path, project_name, save_location
                 )
-                if save_location:
-                    main_window.recreate_project_from_docx(
-                        main_window.doc_file_path, project_name, save_location
-                    )
-        else:
-            QMessageBox.warning(
-                main_window,
-                "Error",
-                "Invalid documentation file type for reconstruction. Select a .txt file.",
-            )
-            print(
-                f"Invalid documentation file type selected for reconstruction: {main_window.doc_file_path}"
-            )
+    else:
+        QMessageBox.warning(
+            main_window,
+            "Error",
+            "Invalid documentation file type for reconstruction. Select a .txt or .shards.json file.",
+        )
+        logger.warning(
+            "Invalid documentation file type selected for reconstruction: %s", main_window.doc_file_path
+        )
 
 def update_action_state(main_window):
     """Updates the state of the action radio buttons based on the selected file format."""
@@ -99,22 +201,62 @@ def update_action_state(main_window):
         main_window.compress_radio.setEnabled(True)
         main_window.reconstruct_radio.setEnabled(True)
 
-def _process_single_file(main_window, root, file, project_path):
-    """Processes a single file and returns its formatted content as a list of lines."""
+def _process_single_file(main_window, root, file, project_path, rel_path=None, size=None):
+    """
+    Processes a single file and returns its formatted content as a list of lines.
+
+    rel_path and size may be passed from a scan_project manifest to avoid
+    recomputing them per file.
+    """
     file_path = os.path.join(root, file)
-    rel_path = os.path.relpath(file_path, project_path)
-    print(f"Processing file: {rel_path}")
+    if rel_path is None:
+        rel_path = os.path.relpath(file_path, project_path)
+    return format_file_block(file_path, rel_path, size=size, report=getattr(main_window, "run_report", None))
+
+def format_file_block(file_path, rel_path, size=None, report=None):
+    """
+    Formats one file as a "### File:" section with a fenced code block.
+
+    This is the GUI-independent part of _process_single_file, shared with batch mode.
+
+    Returns:
+        list[str]: The section's lines, or [] if the extension is not supported.
+    """
+    return build_file_block(file_path, rel_path, size=size, report=report)[0]
+
+def build_file_block(file_path, rel_path, size=None, report=None):
+    """
+    Like format_file_block, but also returns what was placed in the section.
+
+    Returns:
+        tuple: (file_lines, content, policy_note) where content is None if the file
+        was not supported, could not be read or was skipped by its size policy, and
+        policy_note is the size policy applied, if any.
+    """
+    file = os.path.basename(file_path)
+    logger.debug("Processing file: %s", rel_path)
 
     file_lines = []
+    content = policy_note = None
 
-    if has_any_extension(file, [".py", ".json", ".log", ".yaml", ".yml", ".svg", ".lock", ".scss", ".cts", ".cjs", ".js", ".map", ".mts", ".tsx", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html", ".mdx", ".css", ".markdown", ".node", ".cmd", ".ninja", ".sh", ".cc", ".cs", ".bash", ".fish", ".ps1", ".zsh"]):
-        print(f"Matched extension for: {rel_path}")
+    if has_any_extension(file, DOC_EXTENSIONS):
+        logger.debug("Matched extension for: %s", rel_path)
         file_lines.append(f"### File: {rel_path}\n\n")
 
         try:
-            # Call _read_file_content as a standalone function
-            content = _read_file_content(file_path)
-            print(f"Content read for {rel_path}:\n{content[:50]}...")
+            started = time.perf_counter()
+            content, policy_note = read_file_with_policy(file_path, size=size, report=report)
+            if report is not None:
+                report.record_file(rel_path, size, time.perf_counter() - started)
+            if policy_note:
+                # Recorded so the reconstructor knows this block is not the full file
+                file_lines.append(f"> Size policy: {policy_note}\n\n")
+            if content is None:
+                logger.debug("Skipping content of %s: %s", rel_path, policy_note)
+                return file_lines, None, policy_note
+            if not policy_note:
+                # Lets verify_tree check a restored or original file against this block
+                file_lines.append(f"> SHA-256: {content_digest(content.encode('utf-8'))}\n\n")
 
             # Determine the appropriate code block markdown based on file extension
             if file.endswith((".py", ".cts", ".js", ".mjs", ".ts", ".tsx", ".cs")):
@@ -139,56 +281,154 @@ def _process_single_file(main_window, root, file, project_path):
             file_lines.append(content)
             file_lines.append("\n```\n\n")
         except Exception as e:
-            print(f"Error processing file {rel_path}: {e}")
+            logger.error("Error processing file %s: %s", rel_path, e)
             file_lines.append(f"Error reading file: {str(e)}\n\n")
+            content = None
     else:
-        print(f"Skipping incompatible file: {rel_path}")
+        logger.debug("Skipping incompatible file: %s", rel_path)
 
-    return file_lines
+    return file_lines, content, policy_note
 
-def get_project_content_for_llm(main_window, project_path):
+def get_project_content_for_llm(main_window, project_path, manifest=None, max_tokens=None, token_estimator=None,
+                                minify=False, drop_docstrings=False):
     """
     Extracts content from project files for LLM processing, handling more extensions.
 
     Args:
         project_path (str): Path to the project directory
+        manifest (list, optional): scan_project result to reuse instead of scanning again
+        max_tokens (int, optional): Token budget; files that would exceed it are left
+            out and listed at the end instead
+        token_estimator (TokenEstimator, optional): Counts tokens against max_tokens
+            and for the minification savings
+        minify (bool): Strip comments and redundant whitespace from Python, JS/TS, CSS
+            and JSON files; the token savings are logged and added to the run report
+        drop_docstrings (bool): With minify, also drop Python docstrings
 
     Returns:
         str: Concatenated content of all relevant project files
     """
-    project_content_for_llm = ""
-    for root, _, files in os.walk(project_path):
-        for file in files:
-            if has_any_extension(file, [".py", ".json", ".log", ".yaml", ".yml", ".svg", ".lock", ".scss", ".cts", ".cjs", ".js", ".map", ".mts", ".tsx", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html"]) and not file.startswith("."):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, project_path)
+    report = getattr(main_window, "run_report", None)
+    if (max_tokens is not None or minify) and token_estimator is None:
+        token_estimator = TokenEstimator()
+    content_parts = []
+    omitted = []
+    used_tokens = 0
+    if manifest is None:
+        manifest = scan_project(project_path)
+    for entry in manifest:
+        if not entry.is_dir:
+            if has_any_extension(entry.name, LLM_EXTENSIONS):
+                rel_path = entry.rel_path
+                if max_tokens is not None and used_tokens >= max_tokens:
+                    omitted.append(rel_path)
+                    continue
                 try:
-                    with open(file_path, "r", encoding="utf-8") as sourcefile:
-                        content = sourcefile.read()
-                        project_content_for_llm += f"File: {rel_path}\n{content}\n\n"
-                except UnicodeDecodeError:
-                    print(f"Trying alternative encodings for: {file_path}")
-                    try:
-                        # Use chardet to detect encoding
-                        import chardet
-                        with open(file_path, "rb") as f:
-                            rawdata = f.read()
-                            result = chardet.detect(rawdata)
-                            encoding = result['encoding']
-                        
-                        with open(file_path, "r", encoding=encoding) as sourcefile:
-                            content = sourcefile.read()
-                            project_content_for_llm += f"File (read as {encoding}): {rel_path}\n{content}\n\n"
-                            print(f"Successfully read {file_path} using detected encoding: {encoding}")
-
-                    except ImportError:
-                        print("chardet library not found. Please install it using 'pip install chardet'")
-                        project_content_for_llm += f"File (encoding error): {rel_path}\nCould not read content due to encoding issues. Install 'chardet' for better encoding detection.\n\n"
-
-                    except Exception as e_alt:
-                        print(f"Error reading file with detected encoding: {file_path} - {e_alt}")
-                        project_content_for_llm += f"File (encoding error): {rel_path}\nCould not read content due to encoding issues.\n\n"
-
+                    # read_file_with_policy already falls back to chardet for non-UTF-8 files
+                    content, policy_note = read_file_with_policy(entry.path, size=entry.size, report=report)
+                    if minify and content:
+                        content = _minify_for_llm(rel_path, content, drop_docstrings, token_estimator, report)
+                    if policy_note:
+                        part = f"File ({policy_note}): {rel_path}\n{content or ''}\n\n"
+                    else:
+                        part = f"File: {rel_path}\n{content}\n\n"
+                    if max_tokens is not None:
+                        tokens = token_estimator.count_text(part)
+                        if used_tokens + tokens > max_tokens:
+                            omitted.append(rel_path)
+                            continue
+                        used_tokens += tokens
+                    content_parts.append(part)
                 except Exception as e:
-                    print(f"Unexpected error reading file for LLM: {file_path} - {e}")
-    return project_content_for_llm
+                    logger.error("Unexpected error reading file for LLM: %s - %s", entry.path, e)
+    if omitted:
+        logger.warning("Left %d files out of the LLM input to stay within %d tokens", len(omitted), max_tokens)
+        content_parts.append(
+            f"Files omitted to fit the model's context window ({len(omitted)}):\n"
+            + "".join(f"- {rel_path}\n" for rel_path in omitted[:LLM_OMITTED_LIST_LIMIT])
+        )
+    if token_estimator is not None:
+        token_estimator.save()
+    return "".join(content_parts)
+
+def get_project_files_for_llm(main_window, project_path, manifest=None, minify=False, drop_docstrings=False):
+    """
+    Reads the files sent to the LLM one by one, e.g. to summarize them separately.
+
+    Args:
+        project_path (str): Path to the project directory
+        manifest (list, optional): scan_project result to reuse instead of scanning again
+        minify (bool): Strip comments and redundant whitespace, as get_project_content_for_llm does
+        drop_docstrings (bool): With minify, also drop Python docstrings
+
+    Returns:
+        list[tuple]: (rel_path, content) in project order; skipped and empty files are left out.
+    """
+    report = getattr(main_window, "run_report", None)
+    token_estimator = TokenEstimator() if minify else None
+    if manifest is None:
+        manifest = scan_project(project_path)
+    files = []
+    for entry in manifest:
+        if entry.is_dir or not has_any_extension(entry.name, LLM_EXTENSIONS):
+            continue
+        content, policy_note = read_file_with_policy(entry.path, size=entry.size, report=report)
+        if not content:
+            continue
+        if minify:
+            content = _minify_for_llm(entry.rel_path, content, drop_docstrings, token_estimator, report)
+        if policy_note:
+            content = f"({policy_note})\n{content}"
+        files.append((entry.rel_path, content))
+    if token_estimator is not None:
+        token_estimator.save()
+    return files
+
+def get_project_chunks_for_llm(main_window, project_path, manifest=None, target_tokens=DEFAULT_CHUNK_TOKENS,
+                               token_estimator=None):
+    """
+    Splits the LLM input of a project into request-sized batches of chunks.
+
+    Files are cut at module, class and function boundaries (see core.chunker), and
+    consecutive chunks are packed into batches of at most target_tokens, so no
+    request holds half a function.
+
+    Args:
+        project_path (str): Path to the project directory
+        manifest (list, optional): scan_project result to reuse instead of scanning again
+        target_tokens (int): Token budget per batch
+        token_estimator (TokenEstimator, optional): Counts chunk tokens
+
+    Returns:
+        list[list[Chunk]]: Batches in project order; render them with core.chunker.format_chunk.
+    """
+    report = getattr(main_window, "run_report", None)
+    count_tokens = (token_estimator or TokenEstimator()).count_text
+    if manifest is None:
+        manifest = scan_project(project_path)
+    chunks = []
+    for entry in manifest:
+        if entry.is_dir or not has_any_extension(entry.name, LLM_EXTENSIONS):
+            continue
+        content, _policy_note = read_file_with_policy(entry.path, size=entry.size, report=report)
+        if content:
+            chunks.extend(chunk_source(entry.rel_path, content, target_tokens, count_tokens))
+    return pack_chunks(chunks, target_tokens)
+
+def _minify_for_llm(rel_path, content, drop_docstrings, token_estimator, report):
+    """Minifies one file's content and records the tokens saved."""
+    minified = minify_source(rel_path, content, drop_docstrings)
+    if minified is content:
+        return content
+    tokens_before = token_estimator.count_text(content)
+    tokens_after = token_estimator.count_text(minified)
+    logger.debug("Minified %s: %d -> %d tokens", rel_path, tokens_before, tokens_after)
+    if report is not None:
+        report.record_minification(rel_path, tokens_before, tokens_after)
+    return minified
+
+def _llm_token_budget(main_window):
+    """Returns the prompt token budget of the model selected for the active LLM provider, None if unknown."""
+    provider = "google" if main_window.google_radio.isChecked() else "openai"
+    model = main_window.api_settings.get(provider, {}).get("model")
+    return context_budget(model)
@@ -1,10 +1,12 @@
 import os
-from PyQt5.QtWidgets import QFileDialog, QMessageBox
-from PyQt5.QtCore import QDir, QItemSelectionModel
+from PyQt5.QtCore import QDir, QItemSelection, QItemSelectionModel
 from utils.file_utils import get_base_dir
+from core.scanner import scan_project, walk_manifest
+from core.tokens import format_token_count
 
 def select_folder(main_window):
     """Handle project folder selection, remembering the last location and selecting contents."""
+    from PyQt5.QtWidgets import QFileDialog
     folder_path = QFileDialog.getExistingDirectory(
         main_window, "Select Project Folder", main_window.recent_project_path
     )
@@ -15,72 +17,129 @@ def select_folder(main_window):
         root_index = main_window.file_system_model.index(folder_path)
         main_window.project_tree_view.setRootIndex(root_index)
         main_window.project_tree_view.expandToDepth(0)
+        main_window.selection_trie.clear()
 
         # Recursively select all items in the selected folder, only if enabled
         if main_window.recursive_selection_check.isChecked():
             select_all_in_folder(main_window, root_index, True)
 
+def _build_folder_selection(model, folder_indexes):
+    """
+    Builds one QItemSelection covering the given folders and everything below them.
+
+    Each folder contributes its own index plus one row range per loaded directory level,
+    and every subtree is visited at most once, even when folders are nested in each other.
+    """
+    selection = QItemSelection()
+    visited = set()
+    stack = [index for index in folder_indexes if index.isValid()]
+    for index in stack:
+        selection.select(index, index)
+    while stack:
+        folder_index = stack.pop()
+        folder_path = model.filePath(folder_index)
+        if folder_path in visited:
+            continue
+        visited.add(folder_path)
+
+        row_count = model.rowCount(folder_index)
+        if not row_count:
+            continue
+        selection.select(model.index(0, 0, folder_index), model.index(row_count - 1, 0, folder_index))
+        for row in range(row_count):
+            child_index = model.index(row, 0, folder_index)
+            if model.isDir(child_index):
+                stack.append(child_index)
+    return selection
+
+def _apply_selection(main_window, selection, select):
+    """Applies a selection in a single call, ignoring the selectionChanged it triggers."""
+    command = QItemSelectionModel.Select if select else QItemSelectionModel.Deselect
+    main_window._applying_tree_selection = True
+    try:
+        main_window.project_tree_view.selectionModel().select(selection, command | QItemSelectionModel.Rows)
+    finally:
+        main_window._applying_tree_selection = False
+
 def select_all_in_folder(main_window, folder_index, select):
     """Recursively select or deselect all items within a folder in the tree view."""
     if not folder_index.isValid():
         return
 
-    current_selection_model = main_window.project_tree_view.selectionModel()
-    if select and not current_selection_model.isSelected(folder_index):
-        current_selection_model.select(folder_index, QItemSelectionModel.Select)
-    elif not select and current_selection_model.isSelected(folder_index):
-        current_selection_model.select(folder_index, QItemSelectionModel.Deselect)
-    
-    for row in range(main_window.file_system_model.rowCount(folder_index)):
-        child_index = main_window.file_system_model.index(row, 0, folder_index)
-        if child_index.isValid():
-            if main_window.file_system_model.isDir(child_index):
-                select_all_in_folder(main_window, child_index, select)
-            else:
-                if select and not current_selection_model.isSelected(child_index):
-                    current_selection_model.select(child_index, QItemSelectionModel.Select)
-                elif not select and current_selection_model.isSelected(child_index):
-                    current_selection_model.select(child_index, QItemSelectionModel.Deselect)
+    main_window.selection_trie.mark(main_window.file_system_model.filePath(folder_index), select)
+    selection = _build_folder_selection(main_window.file_system_model, [folder_index])
+    _apply_selection(main_window, selection, select)
 
 def on_tree_selection_changed(main_window, selected, deselected):
-    """Handle changes in tree view selection, including recursive selection/deselection."""
-    if not main_window.recursive_selection_check.isChecked():
-        return
+    """
+    Handle changes in tree view selection, including recursive selection/deselection.
 
-    for index in selected.indexes():
-        if main_window.file_system_model.isDir(index):
-            select_all_in_folder(main_window, index, True)
+    User changes are recorded in main_window.selection_trie, which is what processing
+    uses; the recursive view update only mirrors it for the rows already loaded.
+    """
+    if getattr(main_window, "_applying_tree_selection", False):
+        return
 
-    for index in deselected.indexes():
-        if main_window.file_system_model.isDir(index):
-            select_all_in_folder(main_window, index, False)
+    recursive = main_window.recursive_selection_check.isChecked()
+    model = main_window.file_system_model
+    for changed, select in ((selected, True), (deselected, False)):
+        if isinstance(changed, QItemSelection):
+            folders = []
+            # Row selections report one index per column, only the first is needed
+            for index in changed.indexes():
+                if index.column() != 0:
+                    continue
+                if model.isDir(index):
+                    if not recursive:
+                        continue
+                    folders.append(index)
+                main_window.selection_trie.mark(model.filePath(index), select)
+            if folders:
+                _apply_selection(main_window, _build_folder_selection(model, folders), select)
 
 def reset_project_selection(main_window):
     """Resets the project folder selection."""
+    from PyQt5.QtWidgets import QMessageBox
     main_window.project_path = None
     main_window.recent_project_path = ""
+    main_window.selection_trie.clear()
     QMessageBox.information(main_window, "Reset", "Project folder selection has been reset.")
 
-def get_project_structure(directory):
-    """Creates a string representation of the project directory structure."""
+def get_project_structure(directory, manifest=None, token_counts=None, approximate=True):
+    """
+    Creates a string representation of the project directory structure.
+
+    Args:
+        directory (str): Root of the project.
+        manifest (list, optional): Result of scan_project(directory), scanned if omitted.
+        token_counts (dict, optional): TokenEstimator.count_manifest result; when given,
+            files are annotated with their tokens and directories with their rollup.
+        approximate (bool): Mark the annotated counts as estimates ("~").
+    """
+    def annotate(line, rel_path):
+        if token_counts is None or rel_path not in token_counts:
+            return line
+        prefix = "~" if approximate else ""
+        return f"{line}  [{prefix}{format_token_count(token_counts[rel_path])} tokens]"
+
     structure = []
     base_path = os.path.basename(directory)
-    structure.append(f"{base_path}/")
+    structure.append(annotate(f"{base_path}/", ""))
 
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if d != "__pycache__" and not d.startswith(".")]
-        level = os.path.relpath(root, directory).count(os.sep) + 1
+    if manifest is None:
+        manifest = scan_project(directory)
+    for root, rel_root, dirs, files in walk_manifest(directory, manifest):
+        level = (rel_root or os.curdir).count(os.sep) + 1
         if level > 1:
             indent = "  " * (level - 1) + "+-- "
         else:
             indent = ""
 
-        for dir_name in sorted(dirs):
-            structure.append(f"{indent}{dir_name}/")
+        for dir_entry in dirs:
+            structure.append(annotate(f"{indent}{dir_entry.name}/", dir_entry.rel_path))
 
         sub_indent = "  " * level + "+-- "
-        for file in sorted(files):
-            if not file.startswith("."):
-                structure.append(f"{sub_indent}{file}")
+        for file_entry in files:
+            structure.append(annotate(f"{sub_indent}{file_entry.name}", file_entry.rel_path))
 
     return "\n".join(structure)
@@ -1,79 +1,476 @@
 import os
 import re
+import json
+import hashlib
+import mmap
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from PyQt5.QtWidgets import QMessageBox, QInputDialog, QFileDialog
+
+from core.document import convert_docx_to_txt
+from core.scanner import scan_project
+from core.utils import DOC_EXTENSIONS, SHARD_MANIFEST_SUFFIX, WHITESPACE, file_digest, has_any_extension
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
+
+STRUCTURE_HEADER = b"## Project Structure"
+FILES_HEADER = b"## Files Content"
+FILE_HEADER = b"### File: "
+FENCE = b"```"
+POLICY_NOTE = b"> Size policy: "
+CHECKSUM = b"> SHA-256: "
+DELTA_HEADER = b"# Project Delta: "
+DELTA_BASE = b"Base: "
+DELETED_HEADER = b"## Deleted Files"
+# Delta headers are short; only this many leading bytes are read to follow a chain
+DELTA_HEADER_BYTES = 4096
+DEFAULT_RECONSTRUCT_WORKERS = 4
+# "[~1.2k tokens]" annotations that get_project_structure adds to tree lines
+TOKEN_ANNOTATION = re.compile(r"\s+\[~?[\d.]+[kM]? tokens\]$")
+
+def _strip_span(buf, start, end):
+    """Narrows the byte span [start, end) so it excludes leading and trailing whitespace."""
+    while start < end and buf[start] in WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in WHITESPACE:
+        end -= 1
+    return start, end
+
+def _find_structure_span(buf):
+    """
+    Locates the body of the fenced block following the Project Structure header.
+
+    Returns:
+        tuple: (start, end) byte offsets of the block body, or None if not found.
+    """
+    return _find_fenced_span(buf, STRUCTURE_HEADER)
+
+def _find_fenced_span(buf, header):
+    """
+    Locates the body of the fenced block following a section header.
+
+    Returns:
+        tuple: (start, end) byte offsets of the block body, or None if not found.
+    """
+    pos = buf.find(header)
+    if pos == -1:
+        return None
+    pos += len(header)
+    while buf[pos:pos + 1] == b"\n":
+        pos += 1
+    if buf[pos:pos + len(FENCE)] != FENCE:
+        return None
+    start = pos + len(FENCE)
+    end = buf.find(FENCE, start)
+    if end == -1:
+        return None
+    return start, end
+
+def read_delta_base(doc_file):
+    """
+    Returns the absolute path of the base a delta documentation file was made
+    against, or None if doc_file is a full documentation file.
+    """
+    with open(doc_file, "rb") as f:
+        head = f.read(DELTA_HEADER_BYTES)
+    if not head.startswith(DELTA_HEADER):
+        return None
+    pos = head.find(b"\n" + DELTA_BASE)
+    if pos == -1:
+        raise ValueError(f"Delta documentation without a base: {doc_file}")
+    line_end = head.find(b"\n", pos + 1)
+    base = head[pos + 1 + len(DELTA_BASE):line_end if line_end != -1 else len(head)].decode("utf-8").strip()
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(doc_file)), base))
+
+def resolve_delta_chain(doc_file):
+    """
+    Follows the Base: references of a delta documentation file down to the full base.
+
+    Returns:
+        list[str]: Paths from doc_file (newest) to the full base documentation (oldest).
+    """
+    chain = [os.path.abspath(doc_file)]
+    while True:
+        if chain[-1].endswith(SHARD_MANIFEST_SUFFIX):
+            # Sharded output is always a full base; expand it with expand_shard_manifests
+            return chain
+        base = read_delta_base(chain[-1])
+        if base is None:
+            return chain
+        if base in chain:
+            raise ValueError(f"Delta chain loops back to {base}")
+        if not os.path.exists(base):
+            raise FileNotFoundError(f"Base documentation not found: {base}")
+        chain.append(base)
+
+def load_shard_manifest(manifest_file):
+    """
+    Reads a .shards.json manifest written by write_shards.
+
+    Returns:
+        list[str]: Absolute shard paths in order; the first shard holds the structure.
+    """
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    shards = [os.path.join(base_dir, shard["file"]) for shard in manifest.get("shards", [])]
+    if not shards:
+        raise ValueError(f"Shard manifest lists no shards: {manifest_file}")
+    missing = [path for path in shards if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"Missing shard(s): {', '.join(missing)}")
+    return shards
+
+def expand_shard_manifests(documents):
+    """Replaces every .shards.json manifest in a list of documents by its shards, in place order."""
+    expanded = []
+    for path in documents:
+        if path.endswith(SHARD_MANIFEST_SUFFIX):
+            expanded.extend(load_shard_manifest(path))
+        else:
+            expanded.append(path)
+    return expanded
+
+def find_deleted_files(buf):
+    """Returns the relative paths listed in a delta's Deleted Files section."""
+    span = _find_fenced_span(buf, DELETED_HEADER)
+    if not span:
+        return []
+    text = bytes(buf[span[0]:span[1]]).decode("utf-8", errors="replace")
+    return [line.strip().replace("\\", "/") for line in text.splitlines() if line.strip()]
+
+def _read_annotation(buf, pos, prefix):
+    """Returns (text, line_end) of the "> ..." annotation line at pos starting with prefix."""
+    line_end = buf.find(b"\n", pos)
+    if line_end == -1:
+        line_end = len(buf)
+    return bytes(buf[pos + len(prefix):line_end]).decode("utf-8", errors="replace").strip(), line_end
+
+def iter_file_blocks(buf, start=0, with_checksum=False):
+    """
+    Scans documentation bytes for "### File:" blocks without decoding them.
+
+    Args:
+        buf: A bytes-like object supporting find() and slicing (e.g. an mmap).
+        start (int): Byte offset to start scanning from.
+        with_checksum (bool): Also yield the "> SHA-256:" checksum of each block.
+
+    Yields:
+        tuple: (rel_path, body_start, body_end, policy_note) where rel_path is the
+        decoded file name and the offsets delimit the fenced content, whitespace-stripped.
+        policy_note is the "> Size policy:" text of a truncated or skipped file, or None;
+        skipped files have no body and are yielded with None offsets. With
+        with_checksum, the recorded checksum (or None) is appended to the tuple.
+    """
+    pos = start
+    while True:
+        header = buf.find(FILE_HEADER, pos)
+        if header == -1:
+            return
+        name_end = buf.find(b"\n", header)
+        if name_end == -1:
+            return
+        rel_path = bytes(buf[header + len(FILE_HEADER):name_end]).decode("utf-8", errors="replace").strip()
+
+        fence = name_end
+        while buf[fence:fence + 1] == b"\n":
+            fence += 1
+        policy_note = checksum = None
+        while True:
+            if buf[fence:fence + len(POLICY_NOTE)] == POLICY_NOTE:
+                policy_note, fence = _read_annotation(buf, fence, POLICY_NOTE)
+            elif buf[fence:fence + len(CHECKSUM)] == CHECKSUM:
+                checksum, fence = _read_annotation(buf, fence, CHECKSUM)
+            else:
+                break
+            while buf[fence:fence + 1] == b"\n":
+                fence += 1
+        extra = (checksum,) if with_checksum else ()
+        if buf[fence:fence + len(FENCE)] != FENCE:
+            if policy_note:
+                yield (rel_path, None, None, policy_note) + extra
+            pos = name_end
+            continue
+        body_start = buf.find(b"\n", fence + len(FENCE))
+        if body_start == -1:
+            return
+        language = bytes(buf[fence + len(FENCE):body_start]).rstrip(b"\r")
+        if language.strip(b"abcdefghijklmnopqrstuvwxyz"):
+            pos = name_end
+            continue
+        body_start += 1
+        close = buf.find(b"\n" + FENCE, body_start - 1)
+        if close == -1:
+            return
+        pos = close + 1 + len(FENCE)
+        yield (rel_path,) + _strip_span(buf, body_start, max(close, body_start)) + (policy_note,) + extra
+
+def _map_document(f):
+    """Memory-maps an open documentation file; empty files map to b""."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class RestoreState:
+    """
+    Outcome of one restore, shared by the threads restoring shards.
+
+    done holds every path already handled, so when a delta chain is restored newest
+    first, each file is written once with its latest content. removed holds the
+    paths a delta deleted before any newer document restored them. In incremental
+    mode, files that already hold their block's content are left untouched.
+    """
+
+    def __init__(self, incremental=False):
+        self.incremental = incremental
+        self.done = set()
+        self.removed = set()
+        self.written = []
+        self.skipped = []
+        self.deleted = []
+        self.incomplete_files = []
+        self.write_errors = []
+
+    def mark_deleted(self, buf):
+        """Records the Deleted Files section of a delta, unless a newer document restored them."""
+        for rel_path in find_deleted_files(buf):
+            if rel_path not in self.done:
+                self.done.add(rel_path)
+                self.removed.add(rel_path)
+
+    def documented(self):
+        """Returns the relative paths the documentation holds a block for."""
+        return self.done - self.removed
+
+def _is_unchanged(file_path, body, checksum):
+    """
+    Returns True if file_path already holds the block body.
+
+    The documentation drops \r and surrounding whitespace, which only ever makes
+    the body shorter, so a smaller file differs without being read. Otherwise the
+    file is hashed the way the checksum was taken.
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return False
+    if size < len(body):
+        return False
+    # The body is already stripped; blocks of older documents carry no checksum
+    expected = checksum or hashlib.sha256(body).hexdigest()
+    try:
+        return file_digest(file_path) == expected
+    except OSError:
+        return False
+
+def _restore_file_blocks(buf, project_path, report, state):
+    """
+    Writes the file blocks of one documentation buffer, skipping paths in state.done.
+
+    Files that could not be written are added to state.write_errors; no dialogs
+    are shown, so shards can be restored from worker threads.
+    """
+    files_start = buf.find(FILES_HEADER)
+    if files_start == -1:
+        return
+    with memoryview(buf) as view:
+        blocks = iter_file_blocks(buf, files_start + len(FILES_HEADER), with_checksum=True)
+        for file_name, body_start, body_end, policy_note, checksum in blocks:
+            key = file_name.replace("\\", "/")
+            if key in state.done:
+                continue
+            state.done.add(key)
+            file_path = os.path.join(project_path, *key.split("/"))
+            if policy_note:
+                # Partial content would silently corrupt the file, so leave it out
+                logger.warning("Not restoring %s: %s", file_name, policy_note)
+                state.incomplete_files.append(f"{file_name} ({policy_note})")
+                continue
+            body = view[body_start:body_end]
+            if state.incremental:
+                with measure(report, "compare"):
+                    unchanged = _is_unchanged(file_path, body, checksum)
+                if unchanged:
+                    logger.debug("Unchanged, not writing: %s", file_path)
+                    state.skipped.append(key)
+                    continue
+            logger.debug("Writing content to file: %s", file_path)
+            try:
+                started = time.perf_counter()
+                with measure(report, "write"):
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Create parent directories if they don't exist
+                    with open(file_path, "wb") as out:
+                        out.write(body)
+                if report is not None:
+                    report.record_file(file_name, body_end - body_start, time.perf_counter() - started)
+                state.written.append(key)
+            except Exception as e:
+                logger.error("Error writing to file %s: %s", file_path, e)
+                state.write_errors.append(f"{file_name}: {e}")
+
+def _restore_document(doc_file, project_path, report, state):
+    """Memory-maps one documentation file and restores its blocks and deletions."""
+    with open(doc_file, "rb") as f:
+        buf = _map_document(f)
+    try:
+        _restore_file_blocks(buf, project_path, report, state)
+        state.mark_deleted(buf)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+def _delete_undocumented_files(project_path, state):
+    """
+    Deletes files the documentation could hold but has no block for.
+
+    Only files with a documented extension are considered, and the ignore rules
+    of the scan protect .git, virtual environments and the like.
+    """
+    documented = state.documented()
+    for entry in scan_project(project_path):
+        key = entry.rel_path.replace(os.sep, "/")
+        if entry.is_dir or key in documented or not has_any_extension(entry.name, DOC_EXTENSIONS):
+            continue
+        try:
+            os.remove(entry.path)
+            state.deleted.append(key)
+            logger.debug("Deleted file absent from the documentation: %s", entry.path)
+        except OSError as e:
+            logger.error("Error deleting file %s: %s", entry.path, e)
+            state.write_errors.append(f"{entry.rel_path}: {e}")
 
 def recreate_project_from_text(main_window, doc_file, project_name, save_location):
     """
     Recreates a project structure and files from a documentation text file,
     handling files with extensions: .py, .json, .log, .yaml, .md, .ts, .mjs, .toml, .txt, .htm, .html.
+
+    The documentation file is memory-mapped and scanned at the byte level, so file
+    bodies are written straight from the mapping without being decoded.
+
+    doc_file may be a delta documentation file; its chain of bases is then applied
+    in one pass from the newest file to the full base, writing each file only once.
+    It may also be a .shards.json manifest; shards after the first are restored in
+    parallel, as they hold disjoint sets of files.
+
+    With the restore_incremental setting, files that already hold their block's
+    content are not written, so their modification times are kept; with
+    restore_delete_extra, files absent from the documentation are deleted.
     """
-    print(
-        f"Recreating project from TXT: {doc_file}, Project Name: {project_name}, Save Location: {save_location}"
+    from PyQt5.QtWidgets import QMessageBox
+    logger.info(
+        "Recreating project from TXT: %s, Project Name: %s, Save Location: %s", doc_file, project_name, save_location
     )
     project_path = os.path.join(save_location, project_name)
+    report = getattr(main_window, "run_report", None)
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    state = RestoreState(incremental=app_settings.get("restore_incremental", False))
 
     try:
-        with open(doc_file, "r", encoding="utf-8") as f:
-            content = f.read()
+        extra_shards = []
+        if doc_file.endswith(SHARD_MANIFEST_SUFFIX):
+            shards = load_shard_manifest(doc_file)
+            chain, extra_shards = shards[:1], shards[1:]
+        else:
+            chain = resolve_delta_chain(doc_file)
+            if len(chain) > 1:
+                logger.info("Applying %d delta(s) on top of %s", len(chain) - 1, chain[-1])
+            chain = expand_shard_manifests(chain)
 
-        # Parse the Markdown content (using regular expressions for simplicity)
-        structure_match = re.search(r"## Project Structure\n+```(.*?)```", content, re.DOTALL)
-        files_match = re.search(r"## Files Content(.*$)", content, re.DOTALL)
+        # The newest document always carries the full project structure
+        with open(chain[0], "rb") as f:
+            buf = _map_document(f)
 
-        if not structure_match:
-            print("Project Structure section not found in documentation file.")
-            QMessageBox.critical(main_window, "Error", "Project Structure section not found in documentation file.")
-            return
+        try:
+            structure_span = _find_structure_span(buf)
+            if not structure_span:
+                logger.error("Project Structure section not found in documentation file.")
+                QMessageBox.critical(main_window, "Error", "Project Structure section not found in documentation file.")
+                return
 
-        structure_section = structure_match.group(1).strip()
-        files_section = files_match.group(1).strip() if files_match else ""
-
-        # Recreate project structure
-        current_dir_stack = []
-        for line in structure_section.split("\n"):
-            stripped_line = line.strip()
-            if stripped_line.endswith("/"):
-                dir_name = stripped_line.rstrip("/").replace("+-- ", "").strip()
-                current_dir_stack.append(dir_name)
-                dir_path = os.path.join(project_path, *current_dir_stack)
-                os.makedirs(dir_path, exist_ok=True)
-                print(f"Creating directory: {dir_path}")
-            elif stripped_line and not stripped_line.startswith("+--"):
-                file_name = stripped_line
-                if current_dir_stack:
-                    file_path = os.path.join(project_path, *current_dir_stack, file_name)
-                else:
-                    file_path = os.path.join(project_path, file_name)
-                print(f"Creating file: {file_path}")
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                Path(file_path).touch()  # Create empty file
-
-        # Recreate file content
-        # Updated regex to handle more extensions and recognize code blocks
-        file_blocks = re.findall(r"### File: (.*?)\n+```[a-z]*\n(.*?)\n```", files_section, re.DOTALL)
-        for file_name, file_content in file_blocks:
-            file_path = os.path.join(project_path, file_name.strip().replace("/", "\\"))
-            print(f"Writing content to file: {file_path}")
-            try:
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Create parent directories if they don't exist
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(file_content.strip())
-            except Exception as e:
-                print(f"Error writing to file {file_path}: {e}")
-                QMessageBox.warning(main_window, "File Error", f"Error writing to file {file_name.strip()}: {e}")
+            start, end = _strip_span(buf, *structure_span)
+            structure_section = bytes(buf[start:end]).decode("utf-8", errors="replace")
+
+            # Recreate project structure
+            current_dir_stack = []
+            for line in structure_section.split("\n"):
+                stripped_line = TOKEN_ANNOTATION.sub("", line.rstrip()).strip()
+                if stripped_line.endswith("/"):
+                    dir_name = stripped_line.rstrip("/").replace("+-- ", "").strip()
+                    current_dir_stack.append(dir_name)
+                    dir_path = os.path.join(project_path, *current_dir_stack)
+                    os.makedirs(dir_path, exist_ok=True)
+                    logger.debug("Creating directory: %s", dir_path)
+                elif stripped_line and not stripped_line.startswith("+--"):
+                    file_name = stripped_line
+                    if current_dir_stack:
+                        file_path = os.path.join(project_path, *current_dir_stack, file_name)
+                    else:
+                        file_path = os.path.join(project_path, file_name)
+                    logger.debug("Creating file: %s", file_path)
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    if not (state.incremental and os.path.exists(file_path)):
+                        Path(file_path).touch()  # Create empty file
+
+            # Recreate file content straight from the mapped bytes
+            _restore_file_blocks(buf, project_path, report, state)
+            state.mark_deleted(buf)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+        for older_doc in chain[1:]:
+            _restore_document(older_doc, project_path, report, state)
+
+        if extra_shards:
+            workers = app_settings.get("reconstruct_workers", DEFAULT_RECONSTRUCT_WORKERS)
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = [
+                    executor.submit(_restore_document, shard, project_path, report, state)
+                    for shard in extra_shards
+                ]
+                for future in futures:
+                    future.result()
 
-        QMessageBox.information(main_window, "Success", f"Project recreated successfully at: {project_path}")
-        print(f"Project recreated successfully at: {project_path}")
+        if app_settings.get("restore_delete_extra", False):
+            with measure(report, "delete"):
+                _delete_undocumented_files(project_path, state)
+
+        if state.write_errors:
+            QMessageBox.warning(
+                main_window, "File Error", "Error writing these files:\n" + "\n".join(state.write_errors)
+            )
+        if state.incomplete_files:
+            QMessageBox.warning(
+                main_window,
+                "Incomplete Files",
+                "The documentation holds truncated or skipped content for these files, "
+                "which were not restored:\n" + "\n".join(state.incomplete_files),
+            )
+        counts = f"Written: {len(state.written)}, unchanged: {len(state.skipped)}, deleted: {len(state.deleted)}"
+        logger.info("%s", counts)
+        summary = ""
+        if report is not None:
+            report.record_restore(len(state.written), len(state.skipped), len(state.deleted))
+            report.finish()
+            report.save(save_location, f"{project_name}_performance_report.json")
+            summary = f"\n\n{report.summary()}"
+            logger.info("%s", report.summary())
+        QMessageBox.information(
+            main_window, "Success", f"Project recreated successfully at: {project_path}\n{counts}{summary}"
+        )
+        logger.info("Project recreated successfully at: %s", project_path)
 
     except Exception as e:
-        print(f"Error during project recreation: {e}")
+        logger.error("Error during project recreation: %s", e)
         QMessageBox.critical(main_window, "Error", f"An error occurred during project recreation: {e}")
 
 def recreate_project_from_docx(main_window, doc_file_path, project_name, save_location):
         """
         Recreates a project from a .docx documentation file.
         """
+        from PyQt5.QtWidgets import QMessageBox
         txt_path = convert_docx_to_txt(doc_file_path)
         if txt_path:
             recreate_project_from_text(main_window, txt_path, project_name, save_location)
@@ -0,0 +1,127 @@
+import os
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.ignore_utils import IgnoreMatcher
+
+logger = logging.getLogger(__name__)
+
+# Directory listing is I/O bound, so threads help on high-latency filesystems (NFS, SMB).
+DEFAULT_SCAN_WORKERS = 8
+
+ScanEntry = namedtuple("ScanEntry", ["name", "rel_path", "path", "is_dir", "size", "mtime"])
+
+def _list_directory(path, follow_symlinks=False):
+    """
+    Lists one directory with os.scandir, reusing the DirEntry stat results.
+
+    Symlinks to directories are left out unless follow_symlinks is set, so a link
+    cannot pull in a tree outside the project.
+
+    Returns:
+        tuple: (dirs, files) where dirs holds (name, path, identity) and files holds
+        (name, path, size, mtime). identity is the (st_dev, st_ino) pair of the target.
+    """
+    dirs, files = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if not follow_symlinks and entry.is_symlink() and entry.is_dir():
+                        logger.debug("Not following directory symlink: %s", entry.path)
+                        continue
+                    st = entry.stat()
+                    if entry.is_dir():
+                        if not st.st_ino:
+                            # DirEntry.stat() reports no inode on Windows
+                            st = os.stat(entry.path)
+                        dirs.append((entry.name, entry.path, (st.st_dev, st.st_ino)))
+                    else:
+                        files.append((entry.name, entry.path, st.st_size, st.st_mtime))
+                except OSError:
+                    # Broken symlink or entry removed while scanning
+                    continue
+    except OSError as e:
+        logger.error("Error scanning directory %s: %s", path, e)
+    return dirs, files
+
+def scan_project(project_path, ignore=None, max_workers=DEFAULT_SCAN_WORKERS, follow_symlinks=False):
+    """
+    Scans a project tree and returns a deterministic manifest of its entries.
+
+    Directory listings are fanned out over a thread pool. Ignored subtrees are
+    pruned before they are listed. Symlinked directories are only entered with
+    follow_symlinks; directories reached twice through them are then detected by
+    (st_dev, st_ino) and listed only once.
+
+    Args:
+        project_path (str): Root of the project.
+        ignore (IgnoreMatcher, optional): Ignore rules, defaults to IgnoreMatcher(project_path).
+        max_workers (int): Number of listing threads; 1 scans serially.
+        follow_symlinks (bool): Also scan directories reached through symlinks.
+
+    Returns:
+        list[ScanEntry]: Directories and files sorted by rel_path (native separators).
+    """
+    project_path = os.path.abspath(project_path)
+    if ignore is None:
+        ignore = IgnoreMatcher(project_path)
+
+    root_stat = os.stat(project_path)
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+    manifest = []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = {executor.submit(_list_directory, project_path, follow_symlinks): ""}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel_root = pending.pop(future)
+                dirs, files = future.result()
+                root = os.path.join(project_path, rel_root) if rel_root else project_path
+
+                dirs_by_name = {name: (path, identity) for name, path, identity in dirs}
+                files_by_name = {name: (path, size, mtime) for name, path, size, mtime in files}
+                dir_names = list(dirs_by_name)
+                file_names = ignore.prune(root, dir_names, list(files_by_name))
+
+                for name in file_names:
+                    path, size, mtime = files_by_name[name]
+                    rel_path = os.path.join(rel_root, name) if rel_root else name
+                    manifest.append(ScanEntry(name, rel_path, path, False, size, mtime))
+
+                for name in dir_names:
+                    path, identity = dirs_by_name[name]
+                    if identity in visited:
+                        logger.warning("Skipping already visited directory (symlink loop?): %s", path)
+                        continue
+                    visited.add(identity)
+                    rel_path = os.path.join(rel_root, name) if rel_root else name
+                    manifest.append(ScanEntry(name, rel_path, path, True, 0, 0.0))
+                    pending[executor.submit(_list_directory, path, follow_symlinks)] = rel_path
+
+    manifest.sort(key=lambda entry: entry.rel_path.split(os.sep))
+    return manifest
+
+def walk_manifest(project_path, manifest):
+    """
+    Walks a manifest top-down in sorted order, like os.walk without further system calls.
+
+    Yields:
+        tuple: (root, rel_root, dirs, files) where dirs and files are lists of ScanEntry.
+    """
+    children = {"": ([], [])}
+    for entry in manifest:
+        if entry.is_dir:
+            children.setdefault(entry.rel_path, ([], []))
+        parent = os.path.dirname(entry.rel_path)
+        children.setdefault(parent, ([], []))[0 if entry.is_dir else 1].append(entry)
+
+    stack = [""]
+    while stack:
+        rel_root = stack.pop()
+        dirs, files = children.get(rel_root, ([], []))
+        root = os.path.join(project_path, rel_root) if rel_root else project_path
+        yield root, rel_root, dirs, files
+        stack.extend(entry.rel_path for entry in reversed(dirs))
@@ -0,0 +1,60 @@
+import os
+
+def _split_path(path):
+    """Splits a path into normalized components, so "/" and os.sep paths share trie nodes."""
+    path = os.path.normcase(os.path.normpath(path))
+    return [part for part in path.split(os.sep) if part]
+
+class SelectionTrie:
+    """
+    Stores the user's tree selection as include/exclude marks on path prefixes.
+
+    Marking a folder is O(depth) regardless of how many files it holds, and does
+    not depend on which nodes QFileSystemModel has loaded. The deepest mark on a
+    path decides whether it is selected; resolve() expands the marks against a
+    scan_project manifest at process time.
+    """
+
+    def __init__(self):
+        self._root = [None, {}]  # [mark, children]
+
+    def clear(self):
+        """Removes all marks."""
+        self._root = [None, {}]
+
+    def is_empty(self):
+        """Returns True if nothing has been marked."""
+        return self._root[0] is None and not self._root[1]
+
+    def mark(self, path, include=True):
+        """
+        Includes or excludes a file or a whole folder.
+
+        A new mark replaces every mark below path, so the latest action on a
+        folder applies to all of its contents.
+        """
+        node = self._root
+        for part in _split_path(path):
+            node = node[1].setdefault(part, [None, {}])
+        node[0] = include
+        node[1] = {}
+
+    def is_selected(self, path):
+        """Returns True if the deepest mark on path (or one of its parents) is an include."""
+        node = self._root
+        selected = node[0]
+        for part in _split_path(path):
+            node = node[1].get(part)
+            if node is None:
+                break
+            if node[0] is not None:
+                selected = node[0]
+        return bool(selected)
+
+    def resolve(self, manifest):
+        """
+        Returns the absolute paths of the selected files in a scan_project manifest.
+        """
+        if self.is_empty():
+            return []
+        return [entry.path for entry in manifest if not entry.is_dir and self.is_selected(entry.path)]
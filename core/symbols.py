@@ -0,0 +1,344 @@
+import argparse
+import ast
+import bisect
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+
+from core.chunker import split_segments
+from core.scanner import scan_project
+from utils.file_utils import get_base_dir
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_INDEX_FILE = os.path.join("cache", "symbol_index.sqlite3")
+# Bumped when extraction changes, so every file is parsed again
+SCHEMA_VERSION = 1
+PYTHON_EXTENSIONS = (".py", ".pyw")
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts")
+SYMBOL_EXTENSIONS = PYTHON_EXTENSIONS + JS_EXTENSIONS
+# Larger files (bundles, generated code) are hashed but not parsed
+MAX_INDEXED_BYTES = 4 * 1024 * 1024
+
+# rel_path uses "/" separators; start_line and end_line are 1-based and inclusive
+Symbol = namedtuple("Symbol", "rel_path kind name qualname start_line end_line")
+# level counts the leading dots of a relative Python import; JS imports of "./x" have level 1
+Import = namedtuple("Import", "rel_path module name line level")
+
+_JS_SYMBOLS = (
+    ("function", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([\w$]+)")),
+    ("class", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([\w$]+)")),
+    ("interface", re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+([\w$]+)")),
+    ("function", re.compile(
+        r"^\s*(?:export\s+)?(?:const|let|var)\s+([\w$]+)\s*(?::[^=]+)?=\s*(?:async\s*)?"
+        r"(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[\w$]+\s*=>)"
+    )),
+)
+_JS_IMPORTS = re.compile(
+    r"""(?:\bimport\s+(?:[\w$*{},\s]+?\s+from\s+)?|\bexport\s+[\w$*{},\s]+?\s+from\s+"""
+    r"""|\brequire\s*\(\s*|\bimport\s*\(\s*)(["'])([^"'\n]+)\1"""
+)
+
+def _python_module_name(rel_path):
+    """Returns the dotted module name of a Python file, e.g. "pkg.mod" for pkg/mod.py."""
+    module = os.path.splitext(rel_path)[0].replace("\\", "/").replace("/", ".")
+    return module[:-len(".__init__")] if module.endswith(".__init__") else module
+
+def extract_python_symbols(rel_path, source):
+    """
+    Extracts the module, its classes and functions (with methods and nested classes)
+    and every import statement, including imports inside functions.
+
+    Returns:
+        tuple: (symbols, imports); both empty if source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        logger.debug("Cannot parse %s for the symbol index: %s", rel_path, e)
+        return [], []
+    module = _python_module_name(rel_path)
+    symbols = [Symbol(rel_path, "module", module.rsplit(".", 1)[-1], module, 1, len(source.splitlines()) or 1)]
+
+    def visit(nodes, prefix, in_class):
+        for node in nodes:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                continue
+            start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            qualname = f"{prefix}{node.name}"
+            symbols.append(Symbol(rel_path, kind, node.name, qualname, start, node.end_lineno))
+            if kind == "class":
+                visit(node.body, qualname + ".", True)
+
+    visit(tree.body, "", False)
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(Import(rel_path, alias.name, None, node.lineno, 0) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.extend(Import(rel_path, node.module or "", alias.name, node.lineno, node.level)
+                           for alias in node.names)
+    imports.sort(key=lambda item: item.line)
+    return symbols, imports
+
+def extract_js_symbols(rel_path, source):
+    """
+    Extracts functions, classes, interfaces/types and imports from JavaScript or
+    TypeScript with regular expressions. A symbol opening a top-level block ends
+    where the block ends; other symbols span their own line.
+
+    Returns:
+        tuple: (symbols, imports)
+    """
+    lines = source.splitlines()
+    # Top-level blocks named by the chunker, by the symbol that opens them
+    block_ends = {(segment.symbol, segment.start): segment.end
+                  for segment in split_segments(rel_path, source) if segment.symbol}
+    block_starts = sorted(start for _symbol, start in block_ends)
+    symbols, imports = [], []
+    for number, line in enumerate(lines, 1):
+        for kind, pattern in _JS_SYMBOLS:
+            match = pattern.match(line)
+            if match:
+                name = match.group(1)
+                # The block containing this line starts at it or at a comment above it
+                index = bisect.bisect_right(block_starts, number) - 1
+                end = block_ends.get((name, block_starts[index]), number) if index >= 0 else number
+                symbols.append(Symbol(rel_path, kind, name, name, number, max(end, number)))
+                break
+        if "import" in line or "require" in line or "from" in line:
+            for match in _JS_IMPORTS.finditer(line):
+                module = match.group(2)
+                imports.append(Import(rel_path, module, None, number, 1 if module.startswith(".") else 0))
+    return symbols, imports
+
+def extract_symbols(rel_path, source):
+    """Extracts (symbols, imports) from a file by its extension; other files have none."""
+    extension = os.path.splitext(rel_path)[1].lower()
+    if extension in PYTHON_EXTENSIONS:
+        return extract_python_symbols(rel_path, source)
+    if extension in JS_EXTENSIONS:
+        return extract_js_symbols(rel_path, source)
+    return [], []
+
+class SymbolIndex:
+    """
+    Project symbol index (modules, classes, functions, imports and their line
+    ranges) kept in a local SQLite database.
+
+    update() re-parses only files whose size or mtime changed and whose content
+    hash differs from the indexed one, so keeping the index current costs a scan
+    plus the changed files. Several projects share one database, keyed by their
+    absolute path. The connection may be used from any thread.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_base_dir(), SYMBOL_INDEX_FILE)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS symbols; DROP TABLE IF EXISTS imports;"
+                )
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    project TEXT, rel_path TEXT, size INTEGER, mtime REAL, hash TEXT,
+                    PRIMARY KEY (project, rel_path)
+                );
+                CREATE TABLE IF NOT EXISTS symbols (
+                    project TEXT, rel_path TEXT, kind TEXT, name TEXT, qualname TEXT,
+                    start_line INTEGER, end_line INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS imports (
+                    project TEXT, rel_path TEXT, module TEXT, name TEXT, line INTEGER, level INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS symbols_by_name ON symbols (project, name);
+                CREATE INDEX IF NOT EXISTS symbols_by_qualname ON symbols (project, qualname);
+                CREATE INDEX IF NOT EXISTS symbols_by_file ON symbols (project, rel_path);
+                CREATE INDEX IF NOT EXISTS imports_by_file ON imports (project, rel_path);
+            """)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def update(self, project_path, manifest=None, report=None):
+        """
+        Brings the index of a project up to date with its files.
+
+        Args:
+            project_path (str): Root of the project.
+            manifest (list, optional): scan_project result to reuse instead of scanning again.
+            report (RunReport, optional): Report collecting stage timings.
+
+        Returns:
+            tuple: (parsed, removed) counts of files parsed again and dropped from the index.
+        """
+        project = os.path.abspath(project_path)
+        if manifest is None:
+            with measure(report, "scan"):
+                manifest = scan_project(project)
+        with self._lock:
+            indexed = {
+                rel_path: (size, mtime, digest)
+                for rel_path, size, mtime, digest in self._conn.execute(
+                    "SELECT rel_path, size, mtime, hash FROM files WHERE project = ?", (project,)
+                )
+            }
+        seen = set()
+        changes = []
+        for entry in manifest:
+            if entry.is_dir or not entry.name.lower().endswith(SYMBOL_EXTENSIONS):
+                continue
+            rel_path = entry.rel_path.replace(os.sep, "/")
+            seen.add(rel_path)
+            previous = indexed.get(rel_path)
+            if previous and previous[0] == entry.size and previous[1] == entry.mtime:
+                continue
+            try:
+                with measure(report, "read"):
+                    with open(entry.path, "rb") as f:
+                        data = f.read()
+            except OSError as e:
+                logger.warning("Cannot index %s: %s", entry.path, e)
+                continue
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            if previous and previous[2] == digest:
+                # Touched but unchanged: only the stat data is refreshed
+                changes.append((rel_path, entry.size, entry.mtime, digest, None))
+                continue
+            symbols, imports = [], []
+            if len(data) <= MAX_INDEXED_BYTES:
+                with measure(report, "symbols"):
+                    symbols, imports = extract_symbols(rel_path, data.decode("utf-8", errors="replace"))
+            changes.append((rel_path, entry.size, entry.mtime, digest, (symbols, imports)))
+        removed = [rel_path for rel_path in indexed if rel_path not in seen]
+
+        with self._lock, self._conn:
+            for rel_path in removed:
+                self._delete_file(project, rel_path, drop_entry=True)
+            parsed = 0
+            for rel_path, size, mtime, digest, extracted in changes:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (project, rel_path, size, mtime, hash) VALUES (?, ?, ?, ?, ?)",
+                    (project, rel_path, size, mtime, digest),
+                )
+                if extracted is None:
+                    continue
+                parsed += 1
+                self._delete_file(project, rel_path)
+                symbols, imports = extracted
+                self._conn.executemany(
+                    "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)", ((project,) + tuple(s) for s in symbols)
+                )
+                self._conn.executemany(
+                    "INSERT INTO imports VALUES (?, ?, ?, ?, ?, ?)", ((project,) + tuple(i) for i in imports)
+                )
+        logger.debug("Symbol index of %s: %d file(s) parsed, %d removed", project, parsed, len(removed))
+        return parsed, len(removed)
+
+    def _delete_file(self, project, rel_path, drop_entry=False):
+        """Removes the symbols and imports of one file, called with the lock held."""
+        self._conn.execute("DELETE FROM symbols WHERE project = ? AND rel_path = ?", (project, rel_path))
+        self._conn.execute("DELETE FROM imports WHERE project = ? AND rel_path = ?", (project, rel_path))
+        if drop_entry:
+            self._conn.execute("DELETE FROM files WHERE project = ? AND rel_path = ?", (project, rel_path))
+
+    def _query(self, row_type, sql, parameters):
+        with self._lock:
+            return [row_type(*row) for row in self._conn.execute(sql, parameters)]
+
+    def find(self, project_path, name):
+        """
+        Returns where name is defined: symbols whose name or qualified name
+        (e.g. "Class.method" or "pkg.module") equals name.
+        """
+        return self._query(
+            Symbol,
+            "SELECT rel_path, kind, name, qualname, start_line, end_line FROM symbols "
+            "WHERE project = ? AND (name = ? OR qualname = ?) ORDER BY rel_path, start_line",
+            (os.path.abspath(project_path), name, name),
+        )
+
+    def symbols(self, project_path, rel_path=None):
+        """Returns the symbols of one file, or of the whole project, in file and line order."""
+        sql = "SELECT rel_path, kind, name, qualname, start_line, end_line FROM symbols WHERE project = ?"
+        parameters = [os.path.abspath(project_path)]
+        if rel_path is not None:
+            sql += " AND rel_path = ?"
+            parameters.append(rel_path.replace(os.sep, "/"))
+        return self._query(Symbol, sql + " ORDER BY rel_path, start_line", parameters)
+
+    def imports(self, project_path, rel_path=None):
+        """Returns the imports of one file, or of the whole project, in file and line order."""
+        sql = "SELECT rel_path, module, name, line, level FROM imports WHERE project = ?"
+        parameters = [os.path.abspath(project_path)]
+        if rel_path is not None:
+            sql += " AND rel_path = ?"
+            parameters.append(rel_path.replace(os.sep, "/"))
+        return self._query(Import, sql + " ORDER BY rel_path, line", parameters)
+
+    def file_hashes(self, project_path):
+        """Returns {rel_path: content hash} of the indexed files of a project."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT rel_path, hash FROM files WHERE project = ?", (os.path.abspath(project_path),)
+            ))
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_symbol_index():
+    """Returns the process-wide SymbolIndex stored under utils/cache."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SymbolIndex()
+        return _index
+
+def symbols_main(argv):
+    """
+    Command line entry point: python main.py symbols ROOT NAME [NAME ...]
+
+    Updates the index of ROOT and prints where each NAME is defined.
+
+    Returns:
+        int: 0 if every name was found, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="main.py symbols", description="Find where symbols are defined.")
+    parser.add_argument("root", help="Project folder.")
+    parser.add_argument("names", nargs="+", help="Names or qualified names (Class.method, pkg.module).")
+    parser.add_argument("--index", help="SQLite index file (default: utils/cache/symbol_index.sqlite3).")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors.")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+    index = SymbolIndex(args.index) if args.index else get_symbol_index()
+    index.update(args.root)
+    missing = 0
+    for name in args.names:
+        found = index.find(args.root, name)
+        if not found:
+            missing += 1
+            print(f"{name}: not found")
+        for symbol in found:
+            print(f"{symbol.rel_path}:{symbol.start_line}-{symbol.end_line}  {symbol.kind} {symbol.qualname}")
+    return 1 if missing else 0
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from core.utils import CHARS_PER_TOKEN, DOC_EXTENSIONS, estimate_tokens, has_any_extension, read_file_with_policy
+from utils.file_utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_FILE = os.path.join("cache", "token_cache.json")
+
+# Context windows of the models offered in the API settings dialog
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "gemini-1.5-pro": 2000000,
+    "gemini-exp-1206": 2000000,
+    "gemini-1.5-flash": 1000000,
+    "gemini-2.0-flash-exp": 1000000,
+    "learnlm-1.5-pro-experimental": 32768,
+}
+# Kept free for the system prompt and the model's answer
+RESPONSE_RESERVE_TOKENS = 4096
+
+_tokenizer_lock = threading.Lock()
+_tokenizer = None
+_tokenizer_loaded = False
+
+def load_exact_tokenizer():
+    """
+    Returns (name, encode) for tiktoken's cl100k_base encoding if tiktoken is
+    installed and its encoding data is available, otherwise None.
+    """
+    global _tokenizer, _tokenizer_loaded
+    with _tokenizer_lock:
+        if not _tokenizer_loaded:
+            _tokenizer_loaded = True
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding("cl100k_base")
+                _tokenizer = (encoding.name, encoding.encode_ordinary)
+            except Exception as e:
+                # Not installed, or the encoding cannot be downloaded offline
+                logger.debug("Exact tokenizer unavailable, using estimates: %s", e)
+        return _tokenizer
+
+def context_budget(model):
+    """
+    Returns the number of prompt tokens available for project content with model.
+
+    Google model names may carry a "models/" prefix, and dated versions such as
+    "gpt-4o-2024-08-06" use the window of their longest known prefix.
+
+    Returns:
+        int: The token budget, or None for an unknown model, which is then not limited.
+    """
+    name = (model or "").strip()
+    if name.startswith("models/"):
+        name = name[len("models/"):]
+    context = MODEL_CONTEXT_TOKENS.get(name)
+    if context is None:
+        known = [known for known in MODEL_CONTEXT_TOKENS if name.startswith(f"{known}-")]
+        if not known:
+            logger.info("Unknown context window of model %r, the LLM input is not limited", model)
+            return None
+        context = MODEL_CONTEXT_TOKENS[max(known, key=len)]
+    return max(context - RESPONSE_RESERVE_TOKENS, 0)
+
+def format_token_count(tokens):
+    """Formats a token count compactly, e.g. 950, 12.3k or 1.2M."""
+    if tokens >= 1000000:
+        return f"{tokens / 1000000:.1f}M"
+    if tokens >= 1000:
+        return f"{tokens / 1000:.1f}k"
+    return str(tokens)
+
+class TokenEstimator:
+    """
+    Estimates token counts of texts and project files.
+
+    Without an exact tokenizer, files are estimated from their size alone and
+    never read. With one (tiktoken, when installed), text is tokenized once per
+    content hash, and files are read again only when their size or modification
+    time changed; both counts are kept in a JSON cache across runs. The cache
+    forgets files that are gone from a counted project, and texts that no cached
+    file holds and this run did not count.
+    """
+
+    def __init__(self, exact=True, cache_path=None):
+        self.tokenizer = load_exact_tokenizer() if exact else None
+        self.cache_path = cache_path or os.path.join(get_base_dir(), TOKEN_CACHE_FILE)
+        self._cache = {}
+        # {tokenizer:path: [size, mtime, tokens, text key]}
+        self._files = {}
+        # Text keys counted by this instance, kept by save() even if no file holds them
+        self._used_texts = set()
+        self._dirty = False
+        if self.tokenizer:
+            self._load_cache()
+
+    @property
+    def is_exact(self):
+        """True if counts come from a real tokenizer."""
+        return self.tokenizer is not None
+
+    def _load_cache(self):
+        """Loads the on-disk cache, ignoring a missing or damaged file."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._cache = data.get("texts", {})
+            self._files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            self._cache, self._files = {}, {}
+
+    def save(self):
+        """Writes new cache entries to disk, if there are any, dropping texts nothing refers to."""
+        if not self._dirty:
+            return
+        referenced = {entry[3] for entry in self._files.values() if len(entry) > 3} | self._used_texts
+        for key in [key for key in self._cache if key not in referenced]:
+            del self._cache[key]
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"texts": self._cache, "files": self._files}, f)
+            os.replace(temp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Could not save token cache: %s", e)
+
+    def _count_exact(self, text):
+        """Returns (cache key, token count) of text with the exact tokenizer."""
+        name, encode = self.tokenizer
+        key = f"{name}:{hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()}"
+        self._used_texts.add(key)
+        tokens = self._cache.get(key)
+        if tokens is None:
+            tokens = len(encode(text))
+            self._cache[key] = tokens
+            self._dirty = True
+        return key, tokens
+
+    def count_text(self, text):
+        """Returns the token count of text, exact and cached when a tokenizer is available."""
+        if not self.tokenizer:
+            return estimate_tokens(text)
+        return self._count_exact(text)[1]
+
+    def count_entry(self, entry):
+        """Returns the token count of a scan_project file entry."""
+        if not self.tokenizer:
+            return -(-entry.size // CHARS_PER_TOKEN)
+        key = f"{self.tokenizer[0]}:{entry.path}"
+        cached = self._files.get(key)
+        if cached and cached[0] == entry.size and cached[1] == entry.mtime:
+            return cached[2]
+        content, _policy_note = read_file_with_policy(entry.path, size=entry.size)
+        text_key, tokens = self._count_exact(content) if content else (None, 0)
+        self._files[key] = [entry.size, entry.mtime, tokens, text_key]
+        self._dirty = True
+        return tokens
+
+    def _forget_missing_files(self, manifest):
+        """Drops the cached files below the manifest's project root that are not in the manifest."""
+        files = [entry for entry in manifest if not entry.is_dir]
+        if not self.tokenizer or not files:
+            return
+        # entry.path is the project root joined with entry.rel_path
+        root = files[0].path[:len(files[0].path) - len(files[0].rel_path)]
+        prefix = f"{self.tokenizer[0]}:{root}"
+        current = {f"{self.tokenizer[0]}:{entry.path}" for entry in files}
+        stale = [key for key in self._files if key.startswith(prefix) and key not in current]
+        for key in stale:
+            del self._files[key]
+        if stale:
+            self._dirty = True
+
+    def count_manifest(self, manifest):
+        """
+        Counts the tokens of every file in a manifest and rolls them up per directory.
+
+        Files whose content is never placed in the documentation, such as images,
+        are left out. Cached counts of files below the project root that are not in
+        the manifest are dropped.
+
+        Returns:
+            dict: {rel_path: tokens} for files and directories; "" holds the project total.
+        """
+        counts = {"": 0}
+        for entry in manifest:
+            if entry.is_dir:
+                counts.setdefault(entry.rel_path, 0)
+                continue
+            if not has_any_extension(entry.name, DOC_EXTENSIONS):
+                continue
+            tokens = self.count_entry(entry)
+            counts[entry.rel_path] = tokens
+            parent = os.path.dirname(entry.rel_path)
+            while True:
+                counts[parent] = counts.get(parent, 0) + tokens
+                if not parent:
+                    break
+                parent = os.path.dirname(parent)
+        self._forget_missing_files(manifest)
+        return counts
@@ -1,41 +1,172 @@
 import os
-import chardet
+import hashlib
+import logging
 
-def _read_file_content(file_path):
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
+
+def _decode_text(rawdata):
+    """Decodes bytes like a text-mode read would, translating \r\n and \r to \n."""
+    content = rawdata.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+def _read_file_content(file_path, report=None):
     """
     Reads the content of a file with improved encoding handling and error reporting.
+
+    The file is read once as bytes; encoding detection works on the same bytes
+    when they are not valid UTF-8. Reading and decoding are timed separately
+    when a RunReport is given.
     """
-    print(f"Attempting to read file: {file_path}")
+    logger.debug("Attempting to read file: %s", file_path)
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            print(f"Read content (UTF-8) from {file_path}: {content[:20]}...")
-            return content
-    except UnicodeDecodeError:
-        print(f"Trying alternative encodings for: {file_path}")
-        try:
+        with measure(report, "read"):
             with open(file_path, "rb") as f:
                 rawdata = f.read()
+    except Exception as e:
+        error_msg = f"Unexpected error reading file: {file_path} - {e}"
+        logger.error("%s", error_msg)
+        return error_msg
+
+    with measure(report, "decode"):
+        try:
+            return _decode_text(rawdata)
+        except UnicodeDecodeError:
+            logger.warning("Trying alternative encodings for: %s", file_path)
+            try:
+                # Only needed for files that are not valid UTF-8
+                import chardet
                 result = chardet.detect(rawdata)
                 encoding = result['encoding']
+                if report is not None:
+                    report.record_encoding_fallback(file_path, encoding)
 
-            with open(file_path, "r", encoding=encoding) as f:
-                content = f.read()
-                print(f"Successfully read {file_path} using detected encoding: {encoding}")
-                print(f"Read content ({encoding}) from {file_path}: {content[:20]}...")
+                content = rawdata.decode(encoding)
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+                logger.debug("Successfully read %s using detected encoding: %s", file_path, encoding)
                 return content
-        except ImportError:
-            error_msg = f"ERROR: Could not read content due to encoding issues. Install 'chardet' for better encoding detection."
-            print(error_msg)
-            return error_msg
-        except Exception as e_alt:
-            error_msg = f"Error reading file with detected encoding: {file_path} - {e_alt}"
-            print(error_msg)
-            return error_msg
-    except Exception as e:
-        error_msg = f"Unexpected error reading file: {file_path} - {e}"
-        print(error_msg)
-        return error_msg
+            except Exception as e_alt:
+                error_msg = f"Error reading file with detected encoding: {file_path} - {e_alt}"
+                logger.error("%s", error_msg)
+                return error_msg
+
+# Size policies per file category. "full" includes the file whole up to max_bytes,
+# "head_tail" keeps head_bytes + tail_bytes around an omission marker, "tail" keeps the
+# last tail_lines lines and "skip" leaves the content out. Files above skip_bytes are
+# always skipped.
+FILE_SIZE_POLICIES = {
+    "log": {
+        "extensions": [".log"],
+        "action": "tail",
+        "max_bytes": 256 * 1024,
+        "tail_lines": 500,
+        "skip_bytes": None,
+    },
+    "data": {
+        "extensions": [".json", ".map", ".lock", ".svg", ".csv"],
+        "action": "head_tail",
+        "max_bytes": 1024 * 1024,
+        "head_bytes": 32 * 1024,
+        "tail_bytes": 8 * 1024,
+        "skip_bytes": 512 * 1024 * 1024,
+    },
+    "default": {
+        "action": "head_tail",
+        "max_bytes": 4 * 1024 * 1024,
+        "head_bytes": 256 * 1024,
+        "tail_bytes": 64 * 1024,
+        "skip_bytes": 512 * 1024 * 1024,
+    },
+}
+
+def get_size_policy(file_path):
+    """Returns the (category, policy) pair from FILE_SIZE_POLICIES that applies to file_path."""
+    for category, policy in FILE_SIZE_POLICIES.items():
+        if has_any_extension(file_path, policy.get("extensions", [])):
+            return category, policy
+    return "default", FILE_SIZE_POLICIES["default"]
+
+def _read_tail_lines(file_path, line_count, block_size=64 * 1024):
+    """
+    Reads the last line_count lines of a file by seeking backwards from EOF in blocks,
+    so only the tail of the file is ever read.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        blocks = []
+        newlines = 0
+        while position > 0 and newlines <= line_count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+    data = b"".join(reversed(blocks))
+    lines = data.splitlines(keepends=True)
+    return b"".join(lines[-line_count:]).decode("utf-8", errors="replace")
+
+def _read_head_tail(file_path, size, head_bytes, tail_bytes):
+    """Reads the first head_bytes and last tail_bytes of a file, cut at line boundaries."""
+    with open(file_path, "rb") as f:
+        head = f.read(head_bytes)
+        f.seek(max(size - tail_bytes, head_bytes))
+        tail = f.read(tail_bytes)
+    if b"\n" in head:
+        head = head[:head.rindex(b"\n") + 1]
+    if b"\n" in tail:
+        tail = tail[tail.index(b"\n") + 1:]
+    omitted = size - len(head) - len(tail)
+    return (
+        head.decode("utf-8", errors="replace")
+        + f"\n... [{omitted} bytes omitted by size policy] ...\n\n"
+        + tail.decode("utf-8", errors="replace")
+    )
+
+def read_file_with_policy(file_path, size=None, report=None):
+    """
+    Reads a file according to the size policy of its category.
+
+    Args:
+        file_path (str): Path of the file to read.
+        size (int, optional): Known file size, e.g. from a scan manifest, to skip a stat call.
+        report (RunReport, optional): Run report receiving read/decode timings.
+
+    Returns:
+        tuple: (content, note). note is None when the file was included fully, otherwise
+        a short description of what was done (e.g. "tail 500 lines; original size 123 bytes").
+        content is None when the file was skipped.
+    """
+    if size is None:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return _read_file_content(file_path, report), None
+
+    _, policy = get_size_policy(file_path)
+    skip_bytes = policy.get("skip_bytes")
+    action = policy["action"]
+    if skip_bytes is not None and size > skip_bytes:
+        action = "skip"
+    elif size <= policy["max_bytes"]:
+        return _read_file_content(file_path, report), None
+
+    if action == "tail":
+        line_count = policy["tail_lines"]
+        with measure(report, "read"):
+            content = _read_tail_lines(file_path, line_count)
+        return content, f"tail {line_count} lines; original size {size} bytes"
+    if action == "head_tail":
+        with measure(report, "read"):
+            content = _read_head_tail(file_path, size, policy["head_bytes"], policy["tail_bytes"])
+        return content, f"truncated to head and tail; original size {size} bytes"
+    if action == "skip":
+        return None, f"skipped; original size {size} bytes"
+    return _read_file_content(file_path, report), None
 
 def has_extension(filename, extension):
     """
@@ -65,3 +196,67 @@ def has_any_extension(filename, extensions):
         if has_extension(filename, ext):
             return True
     return False
+
+# Manifest written next to the shards of a split documentation file
+SHARD_MANIFEST_SUFFIX = ".shards.json"
+
+# Stripped from both ends of a file body when it is restored
+WHITESPACE = b" \t\r\n\f\v"
+# Read size of the streaming hash; hashlib releases the GIL for updates this large
+HASH_CHUNK_BYTES = 1 << 20
+
+# Files whose content is placed in the documentation
+DOC_EXTENSIONS = [".py", ".json", ".log", ".yaml", ".yml", ".svg", ".lock", ".scss", ".cts", ".cjs", ".js", ".map", ".mts", ".tsx", ".md", ".ts", ".mjs", ".toml", ".txt", ".htm", ".html", ".mdx", ".css", ".markdown", ".node", ".cmd", ".ninja", ".sh", ".cc", ".cs", ".bash", ".fish", ".ps1", ".zsh"]
+
+def content_digest(data):
+    """Returns the SHA-256 of a file body as the reconstructor would write it."""
+    return hashlib.sha256(data.strip(WHITESPACE)).hexdigest()
+
+def file_digest(path, chunk_size=HASH_CHUNK_BYTES):
+    """
+    Streams a file into content_digest form without loading it whole.
+
+    Line endings are translated to \\n and surrounding whitespace is left out, as
+    when the file is read for the documentation and restored from it, so an
+    original file and its reconstruction get the same digest.
+    """
+    digest = hashlib.sha256()
+    started = False
+    pending = b""  # Whitespace that only counts if more content follows
+    carry = b""  # A trailing \r that may start a \r\n split across reads
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = carry + chunk
+            carry = b""
+            if chunk and data.endswith(b"\r"):
+                data, carry = data[:-1], b"\r"
+            if b"\r" in data:
+                data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if not started:
+                data = data.lstrip(WHITESPACE)
+                started = bool(data)
+            body = data.rstrip(WHITESPACE)
+            if body:
+                digest.update(pending)
+                digest.update(body)
+                pending = data[len(body):]
+            else:
+                pending += data
+            if not chunk:
+                return digest.hexdigest()
+
+# Rough average for source code and English prose with common BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """
+    Estimates the LLM token count of text without loading a tokenizer.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
@@ -0,0 +1,158 @@
+import argparse
+import logging
+import mmap
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from core.reconstructor import (
+    FILES_HEADER,
+    _map_document,
+    expand_shard_manifests,
+    find_deleted_files,
+    iter_file_blocks,
+    resolve_delta_chain,
+)
+from core.scanner import scan_project
+from core.utils import (
+    DOC_EXTENSIONS,
+    _read_file_content,
+    content_digest,
+    file_digest,
+    has_any_extension,
+)
+from utils.perf_utils import measure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERIFY_WORKERS = 8
+
+VerifyResult = namedtuple("VerifyResult", ["matched", "mismatched", "missing", "extra", "unverified"])
+
+def load_doc_checksums(doc_file):
+    """
+    Reads the checksum of every file block of a documentation file.
+
+    doc_file may be a delta, whose chain is applied down to its full base, or a
+    .shards.json manifest, also as the base of a chain. Blocks written before
+    checksums were recorded are hashed from their body.
+
+    Returns:
+        dict: {rel_path: sha256}, None for files the size policy truncated or skipped.
+    """
+    # Oldest first, so newer deltas override and delete
+    documents = list(reversed(expand_shard_manifests(resolve_delta_chain(doc_file))))
+    checksums = {}
+    for path in documents:
+        with open(path, "rb") as f:
+            buf = _map_document(f)
+        try:
+            for rel_path in find_deleted_files(buf):
+                checksums.pop(rel_path, None)
+            files_start = buf.find(FILES_HEADER)
+            if files_start == -1:
+                continue
+            blocks = iter_file_blocks(buf, files_start + len(FILES_HEADER), with_checksum=True)
+            for file_name, body_start, body_end, policy_note, checksum in blocks:
+                if policy_note:
+                    checksum = None
+                elif checksum is None:
+                    checksum = content_digest(buf[body_start:body_end])
+                checksums[file_name.replace("\\", "/")] = checksum
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    return checksums
+
+def _check_file(path, expected):
+    """Returns True if the file at path matches the expected checksum."""
+    if file_digest(path) == expected:
+        return True
+    # Files that are not UTF-8 are re-encoded in the documentation; compare their decoded text
+    content = _read_file_content(path)
+    return content_digest(content.encode("utf-8")) == expected
+
+def verify_tree(doc_file, directory, workers=DEFAULT_VERIFY_WORKERS, report=None):
+    """
+    Checks a directory against the checksums of a documentation file.
+
+    Works both ways round: an original project against its documentation, or a
+    tree reconstructed from a documentation file against that file. Files are
+    hashed in parallel with streaming reads.
+
+    Args:
+        doc_file (str): Documentation file, delta or .shards.json manifest.
+        directory (str): Project folder to check.
+        workers (int): Files hashed at once.
+        report (RunReport, optional): Report collecting stage timings.
+
+    Returns:
+        VerifyResult: Sorted lists of relative paths. mismatched files differ from
+        their block, missing files have a block but do not exist, extra files could
+        have a block but have none, and unverified files have only partial content
+        in the documentation.
+    """
+    directory = os.path.abspath(directory)
+    with measure(report, "read"):
+        checksums = load_doc_checksums(doc_file)
+    with measure(report, "scan"):
+        manifest = scan_project(directory)
+    on_disk = {entry.rel_path.replace(os.sep, "/"): entry.path for entry in manifest if not entry.is_dir}
+
+    unverified = sorted(rel_path for rel_path, checksum in checksums.items() if checksum is None)
+    to_check, missing = [], []
+    for rel_path, checksum in checksums.items():
+        if checksum is None:
+            continue
+        # Not looked up in the scan: a file ignored there must still match its block
+        path = on_disk.get(rel_path) or os.path.join(directory, *rel_path.split("/"))
+        if os.path.isfile(path):
+            to_check.append((rel_path, path, checksum))
+        else:
+            missing.append(rel_path)
+    extra = sorted(
+        rel_path for rel_path in on_disk
+        if rel_path not in checksums and has_any_extension(os.path.basename(rel_path), DOC_EXTENSIONS)
+    )
+
+    matched, mismatched = [], []
+    with measure(report, "hash"):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = executor.map(lambda item: _check_file(item[1], item[2]), to_check)
+            for (rel_path, _path, _checksum), ok in zip(to_check, results):
+                (matched if ok else mismatched).append(rel_path)
+    logger.info(
+        "Verified %s against %s: %d matched, %d mismatched, %d missing, %d extra, %d unverified",
+        directory, doc_file, len(matched), len(mismatched), len(missing), len(extra), len(unverified),
+    )
+    return VerifyResult(sorted(matched), sorted(mismatched), sorted(missing), extra, unverified)
+
+def verify_main(argv):
+    """
+    Command line entry point: python main.py verify DOC ROOT [--workers N]
+
+    Prints every mismatched, missing, extra and unverified file.
+
+    Returns:
+        int: 0 if ROOT matches DOC, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="main.py verify", description="Check a project folder against a documentation file.")
+    parser.add_argument("doc", help="Documentation file, delta or .shards.json manifest.")
+    parser.add_argument("root", help="Project folder, original or reconstructed.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_VERIFY_WORKERS, help="Files hashed at once.")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors.")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.doc):
+        parser.error(f"not a file: {args.doc}")
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+    result = verify_tree(args.doc, args.root, workers=args.workers)
+    for label in ("mismatched", "missing", "extra", "unverified"):
+        for rel_path in getattr(result, label):
+            print(f"{label}: {rel_path}")
+    print(
+        f"{len(result.matched)} matched, {len(result.mismatched)} mismatched, {len(result.missing)} missing, "
+        f"{len(result.extra)} extra, {len(result.unverified)} unverified"
+    )
+    return 1 if result.mismatched or result.missing or result.extra else 0
@@ -0,0 +1,371 @@
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import re
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+
+from core.processor import format_file_block
+from core.project import get_project_structure
+from core.scanner import scan_project, walk_manifest
+from settings.settings_manager import load_app_settings
+from utils.file_utils import get_base_dir
+from utils.ignore_utils import IgnoreMatcher
+from utils.perf_utils import profile_run
+
+logger = logging.getLogger(__name__)
+
+WATCH_OUTPUT_DIR = "project_documentation_watch"
+WATCH_OUTPUT_FILE = "project_documentation.txt"
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 2.0
+# A steady stream of events (e.g. a long build) still triggers an update this often
+MAX_DEBOUNCE_FACTOR = 10
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """
+    Reports changed paths below a set of watched directories using Linux inotify.
+
+    inotify is not recursive, so every directory of the project is added with
+    add(); directories created later are added by the caller after a rescan.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._paths_by_wd = {}
+        self._watched = set()
+
+    def add(self, path):
+        """Watches one directory. Already watched paths are skipped."""
+        if path in self._watched:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning("inotify watch limit reached, %s is not watched (raise fs.inotify.max_user_watches)", path)
+            else:
+                logger.debug("Cannot watch %s: %s", path, os.strerror(err))
+            return
+        self._paths_by_wd[wd] = path
+        self._watched.add(path)
+
+    def wait(self, timeout):
+        """
+        Waits up to timeout seconds for events.
+
+        Returns:
+            set[str] or None: Changed paths, an empty set on timeout, or None if the
+            kernel queue overflowed and the whole tree must be rescanned.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    changed = None
+                    continue
+                directory = self._paths_by_wd.get(wd)
+                if mask & IN_IGNORED:
+                    # The directory was deleted or unmounted and its watch removed
+                    self._paths_by_wd.pop(wd, None)
+                    self._watched.discard(directory)
+                    continue
+                if directory is not None and changed is not None:
+                    changed.add(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return changed
+
+    def close(self):
+        """Releases the inotify file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+class PollingWatcher:
+    """
+    Fallback watcher that compares (size, mtime) snapshots of scan_project every interval.
+    """
+
+    def __init__(self, project_path, ignore, interval=DEFAULT_POLL_INTERVAL):
+        self.project_path = project_path
+        self.ignore = ignore
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        """Returns {path: (is_dir, size, mtime)} for the current tree."""
+        return {
+            entry.path: (entry.is_dir, entry.size, entry.mtime)
+            for entry in scan_project(self.project_path, ignore=self.ignore)
+        }
+
+    def add(self, path):
+        """Polling covers the whole tree already; kept for interface parity with InotifyWatcher."""
+
+    def wait(self, timeout):
+        """Sleeps up to timeout seconds (at most one interval) and returns the changed paths."""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._take_snapshot()
+        changed = {path for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        changed.update(path for path in self._snapshot if path not in snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        """Nothing to release."""
+
+def create_watcher(project_path, ignore, force_polling=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """Returns an InotifyWatcher where available, otherwise a PollingWatcher."""
+    if not force_polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            logger.info("inotify unavailable (%s), falling back to polling every %.1fs", e, poll_interval)
+    return PollingWatcher(project_path, ignore, poll_interval)
+
+class LiveDocumentation:
+    """
+    Keeps the text documentation of a project up to date incrementally.
+
+    Formatted file blocks are cached with the (size, mtime) they were read at; an
+    update re-reads only files that are new, changed or explicitly reported as
+    touched, drops deleted ones and rebuilds the structure section from the manifest.
+    """
+
+    def __init__(self, project_path, ignore=None):
+        self.project_path = os.path.abspath(project_path)
+        self.ignore = ignore or IgnoreMatcher(self.project_path)
+        self.manifest = []
+        self.structure = ""
+        self.structure_changed = False
+        self._blocks = {}  # rel_path -> (size, mtime, lines)
+
+    def update(self, touched=None):
+        """
+        Rescans the project and refreshes the affected file blocks.
+
+        Args:
+            touched (set[str], optional): Absolute paths reported by the watcher; these are
+                re-read even when size and mtime look unchanged.
+
+        Returns:
+            tuple: (changed, removed) lists of relative paths. structure_changed is set
+            when the structure section differs from the previous update.
+        """
+        touched = touched or set()
+        self.manifest = scan_project(self.project_path, ignore=self.ignore)
+        changed, seen = [], set()
+        for entry in self.manifest:
+            if entry.is_dir:
+                continue
+            seen.add(entry.rel_path)
+            cached = self._blocks.get(entry.rel_path)
+            if cached and cached[0] == entry.size and cached[1] == entry.mtime and entry.path not in touched:
+                continue
+            lines = format_file_block(entry.path, entry.rel_path, size=entry.size)
+            self._blocks[entry.rel_path] = (entry.size, entry.mtime, lines)
+            changed.append(entry.rel_path)
+        removed = [rel_path for rel_path in self._blocks if rel_path not in seen]
+        for rel_path in removed:
+            del self._blocks[rel_path]
+
+        structure = get_project_structure(self.project_path, self.manifest)
+        self.structure_changed = structure != self.structure
+        self.structure = structure
+        return changed, removed
+
+    def render(self):
+        """Returns the full documentation as a list of lines, files in walk order."""
+        output_lines = [
+            f"# Project Documentation: {os.path.basename(self.project_path)}\n",
+            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+            "## Project Structure\n\n```\n",
+            self.structure,
+            "\n```\n\n",
+            "## Files Content\n\n",
+        ]
+        for _root, _rel_root, _dirs, files in walk_manifest(self.project_path, self.manifest):
+            for entry in files:
+                cached = self._blocks.get(entry.rel_path)
+                if cached:
+                    output_lines.extend(cached[2])
+        return output_lines
+
+    def write(self, output_file):
+        """Writes the documentation atomically, so readers never see a partial file."""
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as outfile:
+            outfile.writelines(self.render())
+        os.replace(temp_file, output_file)
+
+def _own_output_patterns(project_path, output_file):
+    """
+    Returns anchored ignore patterns for output_file and its temporary file when they
+    lie inside the project, so writing the documentation never shows up as a change.
+    """
+    try:
+        rel_path = os.path.relpath(output_file, project_path)
+    except ValueError:  # Another drive on Windows
+        return []
+    if rel_path.split(os.sep, 1)[0] == os.pardir:
+        return []
+    escaped = re.sub(r"([\\*?\[\]])", r"\\\1", rel_path.replace(os.sep, "/"))
+    return [f"/{escaped}", f"/{escaped}.tmp"]
+
+def _wait_debounced(watcher, debounce):
+    """
+    Blocks until a change arrives and then until no event came for debounce seconds,
+    so bursts such as a git checkout cause a single update.
+
+    Returns:
+        set[str] or None: The touched paths, or None if a full refresh is needed.
+    """
+    touched = set()
+    while True:
+        changed = watcher.wait(3600)
+        if changed is None:
+            touched = None
+            break
+        if changed:
+            touched.update(changed)
+            break
+    deadline = time.monotonic() + debounce * MAX_DEBOUNCE_FACTOR
+    while time.monotonic() < deadline:
+        changed = watcher.wait(debounce)
+        if changed is None:
+            touched = None
+        elif not changed:
+            break
+        elif touched is not None:
+            touched.update(changed)
+    return touched
+
+def watch_project(project_path, output_file=None, debounce=DEFAULT_DEBOUNCE, force_polling=False,
+                  poll_interval=DEFAULT_POLL_INTERVAL, max_updates=None):
+    """
+    Writes the project's documentation and keeps it fresh until interrupted.
+
+    Args:
+        project_path (str): Root of the project.
+        output_file (str, optional): Documentation file, defaults to
+            <project>/project_documentation_watch/project_documentation.txt. The file is
+            left out of the documentation wherever it lies inside the project.
+        debounce (float): Quiet period in seconds before an update is written.
+        force_polling (bool): Use stat polling even where inotify is available.
+        poll_interval (float): Polling period for the fallback watcher.
+        max_updates (int, optional): Stop after this many updates (used by tests).
+
+    Returns:
+        str: Path of the documentation file.
+    """
+    project_path = os.path.abspath(project_path)
+    if output_file is None:
+        output_file = os.path.join(project_path, WATCH_OUTPUT_DIR, WATCH_OUTPUT_FILE)
+    output_file = os.path.abspath(output_file)
+    own_files = {output_file, f"{output_file}.tmp"}
+    live = LiveDocumentation(project_path, IgnoreMatcher(project_path, _own_output_patterns(project_path, output_file)))
+    live.update()
+    live.write(output_file)
+    logger.info("Documentation written to %s, watching %s", output_file, project_path)
+
+    watcher = create_watcher(project_path, live.ignore, force_polling, poll_interval)
+    updates = 0
+    try:
+        watcher.add(project_path)
+        for entry in live.manifest:
+            if entry.is_dir:
+                watcher.add(entry.path)
+        while max_updates is None or updates < max_updates:
+            touched = _wait_debounced(watcher, debounce)
+            if touched is not None:
+                touched -= own_files
+                if not touched:
+                    continue
+            changed, removed = live.update(touched)
+            # New directories need their own inotify watch
+            for entry in live.manifest:
+                if entry.is_dir:
+                    watcher.add(entry.path)
+            if not changed and not removed and not live.structure_changed:
+                continue
+            live.write(output_file)
+            updates += 1
+            logger.info("Updated documentation: %d changed, %d removed", len(changed), len(removed))
+    except KeyboardInterrupt:
+        logger.info("Watch mode stopped.")
+    finally:
+        watcher.close()
+    return output_file
+
+def watch_main(argv):
+    """
+    Command line entry point: python main.py watch ROOT [--output FILE] ...
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(prog="main.py watch", description="Keep a project's documentation up to date.")
+    parser.add_argument("root", help="Project folder to watch.")
+    parser.add_argument("--output", help="Documentation file to keep updated.")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, metavar="SECONDS",
+                        help="Quiet period before regenerating.")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify.")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, metavar="SECONDS")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write watch_profile.prof and summaries next to the output when stopped "
+                             "(also enabled by the profile setting).")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+    output_dir = os.path.dirname(os.path.abspath(args.output)) if args.output else os.path.join(args.root, WATCH_OUTPUT_DIR)
+    app_settings = load_app_settings(get_base_dir())
+    profile = args.profile or app_settings.get("profile", False)
+    with profile_run(profile, output_dir, "watch_profile", app_settings):
+        watch_project(args.root, args.output, args.debounce, args.poll, args.poll_interval)
+    return 0
@@ -1,4 +1,3 @@
-import logging
 from PyQt5.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -14,10 +13,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
-import json
-import os
-
 from gui.utils import apply_stylesheet
+from settings.settings_manager import get_settings_store
 from utils.file_utils import get_base_dir
 
 class APISettingsDialog(QDialog):
@@ -31,6 +28,7 @@ class APISettingsDialog(QDialog):
         """
         super().__init__(parent)
         self.api_settings = settings  # Use the passed settings
+        self.reset_providers = set()  # Providers reset in this dialog, removed from the file on save
         apply_stylesheet(self)
         self.setWindowTitle('API Settings')
         self.setGeometry(200, 200, 400, 300)
@@ -151,10 +149,13 @@ class APISettingsDialog(QDialog):
             "model": model
         }
 
+        self.reset_providers.discard(provider)
+
         try:
-            settings_path = os.path.join(get_base_dir(), "settings.json")
-            with open(settings_path, "w") as f:
-                json.dump(self.api_settings, f, indent=4)
+            # Only this dialog's keys are written; everything else in settings.json is kept
+            store = get_settings_store(get_base_dir())
+            store.update({provider: self.api_settings[provider]}, remove=self.reset_providers)
+            store.flush()
             QMessageBox.information(self, "Settings Saved", "API settings saved successfully.")
             self.accept()  # Close the dialog
         except Exception as e:
@@ -165,6 +166,7 @@ class APISettingsDialog(QDialog):
         provider = self.provider_combobox.currentText().lower()
         if provider in self.api_settings:
             del self.api_settings[provider]
+            self.reset_providers.add(provider)
             self.load_settings_for_provider(provider)
             self.api_key_edit.clear()
             self.temperature_slider.setValue(70)
@@ -233,11 +235,5 @@ def show_api_settings(parent, settings):
     dialog = APISettingsDialog(settings.copy(), parent=parent)
     dialog.load_settings_for_provider(dialog.provider_combobox.currentText())
     if dialog.exec_() == QDialog.Accepted:
+        # The dialog already saved its changes to settings.json
         parent.api_settings = dialog.api_settings
-        try:
-            settings_path = os.path.join(get_base_dir(), "settings.json")
-            with open(settings_path, "w") as f:
-                json.dump(parent.api_settings, f, indent=4)
-        except Exception as e:
-            logging.error(f"Error saving API settings after dialog: {e}")
-            QMessageBox.critical(parent, "Settings Error", f"Failed to save API settings: {e}")
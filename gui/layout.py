@@ -190,8 +190,8 @@ def init_project_manager_ui(main_window):
     main_window.llm_info_button = llm_info_button
     main_window.process_button = process_button
 
-    # Load application settings
-    app_settings = load_app_settings(get_base_dir())
+    # Reuse the settings the main window already loaded
+    app_settings = getattr(main_window, "app_settings", None) or load_app_settings(get_base_dir())
     main_window.recursive_selection_check.setChecked(app_settings.get("recursive_selection", True))
 
     return main_window
@@ -0,0 +1,170 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.file_utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+LATENCY_FILE = os.path.join("cache", "llm_latency.json")
+DEFAULT_HEDGE_PERCENTILE = 95
+# Used until a provider has MIN_SAMPLES recorded latencies
+DEFAULT_HEDGE_DELAY = 30.0
+MIN_SAMPLES = 5
+# Bucket upper bounds in seconds: 50 ms growing by 25% per bucket, up to about 20 minutes
+BUCKET_BOUNDS = [round(0.05 * 1.25 ** i, 4) for i in range(46)]
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of request latencies.
+
+    Buckets grow geometrically, so percentiles have the same relative precision
+    (25%) for fast and slow requests and the histogram never grows.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts else [0] * (len(BUCKET_BOUNDS) + 1)
+
+    @property
+    def total(self):
+        """Number of recorded latencies."""
+        return sum(self.counts)
+
+    def record(self, seconds):
+        """Adds one latency."""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the bucket holding the given percentile, or None
+        without samples. Latencies beyond the last bucket report twice its bound.
+        """
+        total = self.total
+        if not total:
+            return None
+        rank = total * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else BUCKET_BOUNDS[-1] * 2
+        return BUCKET_BOUNDS[-1] * 2
+
+class LatencyTracker:
+    """
+    Per-provider latency histograms, kept in a JSON file across runs.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_base_dir(), LATENCY_FILE)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for provider, counts in data.items():
+                if len(counts) == len(BUCKET_BOUNDS) + 1:
+                    self._histograms[provider] = LatencyHistogram(counts)
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def histogram(self, provider):
+        """Returns the histogram of provider, creating an empty one if needed."""
+        with self._lock:
+            return self._histograms.setdefault(provider, LatencyHistogram())
+
+    def record(self, provider, seconds):
+        """Records a successful request's latency and saves the histograms."""
+        with self._lock:
+            self._histograms.setdefault(provider, LatencyHistogram()).record(seconds)
+            data = {name: histogram.counts for name, histogram in self._histograms.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not save LLM latency histograms: %s", e)
+
+    def hedge_delay(self, provider, percent=DEFAULT_HEDGE_PERCENTILE, default=DEFAULT_HEDGE_DELAY,
+                    min_samples=MIN_SAMPLES):
+        """Returns how long to wait for provider before hedging: its latency percentile, or default."""
+        histogram = self.histogram(provider)
+        if histogram.total < min_samples:
+            return default
+        return histogram.percentile(percent)
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_latency_tracker():
+    """Returns the process-wide LatencyTracker."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker()
+        return _tracker
+
+def timed_request(tracker, provider, request):
+    """Runs request() and records its latency under provider if it succeeds."""
+    start = time.perf_counter()
+    result = request()
+    tracker.record(provider, time.perf_counter() - start)
+    return result
+
+def hedged_request(requests, primary, secondary, tracker, delay):
+    """
+    Sends a request to primary and, if it has not answered after delay seconds
+    (or failed earlier), the same request to secondary.
+
+    The first successful answer wins. The loser is cancelled if it has not
+    started yet; a request already in flight cannot be interrupted, so it is
+    abandoned and its answer discarded (its latency is still recorded).
+
+    Args:
+        requests (dict): {provider: callable()} returning the generated text or raising.
+        primary (str): Provider asked first.
+        secondary (str): Provider used as the hedge.
+        tracker (LatencyTracker): Receives the latency of every successful request.
+        delay (float): Seconds to wait for primary before hedging.
+
+    Returns:
+        tuple: (provider, text) of the winning request.
+
+    Raises:
+        RuntimeError: If both providers failed; the message holds both errors.
+    """
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-hedge")
+    futures = {}
+    errors = {}
+
+    def submit(provider):
+        futures[executor.submit(timed_request, tracker, provider, requests[provider])] = provider
+
+    try:
+        submit(primary)
+        done, _pending = wait(futures, timeout=delay)
+        if not done:
+            logger.info("%s has not answered after %.1fs, hedging with %s", primary, delay, secondary)
+            submit(secondary)
+        while futures:
+            done, _pending = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    return provider, future.result()
+                except Exception as e:
+                    logger.warning("%s request failed: %s", provider, e)
+                    errors[provider] = e
+                    # A failing primary is hedged at once instead of after the delay
+                    if provider == primary and secondary not in errors and secondary not in futures.values():
+                        submit(secondary)
+        raise RuntimeError("; ".join(f"{provider}: {error}" for provider, error in errors.items()))
+    finally:
+        # Do not wait for the loser; its thread finishes in the background
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,13 +1,76 @@
-import openai
-import google.generativeai as genai
+import logging
+
 from PyQt5.QtWidgets import QMessageBox
 
+from llm.hedging import (
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_PERCENTILE,
+    get_latency_tracker,
+    hedged_request,
+    timed_request
+)
+from llm.scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, get_llm_scheduler
+from core.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
 def generate_llm_documentation(main_window, project_text):
     """Generates documentation using the selected LLM provider.
     Args:
         project_text (str): Project content to analyze
     Returns:
         str: Generated documentation text, or None if generation fails"""
+    selected_llm = _selected_llm(main_window)
+    if not selected_llm:
+        return None
+    return _request_documentation(main_window, selected_llm, _overview_prompt(main_window), project_text)
+
+def generate_llm_documentation_from_summaries(main_window, project_path, files, preamble=""):
+    """Generates documentation from per-file summaries with the selected LLM provider.
+
+    Summaries are cached by content hash, model and prompt version, so only new
+    and changed files are summarized; they are requested in the background
+    priority of the LLM scheduler. The overview is then written from the
+    summaries in one interactive request.
+    Args:
+        project_path (str): Project root, used to group its requests in the scheduler
+        files (list): (rel_path, content) pairs to summarize
+        preamble (str): Text put before the summaries, e.g. the Dependencies section
+    Returns:
+        str: Generated documentation text, or None if generation fails"""
+    selected_llm = _selected_llm(main_window)
+    if not selected_llm:
+        return None
+    # Imported on first use: it pulls in sqlite3, which startup keeps lazy
+    from llm.summaries import DEFAULT_SUMMARY_WORKERS, format_summaries, get_summary_cache, summarize_files
+
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    get_llm_scheduler(app_settings)
+    llm_settings = main_window.api_settings.get(selected_llm, {})
+    request_function = request_openai if selected_llm == "openai" else request_google
+
+    def request(system_prompt, content):
+        return request_function(
+            llm_settings.get("api_key"), llm_settings.get("model"), system_prompt, content,
+            llm_settings.get("temperature", 0.7), job=project_path, priority=PRIORITY_BACKGROUND,
+        )
+
+    try:
+        summaries, fresh = summarize_files(
+            files, request, f"{selected_llm}/{llm_settings.get('model')}", get_summary_cache(),
+            max_workers=app_settings.get("llm_max_concurrency", DEFAULT_SUMMARY_WORKERS),
+        )
+    except Exception as e:
+        logger.error("Summarizing project files failed: %s", e)
+        QMessageBox.critical(main_window, "LLM Error", f"Could not summarize the project files: {e}")
+        return None
+    logger.info("Composing the overview from %d file summaries (%d new)", len(summaries), fresh)
+    return _request_documentation(
+        main_window, selected_llm, _overview_prompt(main_window), preamble + format_summaries(summaries)
+    )
+
+def _selected_llm(main_window):
+    """Returns the selected provider if it has an API key, otherwise None after a warning dialog."""
     selected_llm = None
     if main_window.openai_radio.isChecked():
         selected_llm = "openai"
@@ -18,18 +81,16 @@ def generate_llm_documentation(main_window, project_text):
         QMessageBox.warning(main_window, "Warning", "Please select an LLM provider.")
         return None
 
-    llm_settings = main_window.api_settings.get(selected_llm, {})
-    api_key = llm_settings.get("api_key")
-    model = llm_settings.get("model")
-    temperature = llm_settings.get("temperature", 0.7)
-
-    if not api_key:
+    if not main_window.api_settings.get(selected_llm, {}).get("api_key"):
         QMessageBox.warning(main_window, "Error", f"{selected_llm.capitalize()} API key not configured.")
         return None
+    return selected_llm
 
+def _overview_prompt(main_window):
+    """Returns the system prompt of the project overview request."""
     overview_type = "general" if main_window.general_radio.isChecked() else "detailed"
 
-    system_prompt = f"""You are a Coding Master tasked with explaining the provided code. Provide a {overview_type} overview. **Obligatory elements to be included: 1) Project Overview 2) Graphical Representation of project structure. 3) Functions 4) Dependencies**.
+    return f"""You are a Coding Master tasked with explaining the provided code. Provide a {overview_type} overview. **Obligatory elements to be included: 1) Project Overview 2) Graphical Representation of project structure. 3) Functions 4) Dependencies**. For the dependencies, use the Dependencies section at the start of the content when present instead of inferring them.
 Do not comment on code issues, errors or potential for expansion. Provide a graphical overview of the project structure and main data flow using text characters. Use the following format as an example:
 +-----------------+     +-----------------+     +-----------------+
 | main.py   |---->| code1223445677899.py |---->| settings.json |
@@ -43,6 +104,21 @@ Do not comment on code issues, errors or potential for expansion. Provide a grap
                             | PyQt5 library  |
                             +-----------------+"""
 
+def _request_documentation(main_window, selected_llm, system_prompt, project_text):
+    """Sends the overview request to selected_llm, hedged with the other provider if enabled."""
+    llm_settings = main_window.api_settings.get(selected_llm, {})
+    api_key = llm_settings.get("api_key")
+    model = llm_settings.get("model")
+    temperature = llm_settings.get("temperature", 0.7)
+
+    # Hedging needs the other provider configured as well
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    # Creates the process-wide scheduler with the configured rate limits on first use
+    get_llm_scheduler(app_settings)
+    secondary = "google" if selected_llm == "openai" else "openai"
+    if app_settings.get("llm_hedging") and main_window.api_settings.get(secondary, {}).get("api_key"):
+        return _hedged_documentation(main_window, selected_llm, system_prompt, project_text)
+
     if selected_llm == "openai":
         return call_openai_api(main_window, api_key, model, system_prompt, project_text, temperature)
     elif selected_llm == "google":
@@ -58,12 +134,40 @@ def call_openai_api(main_window, api_key, model, system_prompt, content, tempera
         temperature (float): Temperature setting for generation
     Returns:
         str: Generated content or None if request fails"""
-    print(f"Calling OpenAI API with model: {model}, temperature: {temperature}")
-    openai.api_key = api_key
+    logger.debug("Calling OpenAI API with model: %s, temperature: %s", model, temperature)
     try:
-        print(f"OpenAI API Request - Model: {model}, Temperature: {temperature}, Prompt: {system_prompt}, Content: {content[:500]}...")
-        # Use openai.chat.completions.create for chat models
-        response = openai.chat.completions.create(
+        # Imported on first use: the SDK is slow to import and not needed for most runs
+        import openai
+        return timed_request(
+            get_latency_tracker(), "openai",
+            lambda: request_openai(api_key, model, system_prompt, content, temperature)
+        )
+    except ImportError as e:
+        logger.error("Error calling OpenAI API: %s", e)
+        QMessageBox.critical(main_window, "OpenAI Error", f"The openai package is not installed: {e}")
+        return None
+    except openai.OpenAIError as e:
+        logger.error("OpenAI API error: %s", e)
+        QMessageBox.critical(main_window, "OpenAI Error", f"Error communicating with OpenAI: {e}")
+        return None
+    except Exception as e:
+        logger.error("Error calling OpenAI API: %s", e)
+        QMessageBox.critical(main_window, "OpenAI Error", f"An unexpected error occurred with OpenAI: {e}")
+        return None
+
+def request_openai(api_key, model, system_prompt, content, temperature, job="default", priority=PRIORITY_INTERACTIVE):
+    """Sends one chat completion request to OpenAI and returns the text; raises on errors.
+
+    The request waits for the rate limits of the LLM scheduler. Safe to call from
+    worker threads: it uses its own client and shows no dialogs."""
+    import openai
+    client = openai.OpenAI(api_key=api_key)
+
+    def send():
+        # Sizes only: prompts and answers may hold the whole project
+        logger.debug("OpenAI API request - model: %s, temperature: %s, %d characters", model, temperature,
+                     len(system_prompt) + len(content))
+        response = client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -71,21 +175,33 @@ def call_openai_api(main_window, api_key, model, system_prompt, content, tempera
             ],
             temperature=temperature,
         )
-        print(f"OpenAI API Response: {response}")
         # Access the generated text from the response
-        return response.choices[0].message.content.strip()
-    except openai.OpenAIError as e:
-        print(f"OpenAI API error: {e}")
-        QMessageBox.critical(main_window, "OpenAI Error", f"Error communicating with OpenAI: {e}")
-        return None
-    except Exception as e:
-        print(f"Error calling OpenAI API: {e}")
-        QMessageBox.critical(main_window, "OpenAI Error", f"An unexpected error occurred with OpenAI: {e}")
-        return None
+        text = response.choices[0].message.content.strip()
+        logger.debug("OpenAI API response - model: %s, %d characters", model, len(text))
+        return text
+
+    tokens = estimate_tokens(system_prompt) + estimate_tokens(content)
+    return get_llm_scheduler().run("openai", model, tokens, send, job=job, priority=priority)
 
 def call_google_api(main_window, api_key, model, system_prompt, content, temperature):
     """Calls the Google API to generate documentation."""
-    print(f"Calling Google API with model: {model}, temperature: {temperature}")
+    logger.debug("Calling Google API with model: %s, temperature: %s", model, temperature)
+    try:
+        return timed_request(
+            get_latency_tracker(), "google",
+            lambda: request_google(api_key, model, system_prompt, content, temperature)
+        )
+    except Exception as e:
+        logger.error("Error calling Google API: %s", e)
+        QMessageBox.critical(main_window, "Google AI Error", f"Error communicating with Google AI: {e}")
+        return None
+
+def request_google(api_key, model, system_prompt, content, temperature, job="default", priority=PRIORITY_INTERACTIVE):
+    """Sends one generation request to Google AI and returns the text; raises on errors.
+
+    The request waits for the rate limits of the LLM scheduler. Safe to call from
+    worker threads: it shows no dialogs."""
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     generation_config = genai.types.GenerationConfig(
         temperature=temperature,
@@ -98,12 +214,48 @@ def call_google_api(main_window, api_key, model, system_prompt, content, tempera
         gemini_model = genai.GenerativeModel(model, generation_config=generation_config)
 
     prompt = f"{system_prompt}\n\n{content}"
-    print(f"Google API Request - Model: {model}, Temperature: {temperature}, Prompt: {prompt[:500]}...")
-    try:
+
+    def send():
+        # Sizes only: prompts and answers may hold the whole project
+        logger.debug("Google API request - model: %s, temperature: %s, %d characters", model, temperature, len(prompt))
         response = gemini_model.generate_content(prompt)
-        print(f"Google API Response: {response.text}")
+        logger.debug("Google API response - model: %s, %d characters", model, len(response.text))
         return response.text
-    except Exception as e:
-        print(f"Error calling Google API: {e}")
-        QMessageBox.critical(main_window, "Google AI Error", f"Error communicating with Google AI: {e}")
+
+    return get_llm_scheduler().run("google", model, estimate_tokens(prompt), send, job=job, priority=priority)
+
+def _hedged_documentation(main_window, primary, system_prompt, project_text):
+    """
+    Sends the request to primary and hedges with the other provider if primary is
+    slower than its usual latency.
+
+    Returns:
+        str: The first successful answer, or None (after an error dialog) if both failed.
+    """
+    app_settings = getattr(main_window, "app_settings", None) or {}
+    secondary = "google" if primary == "openai" else "openai"
+    request_functions = {"openai": request_openai, "google": request_google}
+    requests = {}
+    for provider in (primary, secondary):
+        llm_settings = main_window.api_settings.get(provider, {})
+        requests[provider] = (
+            lambda function=request_functions[provider], s=llm_settings: function(
+                s.get("api_key"), s.get("model"), system_prompt, project_text, s.get("temperature", 0.7)
+            )
+        )
+
+    tracker = get_latency_tracker()
+    delay = tracker.hedge_delay(
+        primary,
+        percent=app_settings.get("llm_hedge_percentile", DEFAULT_HEDGE_PERCENTILE),
+        default=app_settings.get("llm_hedge_default_delay", DEFAULT_HEDGE_DELAY),
+    )
+    try:
+        provider, text = hedged_request(requests, primary, secondary, tracker, delay)
+    except RuntimeError as e:
+        logger.debug("Hedged LLM request failed: %s", e)
+        QMessageBox.critical(main_window, "LLM Error", f"Both providers failed:\n{e}")
         return None
+    if provider != primary:
+        logger.debug("Answer taken from hedge provider %s", provider)
+    return text
@@ -0,0 +1,308 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+DEFAULT_MAX_CONCURRENCY = 4
+# Buckets hold this many seconds of quota, so requests are paced evenly instead of
+# spending a whole minute's quota in one burst and then backing off
+BURST_SECONDS = 2.0
+MAX_RATE_LIMIT_RETRIES = 3
+DEFAULT_RETRY_AFTER = 2.0
+
+class TokenBucket:
+    """
+    Continuously refilled token bucket for one per-minute limit (requests or tokens).
+
+    A request larger than the bucket may proceed once the bucket is full and leaves
+    it in debt, so oversized requests are delayed but never starved.
+    """
+
+    def __init__(self, per_minute, burst_seconds=BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount, now):
+        """Returns the seconds until amount can be taken, 0 if it can be taken now."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount, now):
+        """Takes amount; call only after wait_time returned 0."""
+        self._refill(now)
+        self.level -= amount
+
+    def pause(self, seconds, now):
+        """Empties the bucket and blocks it for seconds, e.g. after an HTTP 429."""
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+        self.paused_until = max(self.paused_until, now + seconds)
+
+class _Request:
+    """A queued call with its scheduling data."""
+    __slots__ = ("provider", "model", "tokens", "function", "job", "priority", "sequence", "future", "attempts")
+
+    def __init__(self, provider, model, tokens, function, job, priority, sequence):
+        self.provider = provider
+        self.model = model
+        self.tokens = tokens
+        self.function = function
+        self.job = job
+        self.priority = priority
+        self.sequence = sequence
+        self.future = Future()
+        self.attempts = 0
+
+def is_rate_limit_error(error):
+    """True for HTTP 429 style errors of the OpenAI and Google SDKs."""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    name = type(error).__name__
+    return "RateLimit" in name or name == "ResourceExhausted"
+
+def _retry_after(error):
+    """Returns the Retry-After delay of an error's HTTP response, if it has one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMScheduler:
+    """
+    Runs LLM calls within per-provider and per-model request and token rate limits.
+
+    limits maps "provider" or "provider/model" to {"rpm": ..., "tpm": ...}; a call
+    must fit every bucket that applies to it. Waiting calls are dispatched by
+    priority (lower first), and within a priority the job that has used the fewest
+    tokens so far goes next, so one large job cannot starve the others. Calls that
+    fail with a rate-limit error pause their buckets and are queued again.
+    """
+
+    def __init__(self, limits=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, burst_seconds=BURST_SECONDS):
+        self._burst_seconds = burst_seconds
+        self._limits = {}
+        self._buckets = {}
+        self._set_limits(limits)
+        self._queues = {}  # job -> deque of _Request
+        self._served_tokens = {}  # job -> tokens dispatched so far
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._max_concurrency = max(1, max_concurrency)
+        self._running = 0
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix="llm-call")
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-scheduler", daemon=True)
+        self._dispatcher.start()
+
+    def _set_limits(self, limits):
+        """Builds the buckets of limits, keeping the state of those whose limit is unchanged."""
+        limits = {key: dict(limit) for key, limit in (limits or {}).items()}
+        buckets = {}
+        for key, limit in limits.items():
+            for kind in ("rpm", "tpm"):
+                if not limit.get(kind):
+                    continue
+                if self._limits.get(key, {}).get(kind) == limit[kind] and (key, kind) in self._buckets:
+                    buckets[(key, kind)] = self._buckets[(key, kind)]
+                else:
+                    buckets[(key, kind)] = TokenBucket(limit[kind], self._burst_seconds)
+        self._limits = limits
+        self._buckets = buckets
+
+    def matches(self, limits, max_concurrency):
+        """Returns True if the scheduler runs with these limits and concurrency."""
+        return self._limits == (limits or {}) and self._max_concurrency == max(1, max_concurrency)
+
+    def configure(self, limits=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """
+        Applies new limits and concurrency without dropping queued or running calls.
+
+        Buckets of unchanged limits keep their level and pauses. A new concurrency
+        gets a new worker pool; calls already running finish in the old one.
+        """
+        max_concurrency = max(1, max_concurrency)
+        with self._condition:
+            self._set_limits(limits)
+            old_executor = None
+            if max_concurrency != self._max_concurrency:
+                old_executor = self._executor
+                self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-call")
+                self._max_concurrency = max_concurrency
+            self._condition.notify()
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def submit(self, provider, model, tokens, function, job="default", priority=PRIORITY_NORMAL):
+        """
+        Queues function() for execution within the limits of provider and model.
+
+        Args:
+            provider (str): "openai" or "google".
+            model (str): Model name; limits keyed "provider/model" apply to it.
+            tokens (int): Estimated tokens the call consumes, charged against "tpm".
+            function (callable): Performs the call and returns its result.
+            job (str): Fairness group, e.g. one project of a batch.
+            priority (int): Lower values are dispatched first.
+
+        Returns:
+            concurrent.futures.Future: Resolves to function's result or exception.
+        """
+        request = _Request(provider, model, max(int(tokens), 0), function, job, priority, next(self._sequence))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("LLM scheduler is shut down")
+            queue = self._queues.setdefault(job, deque())
+            if not queue:
+                # A job (re)joining starts level with the active ones instead of
+                # claiming the capacity it did not use while idle
+                active = [self._served_tokens[j] for j, q in self._queues.items() if q]
+                self._served_tokens[job] = max(self._served_tokens.get(job, 0), min(active, default=0))
+            queue.append(request)
+            self._condition.notify()
+        return request.future
+
+    def run(self, provider, model, tokens, function, job="default", priority=PRIORITY_NORMAL):
+        """Like submit(), but waits for and returns the result."""
+        return self.submit(provider, model, tokens, function, job, priority).result()
+
+    def _buckets_for(self, request):
+        """Returns the (bucket, amount) pairs request must fit."""
+        pairs = []
+        for key in (request.provider, f"{request.provider}/{request.model}"):
+            bucket = self._buckets.get((key, "rpm"))
+            if bucket:
+                pairs.append((bucket, 1))
+            bucket = self._buckets.get((key, "tpm"))
+            if bucket:
+                pairs.append((bucket, request.tokens))
+        return pairs
+
+    def _next_request(self, now):
+        """
+        Pops the next dispatchable request, called with the condition held.
+
+        Returns:
+            tuple: (request, None) or (None, seconds to wait before trying again).
+        """
+        heads = [queue[0] for queue in self._queues.values() if queue]
+        heads.sort(key=lambda r: (r.priority, self._served_tokens[r.job], r.sequence))
+        blocked = set()
+        shortest_wait = None
+        for request in heads:
+            pairs = self._buckets_for(request)
+            # A request never overtakes a more deserving one waiting on the same buckets
+            if any(id(bucket) in blocked for bucket, _amount in pairs):
+                continue
+            wait = max((bucket.wait_time(amount, now) for bucket, amount in pairs), default=0.0)
+            if wait == 0:
+                for bucket, amount in pairs:
+                    bucket.take(amount, now)
+                self._queues[request.job].popleft()
+                return request, None
+            blocked.update(id(bucket) for bucket, _amount in pairs)
+            shortest_wait = wait if shortest_wait is None else min(shortest_wait, wait)
+        return None, shortest_wait
+
+    def _dispatch_loop(self):
+        """Dispatcher thread: starts requests as soon as their buckets allow."""
+        with self._condition:
+            while not self._closed:
+                if self._running >= self._max_concurrency:
+                    self._condition.wait()
+                    continue
+                request, wait = self._next_request(time.monotonic())
+                if request is None:
+                    self._condition.wait(wait)
+                    continue
+                self._served_tokens[request.job] += max(request.tokens, 1)
+                self._running += 1
+                self._executor.submit(self._execute, request)
+
+    def _execute(self, request):
+        """Worker: runs one request, re-queueing it after a rate-limit error."""
+        try:
+            # A retried request's future is already running
+            if request.attempts == 0 and not request.future.set_running_or_notify_cancel():
+                return
+            try:
+                result = request.function()
+            except Exception as e:
+                if is_rate_limit_error(e) and request.attempts < MAX_RATE_LIMIT_RETRIES:
+                    request.attempts += 1
+                    delay = _retry_after(e) or DEFAULT_RETRY_AFTER * request.attempts
+                    logger.warning("Rate limited by %s (%s), retrying in %.1fs", request.provider, e, delay)
+                    self._requeue(request, delay)
+                    return
+                request.future.set_exception(e)
+                return
+            request.future.set_result(result)
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify()
+
+    def _requeue(self, request, delay):
+        """Pauses the request's buckets for delay seconds and puts it back at the front of its job."""
+        with self._condition:
+            now = time.monotonic()
+            for bucket, _amount in self._buckets_for(request):
+                bucket.pause(delay, now)
+            self._queues.setdefault(request.job, deque()).appendleft(request)
+            self._condition.notify()
+
+    def shutdown(self, wait=True):
+        """Stops dispatching; queued requests are cancelled."""
+        with self._condition:
+            self._closed = True
+            for queue in self._queues.values():
+                for request in queue:
+                    if request.attempts:
+                        request.future.set_exception(RuntimeError("LLM scheduler is shut down"))
+                    else:
+                        request.future.cancel()
+                queue.clear()
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_llm_scheduler(app_settings=None):
+    """
+    Returns the process-wide scheduler, created from the "llm_rate_limits" and
+    "llm_max_concurrency" settings on first use. When app_settings is given and
+    these settings changed since, the scheduler is reconfigured in place.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or app_settings is not None:
+            app_settings = app_settings or {}
+            limits = app_settings.get("llm_rate_limits")
+            max_concurrency = int(app_settings.get("llm_max_concurrency", DEFAULT_MAX_CONCURRENCY))
+            if _scheduler is None:
+                _scheduler = LLMScheduler(limits=limits, max_concurrency=max_concurrency)
+            elif not _scheduler.matches(limits, max_concurrency):
+                logger.info("LLM rate limit settings changed, reconfiguring the scheduler")
+                _scheduler.configure(limits, max_concurrency)
+        return _scheduler
@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.chunker import chunk_source, format_chunk, pack_chunks
+from core.utils import estimate_tokens
+from utils.file_utils import get_base_dir
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_FILE = os.path.join("cache", "llm_summaries.sqlite3")
+# Part of every cache key: bump it whenever FILE_SUMMARY_PROMPT changes
+SUMMARY_PROMPT_VERSION = 1
+FILE_SUMMARY_PROMPT = (
+    "You summarize one source file for a project overview written later from many such summaries. "
+    "In at most 6 sentences, state the file's purpose, its main classes and functions with what they do, "
+    "and which other project files or libraries it relies on. Do not comment on code quality."
+)
+# Files larger than this are summarized in several requests, split at function boundaries
+SUMMARY_CHUNK_TOKENS = 6000
+DEFAULT_SUMMARY_WORKERS = 4
+
+def content_hash(text):
+    """Returns the cache key part identifying a file's content."""
+    return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).hexdigest()
+
+class SummaryCache:
+    """
+    Per-file LLM summaries in a local SQLite database, keyed by (content hash,
+    model, prompt version). Entries never go stale: a changed file, another model
+    or a new prompt simply use a different key. The connection may be used from
+    any thread.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_base_dir(), SUMMARY_CACHE_FILE)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "hash TEXT, model TEXT, prompt_version INTEGER, summary TEXT, created REAL, "
+                "PRIMARY KEY (hash, model, prompt_version))"
+            )
+
+    def get(self, digest, model):
+        """Returns the cached summary of content digest for model, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE hash = ? AND model = ? AND prompt_version = ?",
+                (digest, model, SUMMARY_PROMPT_VERSION),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest, model, summary):
+        """Stores a summary; it is committed at once, so an interrupted run keeps its progress."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                (digest, model, SUMMARY_PROMPT_VERSION, summary, time.time()),
+            )
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_summary_cache():
+    """Returns the process-wide SummaryCache stored under utils/cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
+
+def summarize_file(rel_path, content, request, target_tokens=SUMMARY_CHUNK_TOKENS):
+    """
+    Summarizes one file with request(system_prompt, content). Files over
+    target_tokens are split by core.chunker and summarized part by part.
+    """
+    if estimate_tokens(content) <= target_tokens:
+        return request(FILE_SUMMARY_PROMPT, f"File: {rel_path}\n{content}").strip()
+    batches = pack_chunks(chunk_source(rel_path, content, target_tokens), target_tokens)
+    parts = []
+    for number, batch in enumerate(batches, 1):
+        text = "".join(format_chunk(chunk) for chunk in batch)
+        prompt = f"{FILE_SUMMARY_PROMPT} This is part {number} of {len(batches)} of the file."
+        parts.append(request(prompt, text).strip())
+    return "\n".join(parts)
+
+def summarize_files(files, request, model, cache, max_workers=DEFAULT_SUMMARY_WORKERS):
+    """
+    Returns a summary per file, reusing cached summaries and requesting only those
+    of new or changed files.
+
+    Args:
+        files (list): (rel_path, content) pairs.
+        request (callable): request(system_prompt, content) returning the model's
+            answer or raising; called from worker threads.
+        model (str): Model identity for the cache key, e.g. "openai/gpt-4o".
+        cache (SummaryCache): Summary store.
+        max_workers (int): Summaries requested at once; the LLM scheduler still
+            enforces the rate limits.
+
+    Returns:
+        tuple: ({rel_path: summary} in the order of files, number of fresh summaries).
+
+    Raises:
+        Exception: The first failed request; summaries finished before it stay cached.
+    """
+    summaries = {}
+    missing = []
+    for rel_path, content in files:
+        digest = content_hash(content)
+        summary = cache.get(digest, model)
+        summaries[rel_path] = summary
+        if summary is None:
+            missing.append((rel_path, content, digest))
+    logger.info("LLM summaries: %d reused, %d to request", len(files) - len(missing), len(missing))
+
+    def summarize(item):
+        rel_path, content, digest = item
+        summary = summarize_file(rel_path, content, request)
+        cache.put(digest, model, summary)
+        return rel_path, summary
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="llm-summary") as executor:
+            for rel_path, summary in executor.map(summarize, missing):
+                summaries[rel_path] = summary
+    return summaries, len(missing)
+
+def format_summaries(summaries):
+    """Renders file summaries as the content of the overview request."""
+    parts = ["File summaries (one per project file):\n\n"]
+    for rel_path, summary in summaries.items():
+        parts.append(f"File: {rel_path}\n{summary}\n\n")
+    return "".join(parts)
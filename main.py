@@ -1,5 +1,28 @@
+import importlib
 import sys
 import os
+from utils.log_utils import setup_logging
+
+# Command line subcommands, imported only when used: (module, entry point)
+CLI_COMMANDS = {
+    "batch": ("core.batch", "batch_main"),
+    "watch": ("core.watch", "watch_main"),
+    "delta": ("core.delta", "delta_main"),
+    "symbols": ("core.symbols", "symbols_main"),
+    "verify": ("core.verify", "verify_main"),
+}
+
+def run_cli_command(argv):
+    """Runs the subcommand named by argv[0] with the remaining arguments and returns its exit code."""
+    module_name, function_name = CLI_COMMANDS[argv[0]]
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)(argv[1:])
+
+# Subcommands are dispatched before the GUI modules below are imported, so they never load Qt widgets
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+    setup_logging(quiet="--quiet" in sys.argv)
+    sys.exit(run_cli_command(sys.argv[1:]))
+
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -36,6 +59,7 @@ from core.reconstructor import (
     recreate_project_from_text,
     recreate_project_from_docx
 )
+from core.selection import SelectionTrie
 from core.processor import (
     process_project,
     update_action_state,
@@ -49,16 +73,17 @@ from core.utils import (
 )
 from llm.llm_manager import (
     generate_llm_documentation,
+    generate_llm_documentation_from_summaries,
     call_openai_api,
     call_google_api
 )
 from settings.settings_manager import (
     load_api_settings,
     load_app_settings,
-    save_settings
+    save_settings,
+    get_settings_store
 )
 from utils.file_utils import get_base_dir
-from utils.log_utils import setup_logging
 from gui.utils import set_menu_action_icon, set_button_icon  # Import the missing functions
 
 class ProjectManagerGUI(QMainWindow):
@@ -72,6 +97,9 @@ class ProjectManagerGUI(QMainWindow):
         self.icons_dir = os.path.join(self.base_dir, "icons")
         self.api_settings = load_api_settings(self.base_dir)
         self.app_settings = load_app_settings(self.base_dir)
+        self.settings_store = get_settings_store(self.base_dir)
+        self.settings_store.add_listener(self._on_settings_changed)
+        self.profile_enabled = "--profile" in sys.argv or self.app_settings.get("profile", False)
         self.recent_project_path = self.api_settings.get("recent_paths", {}).get("project", "")
         self.recent_doc_path = self.api_settings.get("recent_paths", {}).get("doc", "")
         self.project_path = None
@@ -91,6 +119,7 @@ class ProjectManagerGUI(QMainWindow):
         self.project_tree_view.setColumnHidden(3, True)
 
         self.selected_files_for_compression = []
+        self.selection_trie = SelectionTrie()
 
         _init_menu(self)
         _init_buttons(self)
@@ -114,6 +143,17 @@ class ProjectManagerGUI(QMainWindow):
         """Helper function to set icon for a button."""
         set_button_icon(button, icon_name, self.base_dir)
 
+    def _on_settings_changed(self, changed_keys):
+        """Keeps the in-memory settings in sync with changes saved elsewhere in the process."""
+        stored = self.settings_store.snapshot()
+        for key in changed_keys:
+            if key in stored:
+                self.api_settings[key] = stored[key]
+                self.app_settings[key] = stored[key]
+            else:
+                self.api_settings.pop(key, None)
+                self.app_settings.pop(key, None)
+
     def closeEvent(self, event):
         """Save settings before closing the application."""
         save_settings(self)
@@ -137,6 +177,7 @@ class ProjectManagerGUI(QMainWindow):
     _process_single_file = _process_single_file
     get_project_content_for_llm = get_project_content_for_llm
     generate_llm_documentation = generate_llm_documentation
+    generate_llm_documentation_from_summaries = generate_llm_documentation_from_summaries
     call_openai_api = call_openai_api
     call_google_api = call_google_api
     show_llm_info_dialog = show_llm_info_dialog
@@ -145,7 +186,7 @@ class ProjectManagerGUI(QMainWindow):
     _read_file_content = _read_file_content
 
 if __name__ == "__main__":
-    setup_logging()
+    setup_logging(quiet="--quiet" in sys.argv)
     app = QApplication(sys.argv)
     ex = ProjectManagerGUI()
     sys.exit(app.exec_())
@@ -1,50 +1,284 @@
+import atexit
+import copy
 import json
+import logging
 import os
-from PyQt5.QtWidgets import QMessageBox
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic replace still prevents torn files, but merges are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE_NAME = "settings.json"
+# Seconds a change waits for further changes before settings.json is written
+SAVE_DEBOUNCE = 1.0
+_DELETED = object()
+
+class SettingsStore:
+    """
+    Cached, process-wide view of one settings.json file.
+
+    The file is read once and kept in memory; it is only read again if another
+    process replaced it since. Changes are collected and written after a short
+    debounce. A write first re-reads the file and applies only the keys changed
+    here, so concurrent processes do not drop each other's keys. The file is written
+    to a temporary file and renamed over the original, so readers never see a
+    partial file. Listeners are called with the set of changed keys.
+    """
+
+    def __init__(self, settings_path, debounce=SAVE_DEBOUNCE):
+        self.settings_path = settings_path
+        self.debounce = debounce
+        self._data = None
+        self._signature = None
+        self._pending = {}
+        self._listeners = []
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def _file_signature(self):
+        """Returns (mtime_ns, size) of the settings file, or None if it does not exist."""
+        try:
+            stat = os.stat(self.settings_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self):
+        """Reads the settings file. Raises OSError or ValueError for unreadable files."""
+        with open(self.settings_path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        if not isinstance(settings, dict):
+            raise ValueError("settings.json does not hold a JSON object")
+        return settings
+
+    def _ensure_loaded(self):
+        """Loads the file on first use and again whenever another process replaced it."""
+        signature = self._file_signature()
+        if self._data is not None and signature == self._signature:
+            return
+        data = self._read_file() if signature is not None else {}
+        # Changes not written yet win over the file's contents
+        for key, value in self._pending.items():
+            if value is _DELETED:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self._data = data
+        self._signature = signature
+
+    @property
+    def exists(self):
+        """True if the settings file exists on disk."""
+        return self._file_signature() is not None
+
+    def snapshot(self):
+        """
+        Returns a deep copy of all settings.
+
+        Raises:
+            OSError, ValueError: If the settings file cannot be read or parsed.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._data)
+
+    def get(self, key, default=None):
+        """Returns a copy of one setting."""
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._data.get(key, default))
+
+    def update(self, values=None, remove=()):
+        """
+        Changes settings in memory and schedules a debounced write.
+
+        Args:
+            values (dict, optional): Keys to set.
+            remove (iterable, optional): Keys to delete.
+
+        Returns:
+            set: The keys whose values actually changed.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            changed = set()
+            for key, value in (values or {}).items():
+                if key not in self._data or self._data[key] != value:
+                    self._data[key] = self._pending[key] = copy.deepcopy(value)
+                    changed.add(key)
+            for key in remove:
+                if key in self._data:
+                    del self._data[key]
+                    self._pending[key] = _DELETED
+                    changed.add(key)
+            if changed:
+                self._schedule_save()
+            listeners = list(self._listeners)
+        if changed:
+            for listener in listeners:
+                try:
+                    listener(changed)
+                except Exception as e:
+                    logger.error("Settings listener failed: %s", e)
+        return changed
+
+    def add_listener(self, listener):
+        """Registers listener(changed_keys), called after every update that changed something."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Unregisters a listener added with add_listener."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _schedule_save(self):
+        """(Re)starts the debounce timer; called with the lock held."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self._save_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _save_from_timer(self):
+        """Timer callback: writes pending changes, logging instead of raising."""
+        try:
+            self.flush()
+        except (OSError, ValueError) as e:
+            logger.error("Could not save settings to %s: %s", self.settings_path, e)
+
+    def flush(self):
+        """
+        Writes pending changes now.
+
+        Raises:
+            OSError: If the settings file cannot be written.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            settings_dir = os.path.dirname(self.settings_path) or "."
+            os.makedirs(settings_dir, exist_ok=True)
+            # Locking the folder serializes writers across processes without a lock file
+            dir_fd = os.open(settings_dir, os.O_RDONLY) if fcntl is not None else None
+            try:
+                if dir_fd is not None:
+                    fcntl.flock(dir_fd, fcntl.LOCK_EX)
+                # Re-read under the lock, so keys written by other processes are kept
+                try:
+                    self._data = None
+                    self._ensure_loaded()
+                except ValueError:
+                    logger.warning("settings.json is damaged, rewriting it from memory")
+                    self._data = {k: v for k, v in self._pending.items() if v is not _DELETED}
+                temp_path = f"{self.settings_path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.settings_path)
+                self._signature = self._file_signature()
+                self._pending.clear()
+            finally:
+                if dir_fd is not None:
+                    os.close(dir_fd)
+        logger.debug("Settings saved to %s", self.settings_path)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_settings_store(base_dir):
+    """Returns the process-wide SettingsStore of base_dir/settings.json."""
+    settings_path = os.path.abspath(os.path.join(base_dir, SETTINGS_FILE_NAME))
+    with _stores_lock:
+        store = _stores.get(settings_path)
+        if store is None:
+            store = _stores[settings_path] = SettingsStore(settings_path)
+        return store
+
+@atexit.register
+def flush_all_settings():
+    """Writes the pending changes of every store; runs at interpreter exit."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        try:
+            store.flush()
+        except OSError as e:
+            logger.error("Could not save settings to %s: %s", store.settings_path, e)
 
 def load_api_settings(base_dir):
     """Load API settings and other persistent data from settings.json."""
-    settings_path = os.path.join(base_dir, "settings.json")
+    from PyQt5.QtWidgets import QMessageBox
     default_settings = {"recent_paths": {"project": "", "doc": ""}}
+    store = get_settings_store(base_dir)
 
     try:
-        if not os.path.exists(settings_path):
-            print("settings.json not found. Starting with default settings.")
+        if not store.exists:
+            logger.info("settings.json not found. Starting with default settings.")
             return default_settings
 
-        with open(settings_path, "r") as f:
-            settings = json.load(f)
-            # Ensure default structure for recent paths
-            if "recent_paths" not in settings:
-                settings["recent_paths"] = default_settings["recent_paths"]
-            return settings
+        settings = store.snapshot()
+        # Ensure default structure for recent paths
+        if "recent_paths" not in settings:
+            settings["recent_paths"] = default_settings["recent_paths"]
+        return settings
     except json.JSONDecodeError:
-        print("Error decoding settings.json. Please check the file format.")
+        logger.error("Error decoding settings.json. Please check the file format.")
         QMessageBox.warning(None, "Settings Error", "Error reading settings file. Starting with default settings.")
         return default_settings
     except Exception as e:
-        print(f"Unexpected error loading settings: {e}")
+        logger.error("Unexpected error loading settings: %s", e)
         QMessageBox.critical(None, "Settings Error", f"Failed to load settings: {e}")
         return default_settings
 
 def load_app_settings(base_dir):
     """Loads application settings from settings.json, or sets default values."""
+    from PyQt5.QtWidgets import QMessageBox
     default_settings = {
         "output_format": "txt",
         "llm_temperature": 0.7,
-        "recursive_selection": True
+        "recursive_selection": True,
+        "profile": False,
+        "profile_top_n": 30,
+        "profile_tracemalloc_frames": 1,
+        "profile_cprofile": True,
+        "shard_max_bytes": 0,
+        "shard_max_tokens": 0,
+        "reconstruct_workers": 4,
+        "structure_token_estimates": True,
+        "exact_token_counts": True,
+        "llm_minify": False,
+        "llm_minify_docstrings": False,
+        "llm_hedging": False,
+        "llm_hedge_percentile": 95,
+        "llm_hedge_default_delay": 30.0,
+        "llm_rate_limits": {},
+        "llm_max_concurrency": 4,
+        "symbol_index": True,
+        "dependency_section": True,
+        "llm_summary_cache": True,
+        "restore_incremental": False,
+        "restore_delete_extra": False
     }
 
+    store = get_settings_store(base_dir)
     try:
-        settings_path = os.path.join(base_dir, "settings.json")
-        if not os.path.exists(settings_path):
+        if not store.exists:
             # Create a new settings.json file if it doesn't exist
-            with open(settings_path, "w") as f:
-                json.dump(default_settings, f, indent=4)
-            print("New settings.json file created.")
+            store.update(default_settings)
+            store.flush()
+            logger.info("New settings.json file created.")
 
-        with open(settings_path, "r") as f:
-            app_settings = json.load(f)
+        app_settings = store.snapshot()
 
         # Ensure default values are present
         for key, value in default_settings.items():
@@ -52,35 +286,39 @@ def load_app_settings(base_dir):
                 app_settings[key] = value
 
     except (FileNotFoundError, PermissionError) as e:
-        print(f"Error accessing settings.json: {e}")
+        logger.error("Error accessing settings.json: %s", e)
         QMessageBox.critical(None, "Error", f"Could not access settings file: {e}")
         app_settings = default_settings
     except json.JSONDecodeError:
-        print("Error decoding settings.json. Using default settings.")
+        logger.error("Error decoding settings.json. Using default settings.")
         app_settings = default_settings
     except Exception as e:
-        print(f"Unexpected error loading settings: {e}")
+        logger.error("Unexpected error loading settings: %s", e)
         app_settings = default_settings
-    
-    print(f"Application settings loaded: {app_settings}")
+
+    logger.info("Application settings loaded from %s", store.settings_path)
     return app_settings
 
 def save_settings(main_window):
     """Save settings before closing the application."""
+    from PyQt5.QtWidgets import QMessageBox
     try:
         # Save recent paths
-        main_window.api_settings["recent_paths"] = {
+        recent_paths = {
             "project": main_window.recent_project_path,
             "doc": main_window.recent_doc_path
         }
+        main_window.api_settings["recent_paths"] = recent_paths
 
-        settings_path = os.path.join(main_window.base_dir, "settings.json")
-        with open(settings_path, "w") as f:
-            json.dump(main_window.api_settings, f, indent=4)
-        print("Settings saved successfully on close.")
+        # Only the keys this window owns: the rest of api_settings may be stale copies
+        # of keys another writer has changed since
+        store = get_settings_store(main_window.base_dir)
+        store.update({"recent_paths": recent_paths})
+        store.flush()
+        logger.info("Settings saved successfully on close.")
     except (FileNotFoundError, PermissionError) as e:
-        print(f"Error saving settings on close: {e}")
+        logger.error("Error saving settings on close: %s", e)
         QMessageBox.critical(main_window, "Error", f"Could not save settings on close. Check file permissions: {e}")
     except Exception as e:
-        print(f"Error saving settings on close: {e}")
+        logger.error("Error saving settings on close: %s", e)
         QMessageBox.critical(main_window, "Error", f"Error saving settings: {e}")
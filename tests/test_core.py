@@ -1,13 +1,32 @@
 import unittest
+import ast
 import os
+import json
 import shutil
+import threading
+import time
+from unittest import mock
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from PyQt5.QtCore import QDir, Qt
 from core.project import select_folder, select_all_in_folder, on_tree_selection_changed, reset_project_selection, get_project_structure
 from core.document import select_file, reset_doc_selection, convert_project_to_text, create_project_documentation, convert_docx_to_txt
-from core.reconstructor import recreate_project_from_text, recreate_project_from_docx
-from core.processor import process_project, update_action_state, _process_single_file, get_project_content_for_llm
-from core.utils import _read_file_content, has_extension, has_any_extension
+from core.reconstructor import recreate_project_from_text, recreate_project_from_docx, iter_file_blocks, resolve_delta_chain
+from core.processor import process_project, update_action_state, _process_single_file, get_project_content_for_llm, get_project_chunks_for_llm
+from core.scanner import scan_project, walk_manifest
+from core.selection import SelectionTrie
+from core.batch import read_batch_manifest, run_batch
+from core.watch import LiveDocumentation, watch_project
+from core.delta import create_delta_documentation, build_doc_index, delta_main
+from core.verify import load_doc_checksums, verify_tree
+from core.document import build_project_sections, build_project_text, plan_shards, write_shards
+from core.reconstructor import RestoreState, _delete_undocumented_files, _restore_document, load_shard_manifest
+from core.tokens import TokenEstimator, context_budget
+from core.minify import minify_source
+from core.chunker import chunk_source, pack_chunks, split_segments
+from core.symbols import SymbolIndex
+from core.dependencies import ManifestCache, collect_dependencies, format_dependency_section, parse_manifest
+from core.utils import _read_file_content, content_digest, file_digest, has_extension, has_any_extension, read_file_with_policy
+from utils.perf_utils import RunReport
 from gui.layout import init_project_manager_ui
 
 class TestCore(unittest.TestCase):
@@ -32,6 +51,7 @@ class TestCore(unittest.TestCase):
         self.main_window.recent_project_path = ""
         self.main_window.recent_doc_path = ""
         self.main_window.selected_files_for_compression = []
+        self.main_window.selection_trie = SelectionTrie()
         self.main_window.api_settings = {}
         self.main_window.llm_type_group = None
         self.main_window.overview_type_group = None
@@ -132,6 +152,54 @@ class TestCore(unittest.TestCase):
         expected_structure = f"test_project/\n  +-- subdir/\n    +-- test_file2.txt\n  +-- test_file.txt"
         self.assertEqual(structure, expected_structure)
 
+    def test_scan_project(self):
+        """
+        Test the scan_project function, including directory symlinks and a symlink loop.
+        """
+        os.makedirs(os.path.join(self.main_window.project_path, "subdir"), exist_ok=True)
+        with open(os.path.join(self.main_window.project_path, "subdir", "test_file2.txt"), "w") as f:
+            f.write("Test file 2 content")
+        os.symlink(self.main_window.project_path, os.path.join(self.main_window.project_path, "subdir", "loop"))
+
+        manifest = scan_project(self.main_window.project_path, max_workers=4, follow_symlinks=True)
+        self.assertEqual(
+            [entry.rel_path for entry in manifest],
+            ["subdir", os.path.join("subdir", "test_file2.txt"), "test_file.txt"],
+        )
+
+        outside = os.path.join(self.main_window.project_path, "subdir", "linked")
+        os.symlink(os.path.dirname(__file__), outside)
+        manifest = scan_project(self.main_window.project_path, max_workers=4)
+
+        self.assertEqual(
+            [entry.rel_path for entry in manifest],
+            ["subdir", os.path.join("subdir", "test_file2.txt"), "test_file.txt"],
+        )
+        self.assertEqual(manifest[2].size, len("Test file content"))
+        roots = [rel_root for _, rel_root, _, _ in walk_manifest(self.main_window.project_path, manifest)]
+        self.assertEqual(roots, ["", "subdir"])
+
+    def test_selection_trie(self):
+        """
+        Test SelectionTrie marks resolved against a scan manifest.
+        """
+        os.makedirs(os.path.join(self.main_window.project_path, "subdir", "deep"), exist_ok=True)
+        for rel_path in [os.path.join("subdir", "a.txt"), os.path.join("subdir", "deep", "b.txt")]:
+            with open(os.path.join(self.main_window.project_path, rel_path), "w") as f:
+                f.write("content")
+
+        trie = SelectionTrie()
+        self.assertEqual(trie.resolve(scan_project(self.main_window.project_path)), [])
+        trie.mark(self.main_window.project_path.replace(os.sep, "/") + "/subdir")
+        trie.mark(os.path.join(self.main_window.project_path, "subdir", "deep"), include=False)
+        trie.mark(os.path.join(self.main_window.project_path, "test_file.txt"))
+
+        selected = trie.resolve(scan_project(self.main_window.project_path))
+        self.assertEqual(
+            sorted(os.path.relpath(path, self.main_window.project_path) for path in selected),
+            [os.path.join("subdir", "a.txt"), "test_file.txt"],
+        )
+
     def test_select_file(self):
         """
         Test the select_file function.
@@ -238,6 +306,17 @@ class TestCore(unittest.TestCase):
             content = f.read()
         self.assertEqual(content.strip(), "Test file 2 content")
 
+    def test_iter_file_blocks(self):
+        """
+        Test iter_file_blocks
+        """
+        content = (
+            b"## Files Content\n### File: test_file.txt\n```text\nTest file content\n```\n"
+            b"### File: subdir/empty.py\n\n```python\n\n```\n"
+        )
+        blocks = [(name, content[start:end], note) for name, start, end, note in iter_file_blocks(content)]
+        self.assertEqual(blocks, [("test_file.txt", b"Test file content", None), ("subdir/empty.py", b"", None)])
+
     def test_recreate_project_from_docx(self):
         """
         Test the recreate_project_from_docx function.
@@ -321,7 +400,10 @@ class TestCore(unittest.TestCase):
         Test process single file
         """
         result = _process_single_file(self.main_window, self.main_window.project_path, "test_file.txt", self.main_window.project_path)
-        self.assertEqual(result, ["### File: test_file.txt\n\n", "```text\n", "Test file content", "\n```\n\n"])
+        checksum = content_digest(b"Test file content")
+        self.assertEqual(result, [
+            "### File: test_file.txt\n\n", f"> SHA-256: {checksum}\n\n", "```text\n", "Test file content", "\n```\n\n",
+        ])
 
     def test_get_project_content_for_llm(self):
         """
@@ -337,6 +419,22 @@ class TestCore(unittest.TestCase):
         result = _read_file_content(os.path.join(self.main_window.project_path, "test_file.txt"))
         self.assertEqual(result, "Test file content")
 
+    def test_read_file_with_policy(self):
+        """
+        Test read file with policy
+        """
+        log_file = os.path.join(self.main_window.project_path, "big.log")
+        with open(log_file, "w") as f:
+            f.writelines(f"line {i}\n" for i in range(100000))
+        content, note = read_file_with_policy(log_file)
+        self.assertTrue(note.startswith("tail 500 lines"))
+        self.assertEqual(content.splitlines()[-1], "line 99999")
+        self.assertEqual(len(content.splitlines()), 500)
+
+        content, note = read_file_with_policy(os.path.join(self.main_window.project_path, "test_file.txt"))
+        self.assertEqual(content, "Test file content")
+        self.assertIsNone(note)
+
     def test_has_extension(self):
         """
         Test has extension
@@ -351,5 +449,477 @@ class TestCore(unittest.TestCase):
         self.assertTrue(has_any_extension("test_file.txt", [".txt", ".docx"]))
         self.assertFalse(has_any_extension("test_file.txt", [".py", ".js"]))
 
+    def test_run_batch(self):
+        """
+        Test batch compression with a manifest, including a failing root
+        """
+        manifest_path = os.path.join(self.main_window.project_path, "roots.txt")
+        with open(manifest_path, "w") as f:
+            f.write("# projects\n\n.\nmissing\n")
+        roots = read_batch_manifest(manifest_path)
+        self.assertEqual(roots, [os.path.normpath(self.main_window.project_path),
+                                 os.path.join(os.path.normpath(self.main_window.project_path), "missing")])
+
+        output_root = os.path.join(self.main_window.project_path, "project_documentation_batch")
+        results = run_batch(roots, output_root, workers=2, time_limit=60,
+                            profile_settings={"profile_top_n": 5, "profile_tracemalloc_frames": 0})
+        self.assertEqual([r["status"] for r in results], ["ok", "failed"])
+        with open(results[0]["output_file"], "r", encoding="utf-8") as f:
+            self.assertIn("### File: test_file.txt", f.read())
+        # Every job is profiled into its own output folder, with the configured overhead
+        profile_files = [name for name in os.listdir(results[0]["output_dir"]) if name.startswith("compress_profile")]
+        self.assertEqual(sorted(profile_files), ["compress_profile.prof", "compress_profile_cumulative.txt"])
+
+    def test_live_documentation(self):
+        """
+        Test that watch mode updates only changed file blocks
+        """
+        live = LiveDocumentation(self.main_window.project_path)
+        changed, removed = live.update()
+        self.assertEqual((changed, removed), (["test_file.txt"], []))
+
+        self.assertEqual(live.update(), ([], []))
+        self.assertFalse(live.structure_changed)
+
+        test_file = os.path.join(self.main_window.project_path, "test_file.txt")
+        changed, removed = live.update(touched={test_file})
+        self.assertEqual(changed, ["test_file.txt"])
+
+        with open(os.path.join(self.main_window.project_path, "new.py"), "w") as f:
+            f.write("x = 1")
+        os.remove(test_file)
+        changed, removed = live.update()
+        self.assertEqual((changed, removed), (["new.py"], ["test_file.txt"]))
+        self.assertTrue(live.structure_changed)
+        self.assertIn("### File: new.py\n\n", live.render())
+
+    def test_watch_output_inside_project(self):
+        """
+        Test that a watch output file inside the project is not documented in itself
+        """
+        output_file = os.path.join(self.main_window.project_path, "docs", "live.txt")
+        watcher = threading.Thread(
+            target=watch_project,
+            args=(self.main_window.project_path, output_file),
+            kwargs={"debounce": 0.1, "force_polling": True, "poll_interval": 0.1, "max_updates": 1},
+        )
+        watcher.start()
+        deadline = time.monotonic() + 10
+        while not os.path.exists(output_file) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with open(os.path.join(self.main_window.project_path, "new.py"), "w") as f:
+            f.write("x = 1")
+        watcher.join(10)
+        self.assertFalse(watcher.is_alive())
+        with open(output_file, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("### File: new.py", content)
+        self.assertNotIn("live.txt", content)
+
+    def test_create_delta_documentation(self):
+        """
+        Test delta documentation against a full base and chained onto a previous delta
+        """
+        project = os.path.join(self.main_window.project_path, "delta_project")
+        os.makedirs(project)
+        for name, content in (("a.py", "a = 1"), ("b.md", "b"), ("c.txt", "c")):
+            with open(os.path.join(project, name), "w") as f:
+                f.write(content)
+        base_doc = os.path.join(self.main_window.project_path, "base.txt")
+        with open(base_doc, "w", encoding="utf-8") as f:
+            f.writelines(build_project_text(project)[0])
+
+        with open(os.path.join(project, "a.py"), "w") as f:
+            f.write("a = 2")
+        with open(os.path.join(project, "new.py"), "w") as f:
+            f.write("n = 1")
+        os.remove(os.path.join(project, "c.txt"))
+        delta_doc, added, modified, deleted = create_delta_documentation(project, base_doc)
+        self.assertEqual((added, modified, deleted), (["new.py"], ["a.py"], ["c.txt"]))
+        with open(delta_doc, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("Base: base.txt\n", content)
+        self.assertNotIn("### File: b.md", content)
+
+        os.remove(os.path.join(project, "new.py"))
+        second_delta = create_delta_documentation(project, delta_doc, os.path.join(self.main_window.project_path, "delta2.txt"))
+        self.assertEqual(second_delta[1:], ([], [], ["new.py"]))
+        self.assertEqual(sorted(build_doc_index(second_delta[0])["files"]), ["a.py", "b.md"])
+
+        third_delta = os.path.join(self.main_window.project_path, "delta3.txt")
+        self.assertEqual(delta_main([project, "--base", second_delta[0], "--output", third_delta, "--profile"]), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.main_window.project_path, "delta_profile.prof")))
+        with open(os.path.join(self.main_window.project_path, "delta3_performance_report.json"), "r") as f:
+            self.assertEqual(json.load(f)["operation"], "delta")
+
+    def test_delta_on_sharded_base(self):
+        """
+        Test a delta made against a .shards.json manifest and restoring it
+        """
+        project = os.path.join(self.main_window.project_path, "sharded_project")
+        os.makedirs(project)
+        for number in range(4):
+            with open(os.path.join(project, f"m{number}.py"), "w") as f:
+                f.write(f"m = {number}\n" * 20)
+        header_lines, blocks, _ = build_project_sections(project)
+        manifest_path = write_shards(self.main_window.project_path, "sharded", "sharded_project", header_lines, blocks,
+                                     max_bytes=400)
+        self.assertGreater(len(load_shard_manifest(manifest_path)), 1)
+
+        with open(os.path.join(project, "m1.py"), "w") as f:
+            f.write("m = 'changed'\n")
+        os.remove(os.path.join(project, "m2.py"))
+        delta_doc, added, modified, deleted = create_delta_documentation(project, manifest_path)
+        self.assertEqual((added, modified, deleted), ([], ["m1.py"], ["m2.py"]))
+        self.assertEqual(resolve_delta_chain(delta_doc)[-1], os.path.abspath(manifest_path))
+        self.assertEqual(sorted(build_doc_index(delta_doc)["files"]), ["m0.py", "m1.py", "m3.py"])
+
+        with mock.patch("PyQt5.QtWidgets.QMessageBox"):
+            recreate_project_from_text(self.main_window, delta_doc, "restored_sharded", self.main_window.project_path)
+        restored = os.path.join(self.main_window.project_path, "restored_sharded")
+        self.assertEqual(verify_tree(delta_doc, restored).matched, ["m0.py", "m1.py", "m3.py"])
+        with open(os.path.join(restored, "m3.py"), "r") as f:
+            self.assertEqual(f.read(), ("m = 3\n" * 20).strip())
+
+    def test_verify_tree(self):
+        """
+        Test embedded checksums and verifying a folder against them
+        """
+        project = os.path.join(self.main_window.project_path, "verify_project")
+        os.makedirs(os.path.join(project, "pkg"))
+        files = {"a.py": b"\n\na = 1\r\nb = 2\r\n\n", "pkg/b.md": b"# B\n\ntext  \n", "c.txt": b"c"}
+        for rel_path, data in files.items():
+            with open(os.path.join(project, *rel_path.split("/")), "wb") as f:
+                f.write(data)
+        for rel_path, data in files.items():
+            normalized = data.replace(b"\r\n", b"\n")
+            # Reads smaller than the content exercise whitespace and \r\n split across reads
+            self.assertEqual(file_digest(os.path.join(project, *rel_path.split("/")), chunk_size=3),
+                             content_digest(normalized))
+
+        doc_file = os.path.join(self.main_window.project_path, "verify_doc.txt")
+        with open(doc_file, "w", encoding="utf-8") as f:
+            f.writelines(build_project_text(project)[0])
+        with open(doc_file, "rb") as f:
+            blocks = list(iter_file_blocks(f.read(), with_checksum=True))
+        self.assertEqual([block[0] for block in blocks], ["a.py", "c.txt", "pkg/b.md"])
+        self.assertEqual(blocks[1][4], content_digest(b"c"))
+        self.assertEqual(load_doc_checksums(doc_file)["pkg/b.md"], content_digest(b"# B\n\ntext"))
+
+        result = verify_tree(doc_file, project, workers=2)
+        self.assertEqual(result.matched, ["a.py", "c.txt", "pkg/b.md"])
+        self.assertEqual(result.mismatched + result.missing + result.extra + result.unverified, [])
+
+        with open(os.path.join(project, "a.py"), "w") as f:
+            f.write("a = 3")
+        os.remove(os.path.join(project, "c.txt"))
+        with open(os.path.join(project, "pkg", "new.py"), "w") as f:
+            f.write("n = 1")
+        with open(os.path.join(project, "image.png"), "wb") as f:
+            f.write(b"\x89PNG")
+        result = verify_tree(doc_file, project)
+        self.assertEqual((result.matched, result.mismatched, result.missing, result.extra),
+                         (["pkg/b.md"], ["a.py"], ["c.txt"], ["pkg/new.py"]))
+
+    def test_incremental_restore(self):
+        """
+        Test that an incremental restore writes only changed files and can delete extra ones
+        """
+        project = os.path.join(self.main_window.project_path, "restore_project")
+        os.makedirs(os.path.join(project, "pkg"))
+        for rel_path, content in (("a.py", "a = 1\n"), ("pkg/b.md", "# B\n"), ("c.txt", "c")):
+            with open(os.path.join(project, *rel_path.split("/")), "w") as f:
+                f.write(content)
+        doc_file = os.path.join(self.main_window.project_path, "restore_doc.txt")
+        with open(doc_file, "w", encoding="utf-8") as f:
+            f.writelines(build_project_text(project)[0])
+
+        target = os.path.join(self.main_window.project_path, "restored")
+        state = RestoreState()
+        _restore_document(doc_file, target, None, state)
+        self.assertEqual(sorted(state.written), ["a.py", "c.txt", "pkg/b.md"])
+
+        # The original keeps its trailing newline, which the documentation drops
+        state = RestoreState(incremental=True)
+        _restore_document(doc_file, project, None, state)
+        self.assertEqual((state.written, sorted(state.skipped)), ([], ["a.py", "c.txt", "pkg/b.md"]))
+
+        a_path = os.path.join(target, "a.py")
+        os.utime(a_path, (1, 1))
+        with open(os.path.join(target, "c.txt"), "w") as f:
+            f.write("changed")
+        with open(os.path.join(target, "new.py"), "w") as f:
+            f.write("n = 1")
+        with open(os.path.join(target, "image.png"), "wb") as f:
+            f.write(b"\x89PNG")
+        state = RestoreState(incremental=True)
+        _restore_document(doc_file, target, None, state)
+        _delete_undocumented_files(target, state)
+        self.assertEqual((state.written, state.deleted), (["c.txt"], ["new.py"]))
+        self.assertEqual(os.path.getmtime(a_path), 1)
+        self.assertTrue(os.path.exists(os.path.join(target, "image.png")))
+        with open(os.path.join(target, "c.txt"), "r") as f:
+            self.assertEqual(f.read(), "c")
+
+    def test_write_shards(self):
+        """
+        Test that shards break at file boundaries and are listed in the manifest
+        """
+        header_lines = ["# Project Documentation: p\n", "## Files Content\n\n"]
+        blocks = [(f"f{i}.py", [f"### File: f{i}.py\n\n", "```python\n", "x" * 100, "\n```\n\n"]) for i in range(5)]
+        blocks.append(("big.py", ["### File: big.py\n\n", "```python\n", "y" * 1000, "\n```\n\n"]))
+
+        shards = plan_shards(header_lines, blocks, max_bytes=320)
+        self.assertEqual([[block[0] for block in shard] for shard in shards],
+                         [["f0.py", "f1.py"], ["f2.py", "f3.py"], ["f4.py"], ["big.py"]])
+
+        manifest_path = write_shards(self.main_window.project_path, "doc", "p", header_lines, blocks, max_bytes=320)
+        shard_paths = load_shard_manifest(manifest_path)
+        self.assertEqual(len(shard_paths), 4)
+        with open(shard_paths[1], "r", encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith("# Project Documentation: p (part 2 of 4)"))
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.assertTrue(json.load(f)["shards"][3]["oversized"])
+
+    def test_token_estimates(self):
+        """
+        Test token estimates, their directory rollup and the structure annotations
+        """
+        os.makedirs(os.path.join(self.main_window.project_path, "pkg"))
+        with open(os.path.join(self.main_window.project_path, "pkg", "mod.py"), "w") as f:
+            f.write("x" * 4000)
+        manifest = scan_project(self.main_window.project_path)
+        with open(os.path.join(self.main_window.project_path, "pkg", "logo.png"), "wb") as f:
+            f.write(b"\x89PNG" * 1000)
+        manifest = scan_project(self.main_window.project_path)
+        counts = TokenEstimator(exact=False).count_manifest(manifest)
+        # Never placed in the documentation, so not counted
+        self.assertNotIn(os.path.join("pkg", "logo.png"), counts)
+        self.assertEqual(counts[os.path.join("pkg", "mod.py")], 1000)
+        self.assertEqual(counts["pkg"], 1000)
+        self.assertEqual(counts[""], 1000 + counts["test_file.txt"])
+
+        structure = get_project_structure(self.main_window.project_path, manifest, counts)
+        self.assertIn("pkg/  [~1.0k tokens]", structure)
+        self.assertIn("mod.py  [~1.0k tokens]", structure)
+
+        content = get_project_content_for_llm(self.main_window, self.main_window.project_path, manifest, max_tokens=100,
+                                              token_estimator=TokenEstimator(exact=False))
+        self.assertIn("File: test_file.txt", content)
+        self.assertNotIn("xxxx", content)
+        self.assertIn("- " + os.path.join("pkg", "mod.py"), content)
+
+        self.assertEqual(context_budget("models/gemini-1.5-pro"), 2000000 - 4096)
+        self.assertEqual(context_budget("gpt-4o-2024-08-06"), 128000 - 4096)
+        self.assertEqual(context_budget("gpt-4-0613"), 8192 - 4096)
+        self.assertIsNone(context_budget("some-new-model"))
+
+        # Exact counts read a file again only when its size or mtime changed
+        cache_path = os.path.join(self.main_window.project_path, "token_cache.json")
+        estimator = TokenEstimator(exact=False, cache_path=cache_path)
+        estimator.tokenizer = ("words", str.split)
+        entry = next(entry for entry in manifest if entry.name == "test_file.txt")
+        self.assertEqual(estimator.count_entry(entry), 3)
+        estimator.save()
+        with open(entry.path, "w") as f:
+            f.write("Test-file-content")
+        os.utime(entry.path, (entry.mtime, entry.mtime))
+        estimator = TokenEstimator(exact=False, cache_path=cache_path)
+        estimator.tokenizer = ("words", str.split)
+        estimator._load_cache()
+        self.assertEqual(estimator.count_entry(entry), 3)
+        self.assertEqual(estimator.count_entry(entry._replace(mtime=entry.mtime + 1)), 1)
+
+        # Files gone from the project and texts no file holds any more are dropped from the cache
+        gone_path = os.path.join(self.main_window.project_path, "gone.txt")
+        with open(gone_path, "w") as f:
+            f.write("soon gone")
+        estimator.count_manifest(scan_project(self.main_window.project_path))
+        estimator.save()
+        os.remove(gone_path)
+        estimator = TokenEstimator(exact=False, cache_path=cache_path)
+        estimator.tokenizer = ("words", str.split)
+        estimator._load_cache()
+        estimator.count_manifest(scan_project(self.main_window.project_path))
+        estimator.save()
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        self.assertFalse([key for key in cache["files"] if key.endswith("gone.txt")])
+        self.assertEqual(set(cache["texts"]), {entry[3] for entry in cache["files"].values() if entry[3]})
+
+    def test_minify_source(self):
+        """
+        Test that minification strips comments and whitespace without changing the code
+        """
+        python_source = (
+            '# License header\n\n\ndef f(x):\n    """Docstring."""\n\n    return x  # comment\n\n'
+            's = "# not a comment" \'\' \'b\'\n'
+        )
+        minified = minify_source("mod.py", python_source)
+        self.assertNotIn("License", minified)
+        self.assertNotIn("comment\n", minified)
+        self.assertIn("# not a comment", minified)
+        self.assertEqual(ast.dump(ast.parse(minified)), ast.dump(ast.parse(python_source)))
+        without_docstrings = minify_source("mod.py", python_source, drop_docstrings=True)
+        self.assertNotIn("Docstring", without_docstrings)
+        self.assertEqual(without_docstrings, "def f(x):\n return x\ns=\"# not a comment\" '' 'b'\n")
+
+        js_source = '/* header */\nconst url = "http://x";  // comment\nconst re = /a\\/b/g;\n\nlet d = a / b;\n'
+        self.assertEqual(minify_source("app.js", js_source),
+                         'const url = "http://x";\nconst re = /a\\/b/g;\nlet d = a / b;\n')
+        # Backticks nested in ${...} do not end the outer template literal
+        template = 'const t = `a  ${ f(`x  ${ {k: "}"}.k }  y`) }  b\n   c`;   // end\n'
+        self.assertEqual(minify_source("app.ts", template), template.replace(";   // end", ";"))
+        self.assertEqual(minify_source("style.css", "a  >  b {\n  color: red; /* c */\n}\n"), "a > b{color: red;}")
+        self.assertEqual(minify_source("data.json", '{ "a": [1, 2] }'), '{"a":[1,2]}')
+        self.assertEqual(minify_source("notes.md", "#  Title\n\n"), "#  Title\n\n")
+
+        with open(os.path.join(self.main_window.project_path, "mod.py"), "w") as f:
+            f.write(python_source)
+        self.main_window.run_report = RunReport("compress", self.main_window.project_path)
+        content = get_project_content_for_llm(self.main_window, self.main_window.project_path, minify=True,
+                                              token_estimator=TokenEstimator(exact=False))
+        self.assertIn("File: mod.py\ndef f(x):", content)
+        savings = self.main_window.run_report.to_dict()["minification"]
+        self.assertEqual(savings["files"][0]["file"], "mod.py")
+        self.assertGreater(savings["tokens_saved"], 0)
+
+    def test_chunk_source(self):
+        """
+        Test that chunks follow function and class boundaries and respect the token target
+        """
+        count_words = lambda text: len(text.split())
+        source = (
+            "import os\n\ndef small():\n    return 1\n\n"
+            "class Big:\n    \"\"\"Doc.\"\"\"\n\n    def a(self):\n"
+            + "".join(f"        x{i} = {i}\n" for i in range(20))
+            + "\n    def b(self):\n        return 2\n\ndef huge():\n"
+            + "".join(f"    y{i} = {i}\n" + ("\n" if i % 10 == 9 else "") for i in range(60))
+        )
+        lines = source.splitlines()
+        chunks = chunk_source("mod.py", source, 40, count_words)
+        self.assertTrue(all(chunk.tokens <= 40 for chunk in chunks))
+        self.assertEqual((chunks[0].start_line, chunks[0].symbols), (1, ("small",)))
+        # The class is split between its members, each chunk repeating the class header
+        members = [chunk for chunk in chunks if any(symbol.startswith("Big.") for symbol in chunk.symbols)]
+        self.assertEqual([chunk.symbols for chunk in members], [("Big.a",), ("Big.a",), ("Big.b",)])
+        self.assertTrue(all(chunk.text.startswith("class Big:") for chunk in members))
+        self.assertTrue(lines[members[-1].start_line - 1].strip().startswith("def b"))
+        # An oversized function falls back to cuts at blank lines, repeating its signature
+        huge = [chunk for chunk in chunks if chunk.symbols == ("huge",)]
+        self.assertGreater(len(huge), 1)
+        self.assertTrue(all(chunk.text.startswith("def huge():") for chunk in huge))
+        self.assertTrue(all(not lines[chunk.end_line - 1].strip() for chunk in huge[:-1]))
+        self.assertEqual(huge[-1].end_line, len(lines))
+
+        segments = split_segments("app.js", "function f() {\n  return {a: 1};\n}\n\nconst x = 1;\nclass A {\n}\n")
+        self.assertEqual([(s.start, s.end, s.symbol) for s in segments], [(1, 3, "f"), (4, 5, "x"), (6, 7, "A")])
+
+        batches = pack_chunks(chunks, 70)
+        self.assertEqual([chunk for batch in batches for chunk in batch], chunks)
+        self.assertTrue(all(sum(chunk.tokens for chunk in batch) <= 70 for batch in batches))
+        self.assertEqual(len(pack_chunks(chunks[:1], 1)), 1)
+
+        with open(os.path.join(self.main_window.project_path, "mod.py"), "w") as f:
+            f.write(source)
+        batches = get_project_chunks_for_llm(self.main_window, self.main_window.project_path, target_tokens=200,
+                                             token_estimator=TokenEstimator(exact=False))
+        paths = {chunk.rel_path for batch in batches for chunk in batch}
+        self.assertEqual(paths, {"mod.py", "test_file.txt"})
+
+    def test_symbol_index(self):
+        """
+        Test symbol extraction, lookups and incremental index updates
+        """
+        project_path = self.main_window.project_path
+        os.makedirs(os.path.join(project_path, "pkg"))
+        with open(os.path.join(project_path, "pkg", "mod.py"), "w") as f:
+            f.write("import os\nfrom . import sibling\n\nclass Widget:\n    def render(self):\n        import json\n\ndef helper():\n    pass\n")
+        with open(os.path.join(project_path, "app.ts"), "w") as f:
+            f.write('import { a } from "./util";\n\nexport function start() {\n  return a;\n}\n')
+        index = SymbolIndex(os.path.join(project_path, "index", "symbols.sqlite3"))
+        try:
+            self.assertEqual(index.update(project_path), (2, 0))
+            mod = "pkg/mod.py"
+            self.assertEqual([(s.rel_path, s.kind, s.start_line, s.end_line) for s in index.find(project_path, "Widget.render")],
+                             [(mod, "method", 5, 6)])
+            self.assertEqual(index.find(project_path, "start")[0][:2], ("app.ts", "function"))
+            self.assertEqual(index.find(project_path, "pkg.mod")[0].kind, "module")
+            self.assertEqual([(i.module, i.name, i.level) for i in index.imports(project_path, mod)],
+                             [("os", None, 0), ("", "sibling", 1), ("json", None, 0)])
+            self.assertEqual(index.imports(project_path, "app.ts")[0].module, "./util")
+
+            # Unchanged files are not parsed again; changed and deleted ones are
+            self.assertEqual(index.update(project_path), (0, 0))
+            with open(os.path.join(project_path, "pkg", "mod.py"), "a") as f:
+                f.write("\ndef added():\n    pass\n")
+            os.remove(os.path.join(project_path, "app.ts"))
+            self.assertEqual(index.update(project_path), (1, 1))
+            self.assertEqual(len(index.find(project_path, "added")), 1)
+            self.assertEqual(index.find(project_path, "start"), [])
+        finally:
+            index.close()
+
+    def test_collect_dependencies(self):
+        """
+        Test dependency extraction from imports and manifests, and the TXT section
+        """
+        project_path = self.main_window.project_path
+        files = {
+            "requirements.txt": "# pinned\nPyQt5==5.15.9\n  python-docx>=0.8 ; python_version > '3'\n-r dev.txt\nunused-tool\n",
+            "pyproject.toml": '[project]\nrequires-python = ">=3.9"\ndependencies = ["requests[socks]>=2"]\n',
+            "package.json": '{"dependencies": {"react": "^18.0.0"}, "devDependencies": {"@scope/kit": "1.x"}}',
+            "package-lock.json": '{"packages": {"node_modules/react": {"version": "18.2.0"}, '
+                                 '"node_modules/a/node_modules/react": {"version": "1.0.0"}}}',
+            os.path.join("app", "__init__.py"): "",
+            os.path.join("app", "main.py"): "import os\nimport requests\nfrom PyQt5 import QtCore\nfrom app import util\n"
+                                            "from . import sibling\nimport json\nimport helper\n\ndef run():\n    import docx\n",
+            os.path.join("app", "json", "__init__.py"): "",
+            os.path.join("app", "helper.py"): "",
+            os.path.join("src", "lib.py"): "import lib\n",
+            "web.js": 'import React from "react";\nimport kit from "@scope/kit/button";\nconst fs = require("node:fs");\n'
+                      'import "./local";\n',
+        }
+        for rel_path, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(project_path, rel_path)), exist_ok=True)
+            with open(os.path.join(project_path, rel_path), "w") as f:
+                f.write(content)
+        self.assertEqual(parse_manifest("requirements.txt", files["requirements.txt"])["declared"],
+                         {"pyqt5": "==5.15.9", "python-docx": ">=0.8", "unused-tool": ""})
+
+        index = SymbolIndex(os.path.join(project_path, "cache", "symbols.sqlite3"))
+        try:
+            result = collect_dependencies(project_path, index=index,
+                                          cache=ManifestCache(os.path.join(project_path, "cache", "deps.json")))
+        finally:
+            index.close()
+        found = {(d.ecosystem, d.category, d.name): d for d in result.dependencies}
+        self.assertEqual(result.python_requires, ">=3.9")
+        self.assertEqual(set(result.manifests), {"requirements.txt", "pyproject.toml", "package.json", "package-lock.json"})
+        self.assertEqual(found[("python", "third-party", "PyQt5")].spec, "==5.15.9")
+        self.assertEqual(found[("python", "third-party", "python-docx")].imported_by, 1)
+        self.assertEqual(found[("python", "third-party", "requests")].declared_in, ("pyproject.toml",))
+        self.assertEqual(found[("python", "third-party", "unused-tool")].imported_by, 0)
+        self.assertIn(("python", "stdlib", "os"), found)
+        self.assertIn(("python", "local", "app"), found)
+        self.assertIn(("python", "local", ".sibling"), found)
+        # A subpackage does not shadow the standard library; a module next to the script is still local
+        self.assertIn(("python", "stdlib", "json"), found)
+        self.assertNotIn(("python", "local", "json"), found)
+        self.assertIn(("python", "local", "helper"), found)
+        self.assertIn(("python", "local", "lib"), found)
+        self.assertEqual(found[("node", "third-party", "react")][3:5], ("^18.0.0", "18.2.0"))
+        self.assertIn(("node", "third-party", "@scope/kit"), found)
+        self.assertIn(("node", "stdlib", "fs"), found)
+        self.assertIn(("node", "local", "./local"), found)
+
+        section = "".join(format_dependency_section(result))
+        self.assertTrue(section.startswith("## Dependencies\n"))
+        self.assertIn("- PyQt5 ==5.15.9: declared in requirements.txt; imported by 1 file\n", section)
+        self.assertIn("- react ^18.0.0 (locked 18.2.0)", section)
+        output_lines, _ = build_project_text(project_path, dependencies=result)
+        text = "".join(output_lines)
+        self.assertLess(text.index("## Dependencies"), text.index("## Files Content"))
+
 if __name__ == '__main__':
     unittest.main()
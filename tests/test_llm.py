@@ -1,8 +1,13 @@
 import unittest
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from llm.llm_manager import generate_llm_documentation, call_openai_api, call_google_api
+from llm.hedging import LatencyHistogram, LatencyTracker, hedged_request
+from llm.scheduler import LLMScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, get_llm_scheduler
+from llm.summaries import SummaryCache, format_summaries, summarize_files
 from gui.layout import init_project_manager_ui
 import os
+import tempfile
+import time
 
 class TestLLM(unittest.TestCase):
     """
@@ -90,5 +95,142 @@ class TestLLM(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn("hello", result)
 
+    def test_hedged_request(self):
+        """
+        Test that a slow or failing primary is hedged and the first success wins.
+        """
+        def slow():
+            time.sleep(1.0)
+            return "slow answer"
+
+        def fast():
+            return "fast answer"
+
+        def failing():
+            raise ValueError("provider down")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tracker = LatencyTracker(os.path.join(temp_dir, "llm_latency.json"))
+            started = time.perf_counter()
+            self.assertEqual(hedged_request({"openai": slow, "google": fast}, "openai", "google", tracker, 0.1),
+                             ("google", "fast answer"))
+            self.assertLess(time.perf_counter() - started, 0.9)
+            self.assertEqual(hedged_request({"openai": fast, "google": slow}, "openai", "google", tracker, 5),
+                             ("openai", "fast answer"))
+            self.assertEqual(hedged_request({"openai": failing, "google": fast}, "openai", "google", tracker, 5),
+                             ("google", "fast answer"))
+            with self.assertRaises(RuntimeError):
+                hedged_request({"openai": failing, "google": failing}, "openai", "google", tracker, 5)
+            self.assertEqual(tracker.histogram("google").total, 2)
+            self.assertEqual(LatencyTracker(tracker.path).histogram("openai").total, 1)
+
+        histogram = LatencyHistogram()
+        for tenth in range(1, 101):
+            histogram.record(tenth / 10)
+        self.assertLessEqual(abs(histogram.percentile(50) - 5.0), 5.0 * 0.25)
+        self.assertGreaterEqual(histogram.percentile(95), 9.5)
+        tracker = LatencyTracker(os.path.join(tempfile.gettempdir(), "missing", "llm_latency.json"))
+        self.assertEqual(tracker.hedge_delay("openai", default=12.0), 12.0)
+
+    def test_llm_scheduler(self):
+        """
+        Test rate pacing, priorities, fair sharing between jobs and 429 retries.
+        """
+        scheduler = LLMScheduler(limits={"openai": {"rpm": 1200}}, burst_seconds=0.05)
+        started = time.perf_counter()
+        futures = [scheduler.submit("openai", "gpt-4o", 10, lambda: time.perf_counter()) for _ in range(10)]
+        times = [future.result() for future in futures]
+        # 20 requests per second with a bucket of one: paced, not burst
+        self.assertGreaterEqual(times[-1] - started, 0.4)
+        scheduler.shutdown()
+
+        order = []
+        scheduler = LLMScheduler(max_concurrency=1)
+        gate = scheduler.submit("google", "gemini-1.5-pro", 1, lambda: time.sleep(0.2))
+        futures = [scheduler.submit("google", "gemini-1.5-pro", 100, lambda i=i: order.append(f"a{i}"), job="a")
+                   for i in range(4)]
+        futures += [scheduler.submit("google", "gemini-1.5-pro", 100, lambda i=i: order.append(f"b{i}"), job="b")
+                    for i in range(2)]
+        futures.append(scheduler.submit("google", "gemini-1.5-pro", 100, lambda: order.append("low"),
+                                        job="c", priority=PRIORITY_BACKGROUND))
+        futures.append(scheduler.submit("google", "gemini-1.5-pro", 100, lambda: order.append("urgent"),
+                                        job="d", priority=PRIORITY_INTERACTIVE))
+        gate.result()
+        for future in futures:
+            future.result()
+        self.assertEqual(order[0], "urgent")
+        self.assertEqual(order[-1], "low")
+        # Jobs a and b alternate instead of b waiting for all of a
+        self.assertLess(order.index("b1"), order.index("a3"))
+        scheduler.shutdown()
+
+        class Response:
+            headers = {"retry-after": "0.05"}
+
+        class RateLimitError(Exception):
+            response = Response()
+
+        attempts = []
+
+        def limited():
+            attempts.append(time.perf_counter())
+            if len(attempts) < 3:
+                raise RateLimitError("429 Too Many Requests")
+            return "done"
+
+        scheduler = LLMScheduler(limits={"openai": {"tpm": 60000}})
+        self.assertEqual(scheduler.run("openai", "gpt-4o", 10, limited), "done")
+        self.assertEqual(len(attempts), 3)
+        with self.assertRaises(ValueError):
+            scheduler.run("openai", "gpt-4o", 10, lambda: int("not a number"))
+        scheduler.shutdown()
+
+        scheduler = LLMScheduler(max_concurrency=0)
+        self.assertEqual(scheduler._executor._max_workers, 1)
+        self.assertEqual(scheduler.run("google", "gemini-1.5-pro", 1, lambda: "ok"), "ok")
+        scheduler.shutdown()
+
+        # The shared scheduler follows changed settings without being replaced
+        scheduler = get_llm_scheduler({"llm_rate_limits": {"openai": {"rpm": 60}}, "llm_max_concurrency": 2})
+        bucket = scheduler._buckets[("openai", "rpm")]
+        same = get_llm_scheduler({"llm_rate_limits": {"openai": {"rpm": 60, "tpm": 1000}}, "llm_max_concurrency": 3})
+        self.assertIs(same, scheduler)
+        self.assertIs(scheduler._buckets[("openai", "rpm")], bucket)
+        self.assertIn(("openai", "tpm"), scheduler._buckets)
+        self.assertEqual(scheduler._executor._max_workers, 3)
+        self.assertEqual(scheduler.run("openai", "gpt-4o", 10, lambda: "done"), "done")
+        self.assertIs(get_llm_scheduler(), scheduler)
+        get_llm_scheduler({})
+
+    def test_summary_cache(self):
+        """
+        Test that only new or changed files are summarized and the rest come from the cache.
+        """
+        requests = []
+
+        def request(system_prompt, content):
+            requests.append(content)
+            return f"Summary of {content.splitlines()[0]}"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = SummaryCache(os.path.join(temp_dir, "summaries.sqlite3"))
+            files = [("a.py", "def a():\n    return 1\n"), ("b.py", "def b():\n    return 2\n")]
+            summaries, fresh = summarize_files(files, request, "openai/gpt-4o", cache, max_workers=2)
+            self.assertEqual(fresh, 2)
+            self.assertEqual(list(summaries), ["a.py", "b.py"])
+            self.assertEqual(summaries["a.py"], "Summary of File: a.py")
+
+            summaries, fresh = summarize_files(files, request, "openai/gpt-4o", cache)
+            self.assertEqual((fresh, len(requests)), (0, 2))
+
+            files[1] = ("b.py", "def b():\n    return 3\n")
+            summaries, fresh = summarize_files(files, request, "openai/gpt-4o", cache)
+            self.assertEqual((fresh, len(requests)), (1, 3))
+            # Another model does not reuse the summaries
+            summaries, fresh = summarize_files(files, request, "google/gemini-1.5-pro", cache)
+            self.assertEqual(fresh, 2)
+            self.assertIn("File: b.py\nSummary of File: b.py", format_summaries(summaries))
+            cache.close()
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import os
 import json
-from settings.settings_manager import load_api_settings, load_app_settings, save_settings
+from settings.settings_manager import load_api_settings, load_app_settings, save_settings, get_settings_store, SettingsStore
 from PyQt5.QtWidgets import QMainWindow
 from gui.layout import init_project_manager_ui
 
@@ -85,18 +85,22 @@ class TestSettings(unittest.TestCase):
         """
         Test the save_settings function.
         """
-        # Set some test settings
+        # Saved by the API settings dialog while the window was open
+        get_settings_store(self.test_dir).update({
+            "openai": {
+                "api_key": "test_key",
+                "model": "gpt-3.5-turbo",
+                "temperature": 0.7
+            }
+        })
         self.main_window.recent_project_path = "/path/to/project"
         self.main_window.recent_doc_path = "/path/to/doc"
+        # A stale copy, which must not overwrite the stored provider settings
         self.main_window.api_settings = {
             "openai": {
-                "api_key": "test_key",
+                "api_key": "old_key",
                 "model": "gpt-3.5-turbo",
                 "temperature": 0.7
-            },
-            "recent_paths": {
-                "project": "/path/to/project",
-                "doc": "/path/to/doc"
             }
         }
 
@@ -116,5 +120,32 @@ class TestSettings(unittest.TestCase):
         self.assertEqual(saved_settings["recent_paths"]["project"], "/path/to/project")
         self.assertEqual(saved_settings["recent_paths"]["doc"], "/path/to/doc")
 
+    def test_settings_store(self):
+        """
+        Test that the settings store caches, notifies listeners and merges concurrent writers.
+        """
+        with open(self.settings_file, "w") as f:
+            json.dump({"profile": False, "openai": {"model": "gpt-4"}}, f)
+        store = SettingsStore(self.settings_file, debounce=60)
+        other = SettingsStore(self.settings_file, debounce=60)
+        changes = []
+        store.add_listener(changes.append)
+
+        self.assertEqual(store.get("openai"), {"model": "gpt-4"})
+        self.assertEqual(store.update({"profile": True, "openai": {"model": "gpt-4"}}), {"profile"})
+        self.assertEqual(changes, [{"profile"}])
+        # Not written before the debounce expires
+        with open(self.settings_file, "r") as f:
+            self.assertFalse(json.load(f)["profile"])
+
+        other.update({"google": {"model": "gemini-1.5-pro"}}, remove=["openai"])
+        other.flush()
+        store.flush()
+        with open(self.settings_file, "r") as f:
+            saved_settings = json.load(f)
+        self.assertEqual(saved_settings, {"profile": True, "google": {"model": "gemini-1.5-pro"}})
+        self.assertEqual(store.snapshot(), saved_settings)
+        self.assertEqual(os.listdir(self.test_dir), ["settings.json"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,18 @@
 import unittest
 import os
 import sys
+import json
+import logging
+import shutil
+import tempfile
 from utils.file_utils import get_base_dir
 from utils.log_utils import setup_logging
+from utils.ignore_utils import IgnoreMatcher
+from utils.perf_utils import RunReport, RunProfiler
+from utils.startup_benchmark import (
+    IMPORT_BUDGET, CLI_NOOP_BUDGET, FIRST_WINDOW_BUDGET, CLI_LAZY_MODULES, LAZY_MODULES, best_of, measure_cli_noop,
+    measure_cli_noop_imports, measure_first_window, measure_imports
+)
 
 class TestUtils(unittest.TestCase):
     """
@@ -36,5 +46,106 @@ class TestUtils(unittest.TestCase):
         log_file = os.path.join(get_base_dir(), "logs", "dev_manager.log")
         self.assertTrue(os.path.exists(log_file))
 
+    def test_setup_logging_quiet(self):
+        """
+        Test that quiet mode disables debug and info records.
+        """
+        setup_logging(quiet=True)
+        try:
+            self.assertFalse(logging.getLogger("core.utils").isEnabledFor(logging.INFO))
+            self.assertTrue(logging.getLogger("core.utils").isEnabledFor(logging.WARNING))
+        finally:
+            setup_logging()
+
+    def test_ignore_matcher(self):
+        """
+        Test the IgnoreMatcher class with nested .gitignore files.
+        """
+        project_dir = tempfile.mkdtemp()
+        try:
+            for rel_dir in ["src/generated", "node_modules/pkg", "docs"]:
+                os.makedirs(os.path.join(project_dir, rel_dir))
+            with open(os.path.join(project_dir, ".gitignore"), "w") as f:
+                f.write("*.log\n!keep.log\n/docs/\n")
+            with open(os.path.join(project_dir, "src", ".gitignore"), "w") as f:
+                f.write("generated/\n")
+
+            ignore = IgnoreMatcher(project_dir)
+            walked = []
+            for root, dirs, files in os.walk(project_dir):
+                ignore.prune(root, dirs, files)
+                walked.append(os.path.relpath(root, project_dir))
+
+            self.assertEqual(sorted(walked), [".", "src"])
+            self.assertTrue(ignore.is_ignored(os.path.join(project_dir, "app.log"), False))
+            self.assertFalse(ignore.is_ignored(os.path.join(project_dir, "keep.log"), False))
+            self.assertTrue(ignore.is_ignored(os.path.join(project_dir, "src", "generated", "a.py"), False))
+            self.assertFalse(ignore.is_ignored(os.path.join(project_dir, "src", "docs"), True))
+        finally:
+            shutil.rmtree(project_dir)
+
+    def test_run_report(self):
+        """
+        Test the RunReport class.
+        """
+        report = RunReport("compress", "/path/to/project", slowest_count=1)
+        with report.stage("read"):
+            pass
+        with report.stage("read"):
+            pass
+        report.record_file("a.py", 100, 0.5)
+        report.record_file("b.py", 50, 0.1)
+        report.record_encoding_fallback("c.txt", "latin-1")
+
+        output_dir = tempfile.mkdtemp()
+        try:
+            with open(report.save(output_dir), "r") as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(output_dir)
+
+        self.assertEqual(data["stages"]["read"]["calls"], 2)
+        self.assertEqual(data["categories"][".py"], {"files": 2, "bytes": 150})
+        self.assertEqual(data["slowest_files"], [{"file": "a.py", "seconds": 0.5, "bytes": 100}])
+        self.assertEqual(len(data["encoding_fallbacks"]), 1)
+        self.assertIn("Compress finished", report.summary())
+
+    def test_run_profiler(self):
+        """
+        Test that RunProfiler writes the profile, its summary and the allocation sites.
+        """
+        profiler = RunProfiler(top_n=5, tracemalloc_frames=1)
+        profiler.start()
+        data = [str(i) for i in range(1000)]
+        profiler.stop()
+        self.assertEqual(len(data), 1000)
+
+        output_dir = tempfile.mkdtemp()
+        try:
+            written = profiler.save(output_dir, "compress_profile")
+            self.assertEqual(
+                sorted(os.path.basename(path) for path in written),
+                ["compress_profile.prof", "compress_profile_allocations.txt", "compress_profile_cumulative.txt"],
+            )
+            with open(os.path.join(output_dir, "compress_profile_allocations.txt"), "r") as f:
+                self.assertIn("allocation sites", f.read())
+        finally:
+            shutil.rmtree(output_dir)
+
+    def test_startup_budget(self):
+        """
+        Test that main.py imports no optional backend eagerly, that its subcommands do
+        not load the GUI, and that both start within budget
+        """
+        _seconds, modules = measure_imports()
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, modules)
+        self.assertLess(best_of(3, measure_imports), IMPORT_BUDGET)
+        cli_modules = measure_cli_noop_imports()
+        self.assertEqual([module for module in CLI_LAZY_MODULES if module in cli_modules], [])
+        self.assertLess(best_of(3, measure_cli_noop), CLI_NOOP_BUDGET)
+        # Runs headless: the child interpreter defaults to the offscreen Qt platform
+        self.assertLess(best_of(2, measure_first_window), FIRST_WINDOW_BUDGET)
+
 if __name__ == '__main__':
     unittest.main()
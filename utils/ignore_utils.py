@@ -0,0 +1,189 @@
+import os
+import re
+
+GITIGNORE_FILE = ".gitignore"
+PROJECT_IGNORE_FILE = ".pmignore"
+
+# Applied before any ignore file, so a project can re-include them with "!pattern".
+DEFAULT_IGNORE_PATTERNS = [
+    ".*",
+    "__pycache__/",
+    "node_modules/",
+    "venv/",
+    "env/",
+    "dist/",
+    "build/",
+    "*.egg-info/",
+    "project_documentation_*/",
+]
+
+def _translate_glob(pattern):
+    """Translates a gitignore glob into a regular expression body."""
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return "".join(parts)
+
+def compile_ignore_pattern(line):
+    """
+    Compiles a single gitignore-style line.
+
+    Args:
+        line (str): A line from an ignore file.
+
+    Returns:
+        tuple: (regex, negate, dir_only, anchored), or None for blank lines and comments.
+    """
+    line = line.rstrip("\n").rstrip("\r")
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\#") or line.startswith("\\!"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    line = line.lstrip("/")
+    return re.compile(_translate_glob(line) + r"\Z"), negate, dir_only, anchored
+
+def read_ignore_file(file_path):
+    """Reads and compiles an ignore file, returning an empty list if it cannot be read."""
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    return [rule for rule in map(compile_ignore_pattern, lines) if rule]
+
+class IgnoreMatcher:
+    """
+    Decides which files and directories of a project are skipped while walking it.
+
+    Rules come from DEFAULT_IGNORE_PATTERNS, the project-level PROJECT_IGNORE_FILE and
+    every .gitignore found on the way down. As in git, later rules override earlier
+    ones and rules in a nested .gitignore apply only below its directory. Every ignore
+    file is read and compiled once per matcher.
+    """
+
+    def __init__(self, project_path, extra_patterns=None, use_gitignore=True):
+        self.project_path = os.path.abspath(project_path)
+        self.use_gitignore = use_gitignore
+        patterns = list(DEFAULT_IGNORE_PATTERNS) + list(extra_patterns or [])
+        base_rules = [("", rule) for rule in map(compile_ignore_pattern, patterns) if rule]
+        base_rules += [("", rule) for rule in read_ignore_file(os.path.join(self.project_path, PROJECT_IGNORE_FILE))]
+        self._base_rules = base_rules
+        self._rules_by_dir = {}
+
+    def _relative(self, path):
+        """Returns path relative to the project root, using "/" separators ("" for the root)."""
+        rel_path = os.path.relpath(os.path.abspath(path), self.project_path)
+        if rel_path == os.curdir:
+            return ""
+        return rel_path.replace(os.sep, "/")
+
+    def _rules_for(self, rel_dir):
+        """Returns the rules applying to entries of rel_dir, loading its .gitignore on first use."""
+        rules = self._rules_by_dir.get(rel_dir)
+        if rules is not None:
+            return rules
+        if rel_dir:
+            rules = list(self._rules_for(rel_dir.rpartition("/")[0]))
+        else:
+            rules = list(self._base_rules)
+        if self.use_gitignore:
+            gitignore = os.path.join(self.project_path, *rel_dir.split("/"), GITIGNORE_FILE)
+            rules += [(rel_dir, rule) for rule in read_ignore_file(gitignore)]
+        self._rules_by_dir[rel_dir] = rules
+        return rules
+
+    def _match(self, rel_dir, name, is_dir):
+        """Applies the rules of rel_dir to a single entry, the last matching rule winning."""
+        ignored = False
+        for base, (regex, negate, dir_only, anchored) in self._rules_for(rel_dir):
+            if dir_only and not is_dir:
+                continue
+            if anchored:
+                rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                if base:
+                    if not rel_path.startswith(base + "/"):
+                        continue
+                    rel_path = rel_path[len(base) + 1:]
+                if not regex.match(rel_path):
+                    continue
+            elif not regex.match(name):
+                continue
+            ignored = not negate
+        return ignored
+
+    def is_ignored(self, path, is_dir=None):
+        """
+        Checks whether a path inside the project is ignored, including via an ignored parent.
+
+        Args:
+            path (str): Absolute path, or path relative to the current directory.
+            is_dir (bool, optional): Whether path is a directory. Looked up when omitted.
+
+        Returns:
+            bool: True if the path should be skipped.
+        """
+        if is_dir is None:
+            is_dir = os.path.isdir(path)
+        rel_path = self._relative(path)
+        if not rel_path or rel_path.startswith(".."):
+            return False
+        parts = rel_path.split("/")
+        for depth, name in enumerate(parts):
+            entry_is_dir = is_dir if depth == len(parts) - 1 else True
+            if self._match("/".join(parts[:depth]), name, entry_is_dir):
+                return True
+        return False
+
+    def prune(self, root, dirs, files):
+        """
+        Filters one os.walk step in place.
+
+        dirs is modified in place so ignored subtrees are never entered; the
+        remaining files are returned.
+        """
+        rel_dir = self._relative(root)
+        dirs[:] = [d for d in dirs if not self._match(rel_dir, d, True)]
+        return [f for f in files if not self._match(rel_dir, f, False)]
@@ -1,11 +1,33 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import tempfile
 from utils.file_utils import get_base_dir  # Import the missing function
 
-def setup_logging():
+_queue_handler = None
+_queue_listener = None
+
+def _stop_listener():
+    """Flushes and stops the queue listener thread, if running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+def setup_logging(quiet=False):
     """Sets up logging configuration for the application.
-    Creates a logs directory if it doesn't exist and configures both file and console logging."""
+    Creates a logs directory if it doesn't exist and configures both file and console logging.
+
+    Records are put on a queue by the calling thread and written to the file and the
+    console by a QueueListener thread, so hot paths never wait on I/O. In quiet mode
+    only warnings and errors are kept, and disabled debug/info calls cost a level check.
+    Calling it again replaces the previous configuration."""
+    global _queue_handler, _queue_listener
+
     log_dir = os.path.join(get_base_dir(), "logs")
     try:
         if not os.path.exists(log_dir):
@@ -21,7 +43,11 @@ def setup_logging():
     log_file = os.path.join(log_dir, "dev_manager.log")
 
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(logging.WARNING if quiet else logging.DEBUG)
+
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+    _stop_listener()
 
     file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(logging.DEBUG)
@@ -29,12 +55,19 @@ def setup_logging():
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-
     # Add a StreamHandler to output logs to the console as well
     stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(logging.INFO)  # Set the level for console output
+    stream_handler.setLevel(logging.WARNING if quiet else logging.INFO)  # Set the level for console output
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
-    print(f"Logging setup complete. Log file: {log_file}")
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    logger.addHandler(_queue_handler)
+    _queue_listener.start()
+    atexit.unregister(_stop_listener)
+    atexit.register(_stop_listener)
+
+    logger.info("Logging setup complete. Log file: %s", log_file)
@@ -0,0 +1,347 @@
+import heapq
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILE_NAME = "performance_report.json"
+SLOWEST_FILES_COUNT = 10
+
+# Profiling defaults, overridable through the "profile_*" application settings
+PROFILE_TOP_N = 30
+PROFILE_TRACEMALLOC_FRAMES = 1
+
+def get_peak_rss():
+    """
+    Returns the peak resident set size of the current process in bytes, or None
+    when the platform does not expose it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return _get_peak_rss_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _get_peak_rss_windows():
+    """Reads PeakWorkingSetSize through the Windows process API."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except Exception:
+        pass
+    return None
+
+def measure(report, stage_name):
+    """Returns report.stage(stage_name), or a no-op context when report is None."""
+    if report is None:
+        return nullcontext()
+    return report.stage(stage_name)
+
+class RunReport:
+    """
+    Collects timings and I/O counters for one compress or reconstruct run.
+
+    Stages may be entered many times (e.g. "read" once per file); wall and CPU
+    time are summed per stage name. The result is written as JSON with save().
+    Recording is thread-safe; stage CPU time is process-wide, so stages timed in
+    parallel threads overlap.
+    """
+
+    def __init__(self, operation, target_path, slowest_count=SLOWEST_FILES_COUNT):
+        self.operation = operation
+        self.target_path = target_path
+        self.started_at = datetime.now()
+        self.stages = {}
+        self.categories = {}
+        self.encoding_fallbacks = []
+        self.minified = {}
+        self.restore = None
+        self.slowest_count = slowest_count
+        self._slowest = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.wall_time = None
+        self.cpu_time = None
+        self.output_dir = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block and adds it to the totals of stage name."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            with self._lock:
+                totals = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+                totals["wall"] += wall
+                totals["cpu"] += cpu
+                totals["calls"] += 1
+
+    def record_file(self, rel_path, size, seconds):
+        """Counts a processed file under its extension and tracks the slowest ones."""
+        category = os.path.splitext(rel_path)[1].lower() or "(none)"
+        entry = (seconds, rel_path, size or 0)
+        with self._lock:
+            counters = self.categories.setdefault(category, {"files": 0, "bytes": 0})
+            counters["files"] += 1
+            counters["bytes"] += size or 0
+            if len(self._slowest) < self.slowest_count:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def record_encoding_fallback(self, file_path, encoding):
+        """Records a file that was not valid UTF-8 and needed encoding detection."""
+        with self._lock:
+            self.encoding_fallbacks.append({"file": file_path, "encoding": encoding})
+
+    def record_minification(self, rel_path, tokens_before, tokens_after):
+        """Records the token counts of a file before and after minification."""
+        with self._lock:
+            self.minified[rel_path] = (tokens_before, tokens_after)
+
+    def record_restore(self, written, skipped, deleted):
+        """Records how many files a restore wrote, left unchanged and deleted."""
+        with self._lock:
+            self.restore = {"written": written, "skipped": skipped, "deleted": deleted}
+
+    def finish(self):
+        """Stops the run clock. Called automatically by to_dict() if needed."""
+        if self.wall_time is None:
+            self.wall_time = time.perf_counter() - self._wall_start
+            self.cpu_time = time.process_time() - self._cpu_start
+
+    def to_dict(self):
+        """Returns the report as a JSON-serializable dict."""
+        self.finish()
+        return {
+            "operation": self.operation,
+            "target": self.target_path,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_time": round(self.wall_time, 6),
+            "cpu_time": round(self.cpu_time, 6),
+            "peak_rss_bytes": get_peak_rss(),
+            "stages": {
+                name: {"wall": round(t["wall"], 6), "cpu": round(t["cpu"], 6), "calls": t["calls"]}
+                for name, t in self.stages.items()
+            },
+            "categories": dict(sorted(self.categories.items())),
+            "total_files": sum(c["files"] for c in self.categories.values()),
+            "total_bytes": sum(c["bytes"] for c in self.categories.values()),
+            "encoding_fallbacks": self.encoding_fallbacks,
+            "minification": self._minification_dict(),
+            "restore": self.restore,
+            "slowest_files": [
+                {"file": rel_path, "seconds": round(seconds, 6), "bytes": size}
+                for seconds, rel_path, size in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def _minification_dict(self):
+        """Returns the token savings of minification, files with the largest savings first."""
+        before = sum(counts[0] for counts in self.minified.values())
+        after = sum(counts[1] for counts in self.minified.values())
+        files = sorted(self.minified.items(), key=lambda item: item[1][1] - item[1][0])
+        return {
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+            "files": [
+                {"file": rel_path, "tokens_before": b, "tokens_after": a, "tokens_saved": b - a}
+                for rel_path, (b, a) in files
+            ],
+        }
+
+    def save(self, output_dir, file_name=REPORT_FILE_NAME):
+        """
+        Writes the report as JSON into output_dir.
+
+        Returns:
+            str: Path of the report file, or None if it could not be written.
+        """
+        self.output_dir = output_dir
+        report_path = os.path.join(output_dir, file_name)
+        try:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=4)
+            return report_path
+        except Exception as e:
+            logger.error("Error saving performance report: %s", e)
+            return None
+
+    def summary(self):
+        """Returns a short human-readable summary for the GUI and console."""
+        data = self.to_dict()
+        lines = [
+            f"{data['operation'].capitalize()} finished in {data['wall_time']:.2f}s "
+            f"(CPU {data['cpu_time']:.2f}s), {data['total_files']} files, {data['total_bytes'] / 1024:.0f} KB",
+        ]
+        for name, totals in sorted(data["stages"].items(), key=lambda item: -item[1]["wall"]):
+            lines.append(f"  {name}: {totals['wall']:.2f}s")
+        if data["peak_rss_bytes"]:
+            lines.append(f"Peak memory: {data['peak_rss_bytes'] / (1024 * 1024):.0f} MB")
+        if data["encoding_fallbacks"]:
+            lines.append(f"Encoding fallbacks: {len(data['encoding_fallbacks'])}")
+        minification = data["minification"]
+        if minification["tokens_before"]:
+            lines.append(
+                f"Minification saved {minification['tokens_saved']} of {minification['tokens_before']} LLM tokens "
+                f"({minification['tokens_saved'] / minification['tokens_before']:.0%})"
+            )
+        if data["slowest_files"]:
+            slowest = data["slowest_files"][0]
+            lines.append(f"Slowest file: {slowest['file']} ({slowest['seconds']:.3f}s)")
+        return "\n".join(lines)
+
+class RunProfiler:
+    """
+    Captures a cProfile profile and tracemalloc allocation sites for one run.
+
+    Overhead is controlled by the constructor: cProfile can be turned off, and
+    tracemalloc_frames sets how many stack frames are stored per allocation
+    (0 disables tracemalloc, 1 is cheapest and groups by allocating line).
+    """
+
+    def __init__(self, top_n=PROFILE_TOP_N, tracemalloc_frames=PROFILE_TRACEMALLOC_FRAMES, use_cprofile=True):
+        self.top_n = top_n
+        self.tracemalloc_frames = tracemalloc_frames
+        # The profiling modules are imported here, so normal runs do not pay for them
+        if use_cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+        else:
+            self._profile = None
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_settings(cls, app_settings):
+        """Builds a profiler from the "profile_*" keys of the application settings."""
+        return cls(
+            top_n=int(app_settings.get("profile_top_n", PROFILE_TOP_N)),
+            tracemalloc_frames=int(app_settings.get("profile_tracemalloc_frames", PROFILE_TRACEMALLOC_FRAMES)),
+            use_cprofile=bool(app_settings.get("profile_cprofile", True)),
+        )
+
+    def start(self):
+        """Starts tracing. tracemalloc is left alone if something else already runs it."""
+        import tracemalloc
+        if self.tracemalloc_frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._started_tracemalloc = True
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self):
+        """Stops tracing and keeps the allocation snapshot for save()."""
+        import tracemalloc
+        if self._profile is not None:
+            self._profile.disable()
+        if tracemalloc.is_tracing() and self.tracemalloc_frames > 0:
+            self._snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def save(self, output_dir, prefix="profile"):
+        """
+        Writes the profile into output_dir.
+
+        Files written: <prefix>.prof (for pstats or snakeviz), <prefix>_cumulative.txt
+        with the top_n functions by cumulative time, and <prefix>_allocations.txt
+        with the top_n allocation sites.
+
+        Returns:
+            list[str]: Paths of the files written.
+        """
+        import pstats
+        import tracemalloc
+        written = []
+        try:
+            if self._profile is not None:
+                prof_path = os.path.join(output_dir, f"{prefix}.prof")
+                self._profile.dump_stats(prof_path)
+                written.append(prof_path)
+
+                stream = io.StringIO()
+                pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(self.top_n)
+                summary_path = os.path.join(output_dir, f"{prefix}_cumulative.txt")
+                with open(summary_path, "w", encoding="utf-8") as f:
+                    f.write(stream.getvalue())
+                written.append(summary_path)
+
+            if self._snapshot is not None:
+                snapshot = self._snapshot.filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                ))
+                stats = snapshot.statistics("traceback" if self.tracemalloc_frames > 1 else "lineno")
+                allocations_path = os.path.join(output_dir, f"{prefix}_allocations.txt")
+                with open(allocations_path, "w", encoding="utf-8") as f:
+                    total = sum(stat.size for stat in stats)
+                    f.write(f"Traced memory still allocated at end of run: {total / 1024:.1f} KiB\n")
+                    f.write(f"Top {self.top_n} allocation sites:\n\n")
+                    for stat in stats[:self.top_n]:
+                        frame = stat.traceback[-1]
+                        f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+                        if len(stat.traceback) > 1:
+                            for line in stat.traceback.format(most_recent_first=True)[2:]:
+                                f.write(f"    {line}\n")
+                written.append(allocations_path)
+        except Exception as e:
+            logger.error("Error saving profile: %s", e)
+        return written
+
+@contextmanager
+def profile_run(enabled, output_dir, prefix="profile", app_settings=None):
+    """
+    Profiles the enclosed block when enabled, for the --profile flag and "profile"
+    setting of the command line subcommands. The profiler follows the "profile_*"
+    keys of app_settings. The files are written into output_dir even if the block
+    raises or is interrupted.
+    """
+    if not enabled:
+        yield
+        return
+    profiler = RunProfiler.from_settings(app_settings or {})
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        os.makedirs(output_dir, exist_ok=True)
+        for path in profiler.save(output_dir, prefix):
+            logger.info("Profile written: %s", path)
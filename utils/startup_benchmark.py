@@ -0,0 +1,167 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets in seconds, enforced by tests/test_utils.py. They leave room for slow CI
+# machines; a regression that imports an SDK eagerly still blows through them.
+IMPORT_BUDGET = 1.0
+CLI_NOOP_BUDGET = 2.5
+FIRST_WINDOW_BUDGET = 5.0
+
+# Modules main.py must not import until they are used
+LAZY_MODULES = (
+    "openai",
+    "google.generativeai",
+    "docx",
+    "chardet",
+    "cProfile",
+    "pstats",
+    "tracemalloc",
+    "multiprocessing",
+    "sqlite3",
+    "core.batch",
+    "core.watch",
+    "core.delta",
+    "core.symbols",
+    "core.verify",
+    "llm.summaries",
+)
+# Modules a command line subcommand must not import: they only serve the GUI
+CLI_LAZY_MODULES = (
+    "PyQt5.QtWidgets",
+    "gui.layout",
+    "gui.dialogs",
+)
+CLI_NOOP_ARGV = ("delta", "--help")
+
+_FIRST_WINDOW_SCRIPT = """
+import os, sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import main
+window = main.ProjectManagerGUI()
+app.processEvents()
+print(time.perf_counter() - start, flush=True)
+os._exit(0)
+"""
+
+def _benchmark_env():
+    """Returns the environment for child interpreters: headless Qt, no bytecode writes."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+def parse_importtime(stderr_text):
+    """
+    Parses the output of python -X importtime.
+
+    Returns:
+        dict: {module: (self_us, cumulative_us)} for every imported module.
+    """
+    modules = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # The header line
+        modules[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return modules
+
+def measure_imports(module="main"):
+    """
+    Imports module in a fresh interpreter under -X importtime.
+
+    Returns:
+        tuple: (seconds, modules) with the cumulative import time of module and the
+        parse_importtime result.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=_benchmark_env(), capture_output=True, text=True, check=True,
+    )
+    modules = parse_importtime(result.stderr)
+    return modules[module][1] / 1e6, modules
+
+def measure_cli_noop(argv=CLI_NOOP_ARGV):
+    """Returns the wall time in seconds of python main.py argv, from launch to exit."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py", *argv, "--quiet"],
+        cwd=PROJECT_ROOT, env=_benchmark_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+    return time.perf_counter() - start
+
+def measure_cli_noop_imports(argv=CLI_NOOP_ARGV):
+    """Runs python main.py argv under -X importtime and returns the parse_importtime result."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *argv, "--quiet"],
+        cwd=PROJECT_ROOT, env=_benchmark_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+def measure_first_window():
+    """Returns the seconds from launching the interpreter until the main window has been built and shown."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", _FIRST_WINDOW_SCRIPT],
+        cwd=PROJECT_ROOT, env=_benchmark_env(), capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - start
+
+def best_of(repeat, function, *args):
+    """Runs function repeat times and returns the fastest result, which is the least noisy."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        result = function(*args)
+        # measure_imports returns (seconds, modules)
+        timings.append(result[0] if isinstance(result, tuple) else result)
+    return min(timings)
+
+def main(argv=None):
+    """
+    Command line entry point: python -m utils.startup_benchmark [--repeat N] [--window] [--top N]
+
+    Returns:
+        int: 0 if every measurement is within its budget, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Measure startup time of main.py.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest counts.")
+    parser.add_argument("--window", action="store_true", help="Also time cold start to the first window.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    args = parser.parse_args(argv)
+
+    _seconds, modules = measure_imports()
+    results = [
+        ("import main", best_of(args.repeat, measure_imports), IMPORT_BUDGET),
+        ("CLI no-op (delta --help)", best_of(args.repeat, measure_cli_noop), CLI_NOOP_BUDGET),
+    ]
+    if args.window:
+        results.append(("first window", best_of(args.repeat, measure_first_window), FIRST_WINDOW_BUDGET))
+
+    print(f"Slowest imports (cumulative) of {len(modules)} modules:")
+    for name, (_self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"Imported eagerly but should be lazy: {', '.join(eager)}")
+    cli_modules = measure_cli_noop_imports()
+    cli_eager = [name for name in CLI_LAZY_MODULES if name in cli_modules]
+    if cli_eager:
+        print(f"Imported by the CLI no-op but only needed by the GUI: {', '.join(cli_eager)}")
+
+    over_budget = bool(eager or cli_eager)
+    for label, seconds, budget in results:
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        over_budget |= seconds > budget
+        print(f"{label}: {seconds * 1000:.0f} ms (budget {budget * 1000:.0f} ms) {status}")
+    return 1 if over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())